@@ -1,8 +1,9 @@
 from django.contrib import admin
+from core.db_routing import ReplicaAdminMixin
 from .models import User
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(ReplicaAdminMixin, admin.ModelAdmin):
     list_display = ('email', 'full_name', 'is_active', 'is_admin', 'is_staff', 'is_verified', 'date_joined')
     search_fields = ('email', 'full_name')
     list_filter = ('is_active', 'is_admin', 'is_staff', 'is_verified')
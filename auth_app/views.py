@@ -4,6 +4,7 @@ from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from .serializers import RegisterSerializer, UserSerializer
 from .models import User
+from core.values_serializers import ValuesListMixin
 
 class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
@@ -22,7 +23,7 @@ class UserProfileView(generics.RetrieveAPIView):
     def get_object(self):
         return self.request.user
 
-class AdminUserListView(generics.ListAPIView):
+class AdminUserListView(ValuesListMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAdminUser]
     serializer_class = UserSerializer
     queryset = User.objects.all()
@@ -1,3 +1,9 @@
-from .celery import app as celery_app
+# The Celery app is imported on first use (the worker's `-A cookie_auth_backend`,
+# or core.tasks), not by every web process at startup
+def __getattr__(name):
+    if name == 'celery_app':
+        from .celery import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = ('celery_app',)
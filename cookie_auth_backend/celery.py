@@ -1,8 +1,22 @@
 import os
 from celery import Celery
+from celery.schedules import crontab
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cookie_auth_backend.settings')
 
-app = Celery('cookie_auth_backend')
+# Every task records its duration, rows processed and failures (core.task_metrics)
+app = Celery('cookie_auth_backend', task_cls='core.task_base:InstrumentedTask')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
+
+# settings describes time-of-day schedules as crontab keyword arguments, so
+# loading settings does not import Celery. A new schedule is built, leaving
+# settings.CELERY_BEAT_SCHEDULE as written; it is set under the namespaced
+# name, which is the one beat_schedule lookups find
+app.conf.CELERY_BEAT_SCHEDULE = {
+    name: (
+        {**{key: value for key, value in entry.items() if key != 'crontab'}, 'schedule': crontab(**entry['crontab'])}
+        if 'crontab' in entry else entry
+    )
+    for name, entry in app.conf.beat_schedule.items()
+}
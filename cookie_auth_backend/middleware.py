@@ -1,17 +1,45 @@
-from django.utils.deprecation import MiddlewareMixin
-from django.middleware.csrf import CsrfViewMiddleware
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.module_loading import import_string
 
-class CsrfExemptMiddleware(MiddlewareMixin):
-    def process_request(self, request):
-        # Exempt API paths from CSRF verification
-        if request.path.startswith((
-            '/user/',
-            '/admin/users/',
-            '/services/',
-            '/subscription-plans/',
-            '/subscriptions/',
-            '/cookies/',
-            '/payments/',
-        )):
-            setattr(request, '_dont_enforce_csrf_checks', True)
+class BrowserOnlyMiddleware:
+    """
+    Runs settings.BROWSER_MIDDLEWARE (sessions, CSRF, auth, messages) for
+    admin, swagger and other browser paths only. Requests under
+    settings.API_PATH_PREFIXES authenticate with JWT through DRF and go
+    straight to the next middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.api_prefixes = tuple(settings.API_PATH_PREFIXES)
+        self.view_hooks = []
+        handler = get_response
+        for path in reversed(settings.BROWSER_MIDDLEWARE):
+            try:
+                middleware = import_string(path)(handler)
+            except MiddlewareNotUsed:
+                continue
+            if hasattr(middleware, 'process_view'):
+                self.view_hooks.insert(0, middleware.process_view)
+            handler = middleware
+        self.browser_handler = handler
+
+    def is_api(self, request):
+        return request.path_info.startswith(self.api_prefixes)
+
+    def __call__(self, request):
+        if self.is_api(request):
+            return self.get_response(request)
+        return self.browser_handler(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # The wrapped middleware are not in settings.MIDDLEWARE, so relay
+        # process_view (CsrfViewMiddleware does its check there)
+        if self.is_api(request):
+            return None
+        for process_view in self.view_hooks:
+            response = process_view(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
         return None
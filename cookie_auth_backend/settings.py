@@ -3,6 +3,7 @@ Django settings for Blackbox-GBS-Demo-V2 project.
 """
 
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -10,6 +11,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'your-secret-key'
 
+# Fernet key for encrypted fields (core.utils.get_cipher); derived from SECRET_KEY when unset
+FIELD_ENCRYPTION_KEY = os.environ.get('FIELD_ENCRYPTION_KEY', '')
+
 DEBUG = True
 
 ALLOWED_HOSTS = ['*']
@@ -24,15 +28,31 @@ CORS_ALLOWED_ORIGINS = [
 
 # Add corsheaders middleware (this is missing)
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
+    'core.query_profiler.QueryProfileMiddleware',
+    'core.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # Add this line
     'django.middleware.common.CommonMiddleware',
+    'core.ratelimit.RateLimitMiddleware',
+    'cookie_auth_backend.middleware.BrowserOnlyMiddleware',
+    'core.db_routing.PrimaryPinMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+# Session, CSRF, auth and messages only run for browser pages (admin,
+# swagger); API_PATH_PREFIXES use JWT and skip them
+BROWSER_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+API_PATH_PREFIXES = ('/api/', '/metrics')
+
+# The admin checks look for these middleware in MIDDLEWARE directly; they run
+# through BrowserOnlyMiddleware instead
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
 
 # Add corsheaders to INSTALLED_APPS
 INSTALLED_APPS = [
@@ -53,11 +73,33 @@ INSTALLED_APPS = [
     'core',
 ]
 
+# Celery workers and beat serve no HTTP, so they skip the apps that only
+# matter for requests. Admin stays: its LogEntry rows cascade with users.
+PROCESS_ROLE = os.environ.get('PROCESS_ROLE', 'worker' if os.path.basename(sys.argv[0]) == 'celery' else 'web')
+WEB_ONLY_APPS = [
+    'django.contrib.sessions',
+    'django.contrib.staticfiles',
+    'corsheaders',
+    'drf_yasg',
+]
+if PROCESS_ROLE == 'worker':
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in WEB_ONLY_APPS]
+
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    # orjson-backed JSON (falls back to the stdlib when orjson is missing)
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 ROOT_URLCONF = 'cookie_auth_backend.urls'
@@ -83,12 +125,87 @@ WSGI_APPLICATION = 'cookie_auth_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_PROFILE picks the database: 'sqlite' (single node, the default) or
+# 'postgres'. Connections are kept for DB_CONN_MAX_AGE seconds and checked
+# before reuse; with DB_POOL=1 PostgreSQL uses psycopg's connection pool
+# instead (persistent connections must then be off).
+DB_PROFILE = os.environ.get('DB_PROFILE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+
+if DB_PROFILE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'cookie_auth'),
+            'USER': os.environ.get('DB_USER', ''),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', ''),
+            'PORT': os.environ.get('DB_PORT', ''),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    if os.environ.get('DB_POOL') == '1':
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 20)),
+            'timeout': 10,
+        }
+else:
+    # WAL lets readers run alongside the writer, IMMEDIATE transactions take
+    # the write lock up front instead of failing on upgrade, and 'timeout'
+    # (SQLite's busy timeout) makes writers wait for the lock rather than
+    # raising "database is locked"
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'timeout': 20,
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL',
+            },
+        }
+    }
+
+# Read replicas for read-heavy endpoints (core.db_routing): DB_REPLICAS is a
+# comma-separated list of hosts (postgres) or database files (sqlite). Users
+# who just wrote keep reading from the primary for REPLICA_STICKY_SECONDS.
+DATABASE_REPLICAS = []
+for index, replica in enumerate(filter(None, os.environ.get('DB_REPLICAS', '').split(','))):
+    alias = f"replica{index + 1}"
+    DATABASES[alias] = dict(
+        DATABASES['default'],
+        **{'HOST' if DB_PROFILE == 'postgres' else 'NAME': replica.strip()},
+        TEST={'MIRROR': 'default'},
+    )
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['core.db_routing.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+
+# Cache
+# Redis in production so breaker, limiter and lock state is shared by every
+# web and worker process; local memory otherwise.
+
+REDIS_URL = os.environ.get('REDIS_URL', '')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
     }
-}
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -134,3 +251,209 @@ AUTH_USER_MODEL = 'auth_app.User'
 
 # Add trusted origins for CSRF
 CSRF_TRUSTED_ORIGINS = ['https://ntvpp5-8000.csb.app']
+
+# Shared secret used to verify payment gateway webhook signatures. Without
+# it webhooks are rejected, unless PAYMENT_WEBHOOK_ALLOW_UNSIGNED (local
+# development only) is on.
+PAYMENT_WEBHOOK_SECRET = os.environ.get('PAYMENT_WEBHOOK_SECRET', '')
+PAYMENT_WEBHOOK_ALLOW_UNSIGNED = os.environ.get('PAYMENT_WEBHOOK_ALLOW_UNSIGNED', '0') == '1'
+# Events that arrive before their payment exists stay queued, retried every
+# PAYMENT_WEBHOOK_RETRY_SECONDS, until they are PAYMENT_WEBHOOK_MAX_AGE_SECONDS old
+PAYMENT_WEBHOOK_RETRY_SECONDS = int(os.environ.get('PAYMENT_WEBHOOK_RETRY_SECONDS', '60'))
+PAYMENT_WEBHOOK_MAX_AGE_SECONDS = int(os.environ.get('PAYMENT_WEBHOOK_MAX_AGE_SECONDS', '86400'))
+
+# Approve service access requests automatically when the user's plan covers them
+SERVICE_AUTO_APPROVAL = True
+
+# Cookie pre-refresh: refresh each LoginService's cookies this long before they
+# expire, packing refreshes into slots of at most COOKIE_REFRESH_MAX_PER_SLOT
+COOKIE_REFRESH_LEAD_SECONDS = int(os.environ.get('COOKIE_REFRESH_LEAD_SECONDS', 60 * 60))
+COOKIE_REFRESH_SLOT_SECONDS = 60
+# A login service whose refresh was dispatched is not dispatched again within this long
+COOKIE_REFRESH_DISPATCH_TTL_SECONDS = 5 * COOKIE_REFRESH_SLOT_SECONDS
+COOKIE_REFRESH_MAX_PER_SLOT = int(os.environ.get('COOKIE_REFRESH_MAX_PER_SLOT', 50))
+COOKIE_REFRESH_HORIZON_SECONDS = 2 * 60 * 60
+COOKIE_REFRESH_BATCH_SIZE = 20
+
+# Login automation against Service.login_url: per-service circuit breaker and
+# AIMD concurrency limit (see core.resilience)
+LOGIN_AUTOMATION_TIMEOUT_SECONDS = 20
+SERVICE_BREAKER_FAILURE_THRESHOLD = 5
+SERVICE_BREAKER_COOLDOWN_SECONDS = 60
+SERVICE_CONCURRENCY_INITIAL = 4
+SERVICE_CONCURRENCY_MIN = 1
+SERVICE_CONCURRENCY_MAX = 32
+SERVICE_LATENCY_TARGET_SECONDS = 5.0
+
+# Single-flight cookie extraction per LoginService: one caller logs in while
+# the others wait on its lease ('cache' or 'local' in-process leases) and
+# reuse cookies extracted within the freshness window
+SINGLE_FLIGHT_BACKEND = os.environ.get('SINGLE_FLIGHT_BACKEND', 'cache')
+COOKIE_EXTRACTION_LEASE_SECONDS = 3 * LOGIN_AUTOMATION_TIMEOUT_SECONDS
+COOKIE_EXTRACTION_FRESHNESS_SECONDS = 60
+
+# While cookie_app's tables are being merged into cookie_management_app,
+# cookie reads also look in the legacy table; turn off after cut-over
+COOKIE_LEGACY_READS = os.environ.get('COOKIE_LEGACY_READS', '1') == '1'
+
+# OpenAPI schema: served pre-rendered with an ETag. API_SCHEMA_DIR may hold
+# openapi.json/yaml from `manage.py export_api_schema`; otherwise it is
+# rendered once per process. API_SCHEMA_URL sets the schema's host/base path.
+API_SCHEMA_DIR = os.environ.get('API_SCHEMA_DIR', '')
+API_SCHEMA_URL = os.environ.get('API_SCHEMA_URL', '')
+API_SCHEMA_MAX_AGE = 300
+SWAGGER_SETTINGS = {
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
+}
+REDOC_SETTINGS = {
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
+}
+
+# Responses of COMPRESSION_MIN_BYTES or more are compressed with brotli (when
+# the brotli module is installed) or gzip, as the client accepts
+# (core.compression). Levels are set for dynamic content, not maximum ratio.
+COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', '1') == '1'
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', 1024))
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+
+# Conditional GET (core.conditional): list and detail views send ETags built
+# from version stamps kept in the cache and answer a matching If-None-Match
+# with 304 before querying. Views that depend on expiry times fold the clock
+# in, so their ETags change at least every ETAG_CLOCK_SECONDS.
+CONDITIONAL_GET_ENABLED = os.environ.get('CONDITIONAL_GET_ENABLED', '1') == '1'
+VERSION_STAMP_TIMEOUT = 7 * 24 * 60 * 60
+ETAG_CLOCK_SECONDS = int(os.environ.get('ETAG_CLOCK_SECONDS', 60))
+
+# Token-bucket rate limits (core.ratelimit), checked before the view runs.
+# URL name -> [(scope, burst, tokens per minute)]; scope is 'ip' or 'user'
+# (JWT user id, the address for anonymous requests). Buckets live in the
+# RATE_LIMIT_CACHE cache: Redis when REDIS_URL is set, locmem otherwise. Set
+# RATE_LIMIT_TRUSTED_PROXIES to the number of proxies adding X-Forwarded-For.
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1') == '1'
+RATE_LIMIT_CACHE = os.environ.get('RATE_LIMIT_CACHE', 'default')
+RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get('RATE_LIMIT_TRUSTED_PROXIES', 0))
+RATE_LIMITS = {
+    'token_obtain_pair': [('ip', 10, 10)],
+    'register': [('ip', 5, 5)],
+    'cookie-detail': [('user', 30, 60), ('ip', 120, 240)],
+}
+
+# Account-sharing detection (cookie_management_app.usage, run with
+# `manage.py analyze_cookie_usage`). Distinct IPs are counted over the last
+# COOKIE_USAGE_WINDOW_SECONDS: a user service over
+# COOKIE_USAGE_MAX_IPS_PER_USER is flagged, and suspended past
+# COOKIE_USAGE_SUSPEND_IPS_PER_USER when COOKIE_USAGE_AUTO_SUSPEND is on; a
+# shared account over max_concurrent_users * COOKIE_USAGE_IPS_PER_SEAT is
+# flagged.
+COOKIE_USAGE_WINDOW_SECONDS = int(os.environ.get('COOKIE_USAGE_WINDOW_SECONDS', 24 * 60 * 60))
+COOKIE_USAGE_WINDOW_BUCKETS = 24
+COOKIE_USAGE_READ_LAG_SECONDS = 5
+COOKIE_USAGE_BATCH_SIZE = 5000
+COOKIE_USAGE_MAX_IPS_PER_USER = int(os.environ.get('COOKIE_USAGE_MAX_IPS_PER_USER', 3))
+COOKIE_USAGE_SUSPEND_IPS_PER_USER = int(os.environ.get('COOKIE_USAGE_SUSPEND_IPS_PER_USER', 10))
+COOKIE_USAGE_AUTO_SUSPEND = os.environ.get('COOKIE_USAGE_AUTO_SUSPEND', '0') == '1'
+COOKIE_USAGE_IPS_PER_SEAT = int(os.environ.get('COOKIE_USAGE_IPS_PER_SEAT', 2))
+
+# Request metrics served at /metrics (core.metrics). Every request is counted;
+# latency/query/size histograms are recorded for METRICS_SAMPLE_RATE of them.
+# When METRICS_TOKEN is set, scrapers must send it as a Bearer token.
+METRICS_ENABLED = True
+METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', 0.1))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# SQL profiling (core.query_profiler): requests sent with X-Profile-Queries
+# (equal to QUERY_PROFILE_TOKEN when set) and a QUERY_PROFILE_SAMPLE_RATE
+# share of all requests are profiled into QUERY_PROFILE_LOG. Summarise it
+# with `manage.py query_report`.
+QUERY_PROFILE_SAMPLE_RATE = float(os.environ.get('QUERY_PROFILE_SAMPLE_RATE', 0.0))
+QUERY_PROFILE_TOKEN = os.environ.get('QUERY_PROFILE_TOKEN', '')
+QUERY_PROFILE_SLOW_MS = int(os.environ.get('QUERY_PROFILE_SLOW_MS', 100))
+QUERY_PROFILE_N_PLUS_ONE_THRESHOLD = int(os.environ.get('QUERY_PROFILE_N_PLUS_ONE_THRESHOLD', 5))
+QUERY_PROFILE_LOG = os.environ.get('QUERY_PROFILE_LOG', str(BASE_DIR / 'query_profile.jsonl'))
+
+# Startup time budget for `manage.py check_startup_time` (django.setup()
+# plus loading the URLconf, median of fresh processes)
+STARTUP_TIME_BUDGET_MS = int(os.environ.get('STARTUP_TIME_BUDGET_MS', 1500))
+
+# Celery
+# CELERY_EAGER=1 runs tasks in-process with an in-memory broker (tests,
+# `manage.py run_beat_tasks`). Otherwise run one worker per queue, e.g.
+#   celery -A cookie_auth_backend worker -Q default
+#   celery -A cookie_auth_backend worker -Q logins,maintenance --concurrency 4
+CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_EAGER', '0') == '1'
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_BROKER_URL = 'memory://' if CELERY_TASK_ALWAYS_EAGER else os.environ.get('CELERY_BROKER_URL', REDIS_URL or 'redis://localhost:6379/0')
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+# Logins and maintenance tasks run for seconds to minutes; keep them off the
+# queue of the short, frequent tasks
+CELERY_TASK_ROUTES = {
+    'core.tasks.extract_cookies_for_service': {'queue': 'logins'},
+    'core.tasks.refresh_cookies_batch': {'queue': 'logins'},
+    'core.tasks.validate_existing_cookies': {'queue': 'logins'},
+    'core.tasks.cleanup_expired_data': {'queue': 'maintenance'},
+    'core.tasks.reconcile_user_entitlements': {'queue': 'maintenance'},
+    'core.tasks.send_subscription_expiry_notifications': {'queue': 'maintenance'},
+}
+# Long tasks: a worker reserves one message per process, and long tasks
+# (acks_late on the task) are acknowledged after they finish, so a
+# crashed worker's message is redelivered instead of lost
+CELERY_WORKER_PREFETCH_MULTIPLIER = int(os.environ.get('CELERY_WORKER_PREFETCH_MULTIPLIER', 1))
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+CELERY_TASK_SOFT_TIME_LIMIT = int(os.environ.get('CELERY_TASK_SOFT_TIME_LIMIT', 15 * 60))
+CELERY_TASK_TIME_LIMIT = CELERY_TASK_SOFT_TIME_LIMIT + 60
+
+# Subscription lifecycle (subscription_app.lifecycle): every
+# SUBSCRIPTION_LIFECYCLE_INTERVAL_SECONDS lapsed subscriptions are
+# deactivated, SUBSCRIPTION_LIFECYCLE_BATCH_SIZE per transaction, and the
+# user services and seats they covered are released.
+SUBSCRIPTION_LIFECYCLE_INTERVAL_SECONDS = int(os.environ.get('SUBSCRIPTION_LIFECYCLE_INTERVAL_SECONDS', 60))
+SUBSCRIPTION_LIFECYCLE_BATCH_SIZE = 500
+
+# Periodic tasks. 'expires' drops runs a busy queue could not start before
+# the next one is due. 'crontab' holds celery.schedules.crontab arguments
+# (converted in cookie_auth_backend/celery.py).
+CELERY_BEAT_SCHEDULE = {
+    'process-payment-webhook-events': {
+        'task': 'core.tasks.process_payment_webhook_events',
+        'schedule': 5.0,
+        'options': {'expires': 5.0},
+    },
+    'schedule-cookie-refreshes': {
+        'task': 'core.tasks.schedule_cookie_refreshes',
+        'schedule': float(COOKIE_REFRESH_SLOT_SECONDS),
+        'options': {'expires': float(COOKIE_REFRESH_SLOT_SECONDS)},
+    },
+    'validate-existing-cookies': {
+        'task': 'core.tasks.validate_existing_cookies',
+        'schedule': 30.0 * 60,
+        'options': {'expires': 30.0 * 60},
+    },
+    'reconcile-user-entitlements': {
+        'task': 'core.tasks.reconcile_user_entitlements',
+        'schedule': 60.0 * 60,
+    },
+    'expire-due-subscriptions': {
+        'task': 'core.tasks.expire_due_subscriptions',
+        'schedule': float(SUBSCRIPTION_LIFECYCLE_INTERVAL_SECONDS),
+        'options': {'expires': float(SUBSCRIPTION_LIFECYCLE_INTERVAL_SECONDS)},
+    },
+    'cleanup-expired-data': {
+        'task': 'core.tasks.cleanup_expired_data',
+        'crontab': {'hour': 3, 'minute': 15},
+    },
+    'send-subscription-expiry-notifications': {
+        'task': 'core.tasks.send_subscription_expiry_notifications',
+        'crontab': {'hour': 9, 'minute': 0},
+    },
+}
+
+# Maintenance tasks
+# Expired and invalid cookies are deleted after COOKIE_RETENTION_DAYS;
+# subscribers are emailed SUBSCRIPTION_EXPIRY_NOTICE_DAYS before expiry.
+COOKIE_RETENTION_DAYS = int(os.environ.get('COOKIE_RETENTION_DAYS', 7))
+SUBSCRIPTION_EXPIRY_NOTICE_DAYS = int(os.environ.get('SUBSCRIPTION_EXPIRY_NOTICE_DAYS', 3))
+MAINTENANCE_BATCH_SIZE = 1000
+
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'no-reply@localhost')
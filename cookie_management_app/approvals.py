@@ -0,0 +1,84 @@
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from .models import LoginService, UserService
+from .signals import user_services_reviewed
+from .entitlements import refresh_user_entitlements
+from .stamps import bump_users
+
+def assign_login_seats(user_service_rows):
+    """
+    Spread (user_service_id, service_id) pairs over active LoginService
+    accounts with free seats, least loaded first. Issues one UPDATE per
+    LoginService touched and returns the number of seats assigned.
+    Must run inside a transaction.
+    """
+    by_service = defaultdict(list)
+    for user_service_id, service_id in user_service_rows:
+        by_service[service_id].append(user_service_id)
+    if not by_service:
+        return 0
+
+    logins = (
+        LoginService.objects.select_for_update()
+        .filter(service_id__in=by_service, is_active=True, current_users__lt=F('max_concurrent_users'))
+        .order_by('current_users')
+        .values_list('id', 'service_id', 'max_concurrent_users', 'current_users')
+    )
+    assigned = 0
+    for login_id, service_id, max_users, current_users in logins:
+        waiting = by_service[service_id]
+        seats = waiting[:max_users - current_users]
+        if not seats:
+            continue
+        del waiting[:len(seats)]
+        UserService.objects.filter(pk__in=seats).update(login_service_id=login_id)
+        LoginService.objects.filter(pk=login_id).update(current_users=F('current_users') + len(seats))
+        assigned += len(seats)
+    return assigned
+
+def release_login_seats(seats):
+    """
+    Give back {login_service_id: seats} held by user services that lost their
+    login. Issues one UPDATE per LoginService. Must run inside a transaction.
+    """
+    for login_id, count in seats.items():
+        LoginService.objects.filter(pk=login_id).update(current_users=Greatest(F('current_users') - count, 0))
+    return sum(seats.values())
+
+def bulk_review(queryset, action, reviewer=None):
+    """
+    Approve or reject every pending UserService in queryset with a single
+    UPDATE/DELETE. Approvals get LoginService seats in the same transaction.
+    One user_services_reviewed signal is sent after commit.
+    """
+    with transaction.atomic():
+        rows = list(
+            queryset.select_for_update()
+            .filter(is_active=False, revoked_at__isnull=True, suspended_at__isnull=True)
+            .values_list('id', 'service_id', 'login_service_id', 'user_id')
+        )
+        ids = [row[0] for row in rows]
+        needs_seat = [(user_service_id, service_id) for user_service_id, service_id, login_id, _ in rows if login_id is None]
+        seats_assigned = 0
+        if ids and action == 'approve':
+            UserService.objects.filter(pk__in=ids).update(is_active=True)
+            seats_assigned = assign_login_seats(needs_seat)
+        elif ids and action == 'reject':
+            UserService.objects.filter(pk__in=ids).delete()
+
+        if ids:
+            # Bulk UPDATE/DELETE bypasses the per-row entitlement signals
+            user_ids = {row[3] for row in rows}
+            transaction.on_commit(lambda: refresh_user_entitlements(user_ids))
+            bump_users(user_ids)
+            transaction.on_commit(lambda: user_services_reviewed.send(
+                sender=UserService, action=action, user_service_ids=ids, reviewer=reviewer,
+            ))
+    return {
+        "action": action,
+        "count": len(ids),
+        "seats_assigned": seats_assigned,
+        "unassigned": len(needs_seat) - seats_assigned if action == 'approve' else 0,
+    }
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+class CookieManagementAppConfig(AppConfig):
+    name = 'cookie_management_app'
+
+    def ready(self):
+        # Connect the entitlement maintenance and version stamp receivers
+        from . import entitlements, stamps  # noqa: F401
@@ -0,0 +1,168 @@
+"""
+Maintenance of the UserEntitlement table.
+
+A user is entitled to a service while they have an active UserService for it
+and an active, unexpired UserSubscription whose plan (or selected_services)
+covers it. valid_until is the latest expiry among covering subscriptions.
+Rows are refreshed per user by signals and rebuilt in bounded chunks by
+reconcile_entitlements.
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from auth_app.models import User
+from core.conditional import bump
+from subscription_app.models import SubscriptionPlan, UserSubscription
+from .models import UserEntitlement, UserService, entitlement_id
+from .stamps import entitlements_scope
+
+def has_entitlement(user_id, service_id):
+    return UserEntitlement.objects.filter(
+        pk=entitlement_id(user_id, service_id), valid_until__gt=timezone.now()
+    ).exists()
+
+def get_entitlement(user_id, service_id):
+    return UserEntitlement.objects.filter(
+        pk=entitlement_id(user_id, service_id), valid_until__gt=timezone.now()
+    ).first()
+
+def compute_coverage(user_ids, now=None):
+    """
+    {(user_id, service_id): latest expiry} over the active, unexpired
+    subscriptions of user_ids (three queries).
+    """
+    now = now or timezone.now()
+    subscriptions = list(
+        UserSubscription.objects.filter(user_id__in=user_ids, is_active=True, expires_at__gt=now)
+        .values_list('id', 'user_id', 'subscription_id', 'expires_at')
+    )
+    if not subscriptions:
+        return {}
+
+    plan_services = {}
+    for plan_id, service_id in SubscriptionPlan.services.through.objects.filter(
+        subscriptionplan_id__in={plan_id for _, _, plan_id, _ in subscriptions}
+    ).values_list('subscriptionplan_id', 'service_id'):
+        plan_services.setdefault(plan_id, []).append(service_id)
+    selected_services = {}
+    for subscription_id, service_id in UserSubscription.selected_services.through.objects.filter(
+        usersubscription_id__in=[subscription_id for subscription_id, _, _, _ in subscriptions]
+    ).values_list('usersubscription_id', 'service_id'):
+        selected_services.setdefault(subscription_id, []).append(service_id)
+
+    coverage = {}
+    for subscription_id, user_id, plan_id, expires_at in subscriptions:
+        for service_id in plan_services.get(plan_id, []) + selected_services.get(subscription_id, []):
+            key = (user_id, service_id)
+            if coverage.get(key) is None or coverage[key] < expires_at:
+                coverage[key] = expires_at
+    return coverage
+
+def compute_entitlements(user_ids, now=None):
+    """Return the UserEntitlement rows that should exist for user_ids (four queries)."""
+    coverage = compute_coverage(user_ids, now)
+    if not coverage:
+        return []
+    rows = []
+    for user_id, service_id, login_service_id in UserService.objects.filter(
+        user_id__in=user_ids, is_active=True
+    ).values_list('user_id', 'service_id', 'login_service_id'):
+        valid_until = coverage.get((user_id, service_id))
+        if valid_until is not None:
+            rows.append(UserEntitlement(
+                id=entitlement_id(user_id, service_id),
+                user_id=user_id,
+                service_id=service_id,
+                login_service_id=login_service_id,
+                valid_until=valid_until,
+            ))
+    return rows
+
+def refresh_user_entitlements(user_ids, chunk_size=1000):
+    """Bring the entitlement rows of user_ids in line with the source tables."""
+    user_ids = list(user_ids)
+    refreshed = 0
+    for start in range(0, len(user_ids), chunk_size):
+        refreshed += _refresh_chunk(user_ids[start:start + chunk_size])
+    return refreshed
+
+def _refresh_chunk(user_ids):
+    rows = compute_entitlements(user_ids)
+    with transaction.atomic():
+        UserEntitlement.objects.filter(user_id__in=user_ids).exclude(pk__in=[row.pk for row in rows]).delete()
+        UserEntitlement.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['id'],
+            update_fields=['login_service', 'valid_until', 'updated_at'],
+        )
+        bump(*[entitlements_scope(user_id) for user_id in user_ids])
+    return len(rows)
+
+def reconcile_entitlements(chunk_size=1000):
+    """
+    Rebuild every user's entitlements, walking users by primary key in chunks
+    so memory stays bounded regardless of the number of users.
+    """
+    last_id = None
+    users = 0
+    while True:
+        queryset = User.objects.order_by('pk')
+        if last_id is not None:
+            queryset = queryset.filter(pk__gt=last_id)
+        chunk = list(queryset.values_list('pk', flat=True)[:chunk_size])
+        if not chunk:
+            return users
+        _refresh_chunk(chunk)
+        users += len(chunk)
+        last_id = chunk[-1]
+
+def refresh_plan_entitlements(plan_ids, chunk_size=1000):
+    """Refresh every subscriber of plan_ids, chunk by chunk."""
+    subscribers = (
+        UserSubscription.objects.filter(subscription_id__in=plan_ids, is_active=True)
+        .values_list('user_id', flat=True).distinct().order_by('user_id')
+    )
+    chunk = []
+    for user_id in subscribers.iterator(chunk_size=chunk_size):
+        chunk.append(user_id)
+        if len(chunk) == chunk_size:
+            _refresh_chunk(chunk)
+            chunk = []
+    if chunk:
+        _refresh_chunk(chunk)
+
+def _refresh_on_commit(user_ids):
+    user_ids = set(user_ids)
+    transaction.on_commit(lambda: refresh_user_entitlements(user_ids))
+
+@receiver(post_save, sender=UserService)
+@receiver(post_delete, sender=UserService)
+@receiver(post_save, sender=UserSubscription)
+@receiver(post_delete, sender=UserSubscription)
+def _user_rows_changed(sender, instance, **kwargs):
+    _refresh_on_commit([instance.user_id])
+
+@receiver(m2m_changed, sender=UserSubscription.selected_services.through)
+def _selected_services_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        _refresh_on_commit([instance.user_id])
+    elif pk_set:
+        _refresh_on_commit(UserSubscription.objects.filter(pk__in=pk_set).values_list('user_id', flat=True))
+    else:
+        _refresh_on_commit(instance.usersubscription_set.values_list('user_id', flat=True))
+
+@receiver(m2m_changed, sender=SubscriptionPlan.services.through)
+def _plan_services_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        plan_ids = [instance.pk]
+    elif pk_set:
+        plan_ids = list(pk_set)
+    else:
+        plan_ids = list(instance.subscriptionplan_set.values_list('pk', flat=True))
+    transaction.on_commit(lambda: refresh_plan_entitlements(plan_ids))
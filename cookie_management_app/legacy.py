@@ -0,0 +1,147 @@
+"""
+Merging the old cookie_app tables into the single cookie store.
+
+Rows are copied with their original ids, so merging is idempotent and can run
+online: merge_legacy_cookies walks the legacy table in primary-key batches
+while the API keeps serving. Until cut-over (COOKIE_LEGACY_READS off, or the
+legacy tables dropped) reads fall back to the legacy table and copy what they
+find, so a cookie is visible before the batch merge reaches it. Nothing
+writes to the legacy tables any more, so once a user's cookies are all
+copied a cache flag lets their reads skip the legacy lookups.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from core.conditional import bump
+from .models import (
+    Cookie, CookieInjectionLog, UserService,
+    LegacyCookie, LegacyCookieInjectionLog, LegacyUserService,
+)
+from .stamps import cookies_scope
+
+_tables_present = {}
+
+def legacy_table_exists(model):
+    table = model._meta.db_table
+    if table not in _tables_present:
+        _tables_present[table] = table in connection.introspection.table_names()
+    return _tables_present[table]
+
+def legacy_reads_enabled():
+    return settings.COOKIE_LEGACY_READS and legacy_table_exists(LegacyCookie)
+
+def _resolve_user_services(legacy_ids):
+    """
+    Map legacy user_service ids to UserService ids. Ids that already exist in
+    cookie_management_app map to themselves; the rest are matched on
+    (user, service) through the legacy user service table when it exists.
+    """
+    legacy_ids = set(legacy_ids)
+    mapping = {pk: pk for pk in UserService.objects.filter(id__in=legacy_ids).values_list('id', flat=True)}
+    remaining = legacy_ids - mapping.keys()
+    if not remaining or not legacy_table_exists(LegacyUserService):
+        return mapping
+    pairs = {
+        (user_id, service_id): pk
+        for pk, user_id, service_id in LegacyUserService.objects.filter(id__in=remaining).values_list('id', 'user_id', 'service_id')
+    }
+    if pairs:
+        users = {user_id for user_id, _ in pairs}
+        services = {service_id for _, service_id in pairs}
+        for pk, user_id, service_id in UserService.objects.filter(user_id__in=users, service_id__in=services).values_list('id', 'user_id', 'service_id'):
+            if (user_id, service_id) in pairs:
+                mapping[pairs[(user_id, service_id)]] = pk
+    return mapping
+
+def _copy(model, objs, created_field):
+    # bulk_create stamps auto_now_add fields on the instances; put the original times back
+    created = [getattr(obj, created_field) for obj in objs]
+    model.objects.bulk_create(objs, ignore_conflicts=True)
+    for obj, value in zip(objs, created):
+        setattr(obj, created_field, value)
+    model.objects.bulk_update(objs, [created_field])
+
+def _merge(rows):
+    """Copy legacy cookies (and their injection logs) into the store. Returns (merged, skipped)."""
+    if not rows:
+        return 0, 0
+    mapping = _resolve_user_services(row.user_service_id for row in rows)
+    cookies = [
+        Cookie(
+            id=row.id, user_service_id=mapping[row.user_service_id], cookie_data=row.cookie_data,
+            extracted_at=row.extracted_at, expires_at=row.expires_at, status=row.status,
+        )
+        for row in rows if row.user_service_id in mapping
+    ]
+    owners = dict(UserService.objects.filter(id__in=set(mapping.values())).values_list('id', 'user_id'))
+    cookie_users = {cookie.id: owners[cookie.user_service_id] for cookie in cookies}
+    logs = []
+    if cookies and legacy_table_exists(LegacyCookieInjectionLog):
+        logs = [
+            CookieInjectionLog(
+                id=log.id, cookie_id=log.cookie_id, user_id=cookie_users[log.cookie_id],
+                injection_status=log.injection_status, message=log.message, timestamp=log.timestamp,
+            )
+            for log in LegacyCookieInjectionLog.objects.filter(cookie_id__in=cookie_users)
+        ]
+    with transaction.atomic():
+        _copy(Cookie, cookies, 'extracted_at')
+        if logs:
+            _copy(CookieInjectionLog, logs, 'timestamp')
+        bump(*[cookies_scope(user_id) for user_id in set(cookie_users.values())])
+    return len(cookies), len(rows) - len(cookies)
+
+def merge_legacy_cookies(batch_size=500):
+    """Merge the whole legacy table, yielding (merged, skipped) per batch."""
+    last_pk = None
+    while True:
+        queryset = LegacyCookie.objects.order_by('pk')
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        rows = list(queryset[:batch_size])
+        if not rows:
+            return
+        yield _merge(rows)
+        last_pk = rows[-1].pk
+
+def _live(queryset):
+    # Read-through only picks up usable cookies, so rows the store has since
+    # expired or cleaned up are not brought back from the legacy table
+    return queryset.filter(status='valid', expires_at__gt=timezone.now()).exclude(id__in=Cookie.objects.values('id'))
+
+def merge_cookie(pk):
+    """Read-through for a single cookie. Returns True if one was copied."""
+    merged, _ = _merge(list(_live(LegacyCookie.objects.filter(pk=pk))))
+    return bool(merged)
+
+def _user_merged_key(user_id):
+    return f"legacy-cookies-merged:{user_id}"
+
+def user_merged(user_id):
+    """True once merge_user_cookies has copied everything the user had."""
+    return bool(cache.get(_user_merged_key(user_id)))
+
+def merge_user_cookies(user):
+    """Read-through for everything the user had in the legacy table."""
+    if user_merged(user.pk):
+        return 0, 0
+    legacy_ids = list(UserService.objects.filter(user=user).values_list('id', flat=True))
+    if legacy_table_exists(LegacyUserService):
+        legacy_ids += LegacyUserService.objects.filter(user_id=user.pk).values_list('id', flat=True)
+    merged, skipped = _merge(list(_live(LegacyCookie.objects.filter(user_service_id__in=legacy_ids))))
+    # Skipped rows may map once the user has the matching UserService, so keep looking
+    if not skipped:
+        key = _user_merged_key(user.pk)
+        transaction.on_commit(lambda: cache.set(key, 1, None))
+    return merged, skipped
+
+def unmerged_count():
+    return LegacyCookie.objects.exclude(id__in=Cookie.objects.values('id')).count()
+
+def drop_legacy_tables():
+    with connection.schema_editor() as editor:
+        for model in (LegacyCookieInjectionLog, LegacyCookie):
+            if legacy_table_exists(model):
+                editor.delete_model(model)
+    _tables_present.clear()
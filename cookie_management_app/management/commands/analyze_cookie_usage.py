@@ -0,0 +1,30 @@
+import time
+from django.core.management.base import BaseCommand
+from cookie_management_app.usage import UsageAnalyzer
+
+class Command(BaseCommand):
+    help = "Follow CookieInjectionLog and flag (or suspend) user services and shared accounts used from too many IPs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=30.0, help="Seconds between reads")
+        parser.add_argument('--once', action='store_true', help="Analyse the current window and exit")
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        analyzer = UsageAnalyzer()
+        while True:
+            read, flags = analyzer.run_once(options['batch_size'])
+            if read or flags or options['once']:
+                self.stdout.write(
+                    f"Read {read} log rows; tracking {len(analyzer.user_services)} user services and "
+                    f"{len(analyzer.login_services)} accounts; {len(flags)} flags raised."
+                )
+            for flag in flags:
+                subject = flag.user_service_id or flag.login_service_id
+                self.stdout.write(
+                    f"  {flag.kind} {subject}: {flag.distinct_ips} IPs (limit {flag.threshold})"
+                    + (" - suspended" if flag.suspended else "")
+                )
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,30 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from cookie_management_app.legacy import drop_legacy_tables, legacy_table_exists, merge_legacy_cookies, unmerged_count
+from cookie_management_app.models import LegacyCookie
+
+class Command(BaseCommand):
+    help = "Merge cookie_app's Cookie and CookieInjectionLog rows into cookie_management_app in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between batches")
+        parser.add_argument('--drop-legacy', action='store_true', help="Drop the legacy tables once every row is merged")
+
+    def handle(self, *args, **options):
+        if not legacy_table_exists(LegacyCookie):
+            self.stdout.write("No legacy cookie table; nothing to merge.")
+            return
+        merged = skipped = 0
+        for batch_merged, batch_skipped in merge_legacy_cookies(options['batch_size']):
+            merged += batch_merged
+            skipped += batch_skipped
+            if options['pause']:
+                time.sleep(options['pause'])
+        remaining = unmerged_count()
+        self.stdout.write(f"Merged {merged} cookies, skipped {skipped} without a matching user service; {remaining} not in the store.")
+        if options['drop_legacy']:
+            if remaining:
+                raise CommandError("Not dropping the legacy tables while rows are unmerged.")
+            drop_legacy_tables()
+            self.stdout.write(self.style.SUCCESS("Dropped the legacy cookie tables; set COOKIE_LEGACY_READS=0."))
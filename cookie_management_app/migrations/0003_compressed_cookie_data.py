@@ -0,0 +1,73 @@
+# Converts Cookie.cookie_data from a JSON column to the compressed, encrypted
+# binary format in core.fields, a chunk at a time.
+
+from django.db import migrations, models, transaction
+import core.fields
+
+CHUNK_SIZE = 500
+
+
+def _convert(apps, schema_editor, source, target, transform):
+    Cookie = apps.get_model("cookie_management_app", "Cookie")
+    manager = Cookie.objects.using(schema_editor.connection.alias)
+    last_pk = None
+    while True:
+        queryset = manager.order_by("pk")
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        rows = list(queryset.values_list("pk", source)[:CHUNK_SIZE])
+        if not rows:
+            return
+        with transaction.atomic(using=schema_editor.connection.alias):
+            manager.bulk_update(
+                [Cookie(pk=pk, **{target: transform(value)}) for pk, value in rows],
+                [target],
+            )
+        last_pk = rows[-1][0]
+
+
+def encode_cookie_data(apps, schema_editor):
+    _convert(apps, schema_editor, "cookie_data", "cookie_blob", lambda value: value)
+
+
+def decode_cookie_data(apps, schema_editor):
+    _convert(apps, schema_editor, "cookie_blob", "cookie_data", lambda value: value.value)
+
+
+class Migration(migrations.Migration):
+
+    # Each chunk commits on its own so large tables are not rewritten in one transaction
+    atomic = False
+
+    dependencies = [
+        ("cookie_management_app", "0002_user_entitlement"),
+    ]
+
+    operations = [
+        # Nullable while both columns exist, which also keeps the migration reversible
+        migrations.AlterField(
+            model_name="cookie",
+            name="cookie_data",
+            field=models.JSONField(null=True),
+        ),
+        migrations.AddField(
+            model_name="cookie",
+            name="cookie_blob",
+            field=core.fields.CompressedEncryptedJSONField(null=True),
+        ),
+        migrations.RunPython(encode_cookie_data, decode_cookie_data),
+        migrations.RemoveField(
+            model_name="cookie",
+            name="cookie_data",
+        ),
+        migrations.RenameField(
+            model_name="cookie",
+            old_name="cookie_blob",
+            new_name="cookie_data",
+        ),
+        migrations.AlterField(
+            model_name="cookie",
+            name="cookie_data",
+            field=core.fields.CompressedEncryptedJSONField(),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cookie_management_app", "0003_compressed_cookie_data"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LegacyCookie",
+            fields=[
+                ("id", models.UUIDField(primary_key=True, serialize=False)),
+                ("user_service_id", models.UUIDField()),
+                ("cookie_data", models.JSONField()),
+                ("extracted_at", models.DateTimeField()),
+                ("expires_at", models.DateTimeField()),
+                ("status", models.CharField(max_length=20)),
+            ],
+            options={
+                "db_table": "cookie_app_cookie",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="LegacyCookieInjectionLog",
+            fields=[
+                ("id", models.UUIDField(primary_key=True, serialize=False)),
+                ("cookie_id", models.UUIDField()),
+                ("injection_status", models.CharField(max_length=20)),
+                ("message", models.TextField()),
+                ("timestamp", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "cookie_app_cookieinjectionlog",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="LegacyUserService",
+            fields=[
+                ("id", models.UUIDField(primary_key=True, serialize=False)),
+                ("user_id", models.UUIDField()),
+                ("service_id", models.UUIDField()),
+            ],
+            options={
+                "db_table": "service_app_userservice",
+                "managed": False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name="cookie",
+            index=models.Index(
+                fields=["user_service", "status", "expires_at"],
+                name="cookie_mana_user_se_a7cb25_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:31
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cookie_management_app", "0004_consolidate_cookie_store"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UsageFlag",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("user_service_ips", "Too many IPs for one user"),
+                            ("login_service_ips", "Too many IPs on a shared account"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("distinct_ips", models.IntegerField()),
+                ("threshold", models.IntegerField()),
+                ("suspended", models.BooleanField(default=False)),
+                ("resolved", models.BooleanField(default=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="cookieinjectionlog",
+            index=models.Index(
+                fields=["timestamp", "id"], name="cookie_mana_timesta_2e0869_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="usageflag",
+            name="login_service",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="usage_flags",
+                to="cookie_management_app.loginservice",
+            ),
+        ),
+        migrations.AddField(
+            model_name="usageflag",
+            name="user_service",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="usage_flags",
+                to="cookie_management_app.userservice",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="usageflag",
+            index=models.Index(
+                fields=["resolved", "kind"], name="cookie_mana_resolve_50682e_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cookie_management_app", "0005_usage_flags"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userservice",
+            name="revoked_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
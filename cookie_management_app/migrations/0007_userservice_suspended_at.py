@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cookie_management_app", "0006_user_service_revoked_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userservice",
+            name="suspended_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
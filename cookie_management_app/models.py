@@ -1,8 +1,15 @@
 import uuid
 from django.db import models
+from core.fields import CompressedEncryptedJSONField
 from service_app.models import Service
 from auth_app.models import User
 
+# Namespace for the deterministic UserEntitlement primary keys
+ENTITLEMENT_NAMESPACE = uuid.UUID('5b0c7a52-8f0e-4a3e-9d6b-2f1e6c9a4d17')
+
+def entitlement_id(user_id, service_id):
+    return uuid.uuid5(ENTITLEMENT_NAMESPACE, f"{user_id}:{service_id}")
+
 class LoginService(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='login_credentials')
@@ -26,6 +33,12 @@ class UserService(models.Model):
     is_active = models.BooleanField(default=True)
     assigned_at = models.DateTimeField(auto_now_add=True)
     last_accessed = models.DateTimeField(null=True, blank=True)
+    # Set when access lapsed with the subscriptions covering it; revoked rows
+    # are not pending requests and come back when coverage does
+    revoked_at = models.DateTimeField(null=True, blank=True)
+    # Set when usage analysis suspended it for account sharing; suspended rows
+    # are not pending requests either, and only an admin brings them back
+    suspended_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         unique_together = ['user', 'service']
@@ -38,13 +51,18 @@ class Cookie(models.Model):
     ]
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user_service = models.ForeignKey(UserService, on_delete=models.CASCADE, related_name='cookies')
-    cookie_data = models.JSONField()
+    cookie_data = CompressedEncryptedJSONField()
     session_id = models.CharField(max_length=255, null=True, blank=True)
     extracted_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField()
     last_validated = models.DateTimeField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_service', 'status', 'expires_at']),
+        ]
+
     def is_expired(self):
         from django.utils import timezone
         return timezone.now() > self.expires_at
@@ -63,3 +81,88 @@ class CookieInjectionLog(models.Model):
     message = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # High-water mark scans of cookie_management_app.usage
+            models.Index(fields=['timestamp', 'id']),
+        ]
+
+class UsageFlag(models.Model):
+    """
+    Cookie use from more distinct IPs than allowed within the analysis
+    window, raised by cookie_management_app.usage. user_service is set for
+    'user_service_ips' flags, login_service for 'login_service_ips'.
+    """
+    KIND_CHOICES = [
+        ('user_service_ips', 'Too many IPs for one user'),
+        ('login_service_ips', 'Too many IPs on a shared account'),
+    ]
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    user_service = models.ForeignKey(UserService, on_delete=models.CASCADE, null=True, blank=True, related_name='usage_flags')
+    login_service = models.ForeignKey(LoginService, on_delete=models.CASCADE, null=True, blank=True, related_name='usage_flags')
+    distinct_ips = models.IntegerField()
+    threshold = models.IntegerField()
+    suspended = models.BooleanField(default=False)
+    resolved = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['resolved', 'kind']),
+        ]
+
+class UserEntitlement(models.Model):
+    """
+    Denormalized "user may use this service until valid_until" rows, keyed by
+    entitlement_id(user, service) so access checks are a primary-key lookup.
+    Maintained by cookie_management_app.entitlements.
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='entitlements')
+    service = models.ForeignKey(Service, on_delete=models.CASCADE)
+    login_service = models.ForeignKey(LoginService, on_delete=models.SET_NULL, null=True, blank=True)
+    valid_until = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['valid_until']),
+        ]
+
+# Tables left behind by the old cookie_app models. They are only read while
+# merging into Cookie/CookieInjectionLog (see cookie_management_app.legacy)
+# and are never created or altered by migrations.
+
+class LegacyUserService(models.Model):
+    id = models.UUIDField(primary_key=True)
+    user_id = models.UUIDField()
+    service_id = models.UUIDField()
+
+    class Meta:
+        managed = False
+        db_table = 'service_app_userservice'
+
+class LegacyCookie(models.Model):
+    id = models.UUIDField(primary_key=True)
+    user_service_id = models.UUIDField()
+    cookie_data = models.JSONField()
+    extracted_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+    status = models.CharField(max_length=20)
+
+    class Meta:
+        managed = False
+        db_table = 'cookie_app_cookie'
+
+class LegacyCookieInjectionLog(models.Model):
+    id = models.UUIDField(primary_key=True)
+    cookie_id = models.UUIDField()
+    injection_status = models.CharField(max_length=20)
+    message = models.TextField()
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = 'cookie_app_cookieinjectionlog'
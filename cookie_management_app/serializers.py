@@ -1,10 +1,26 @@
 from rest_framework import serializers
+from core.fields import EncryptedJSONSerializerField
+from core.utils import encrypt_data
 from .models import LoginService, UserService, Cookie, CookieInjectionLog
 
 class LoginServiceSerializer(serializers.ModelSerializer):
+    # Taken in plain text and stored encrypted; the stored token is never returned
+    password = serializers.CharField(write_only=True, trim_whitespace=False)
+
     class Meta:
         model = LoginService
-        fields = '__all__'
+        exclude = ['encrypted_password']
+
+    def _encrypt_password(self, validated_data):
+        if 'password' in validated_data:
+            validated_data['encrypted_password'] = encrypt_data(validated_data.pop('password')).decode()
+        return validated_data
+
+    def create(self, validated_data):
+        return super().create(self._encrypt_password(validated_data))
+
+    def update(self, instance, validated_data):
+        return super().update(instance, self._encrypt_password(validated_data))
 
 class UserServiceSerializer(serializers.ModelSerializer):
     class Meta:
@@ -12,6 +28,7 @@ class UserServiceSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 class CookieSerializer(serializers.ModelSerializer):
+    cookie_data = EncryptedJSONSerializerField()
     class Meta:
         model = Cookie
         fields = '__all__'
@@ -20,3 +37,28 @@ class CookieInjectionLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = CookieInjectionLog
         fields = '__all__'
+
+class BulkUserServiceReviewSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(choices=['approve', 'reject'])
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False, allow_empty=False)
+    service = serializers.UUIDField(required=False)
+    user = serializers.UUIDField(required=False)
+    requested_before = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        if not attrs.get('ids') and not any(key in attrs for key in ('service', 'user', 'requested_before')):
+            raise serializers.ValidationError("Provide ids or at least one filter (service, user, requested_before).")
+        return attrs
+
+    def get_queryset(self):
+        queryset = UserService.objects.all()
+        data = self.validated_data
+        if data.get('ids'):
+            queryset = queryset.filter(pk__in=data['ids'])
+        if 'service' in data:
+            queryset = queryset.filter(service_id=data['service'])
+        if 'user' in data:
+            queryset = queryset.filter(user_id=data['user'])
+        if 'requested_before' in data:
+            queryset = queryset.filter(assigned_at__lte=data['requested_before'])
+        return queryset
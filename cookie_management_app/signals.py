@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+# Sent once per bulk approve/reject with action, user_service_ids and reviewer
+user_services_reviewed = Signal()
@@ -0,0 +1,51 @@
+"""
+Version stamp scopes (core.conditional) for user services, cookies and
+entitlements.
+
+Per-user scopes keep one user's changes from invalidating everyone else's
+ETags. Bulk cookie writes whose owners are not at hand bump COOKIES, which
+every cookie view includes.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from core.conditional import bump
+from .models import Cookie, UserService
+
+USER_SERVICES = 'user-services'
+COOKIES = 'cookies'
+
+def user_services_scope(user_id):
+    return f"user-services:{user_id}"
+
+def cookies_scope(user_id):
+    return f"cookies:{user_id}"
+
+def cookie_scope(cookie_id):
+    return f"cookie:{cookie_id}"
+
+def entitlements_scope(user_id):
+    return f"entitlements:{user_id}"
+
+def bump_users(user_ids):
+    """After bulk writes to the UserService rows (and so cookies) of user_ids."""
+    user_ids = set(user_ids)
+    bump(
+        USER_SERVICES,
+        *[user_services_scope(user_id) for user_id in user_ids],
+        *[cookies_scope(user_id) for user_id in user_ids],
+    )
+
+@receiver(post_save, sender=UserService)
+@receiver(post_delete, sender=UserService)
+def _user_service_changed(sender, instance, **kwargs):
+    bump_users([instance.user_id])
+
+@receiver(post_save, sender=Cookie)
+def _cookie_changed(sender, instance, **kwargs):
+    owner = UserService.objects.filter(pk=instance.user_service_id).values_list('user_id', flat=True).first()
+    bump(cookie_scope(instance.pk), *([cookies_scope(owner)] if owner is not None else []))
+
+@receiver(post_delete, sender=Cookie)
+def _cookie_deleted(sender, instance, **kwargs):
+    # Deletes come in bulk (cleanup, cascades); the owner lookup isn't worth it
+    bump(COOKIES)
@@ -1,7 +1,18 @@
 from django.urls import path
-from .views import AddLoginServiceView, GetCookieDataView
+from .views import (
+    AddLoginServiceView,
+    CookieListView,
+    GetCookieDataView,
+    ListPendingUserServiceRequestsView,
+    ApproveUserServiceRequestView,
+    BulkReviewUserServiceRequestsView,
+)
 
 urlpatterns = [
     path('login_services/add/', AddLoginServiceView.as_view(), name='loginservice-add'),
+    path('cookies/', CookieListView.as_view(), name='cookie-list'),
     path('cookies/<uuid:pk>/', GetCookieDataView.as_view(), name='cookie-detail'),
+    path('user_services/pending/', ListPendingUserServiceRequestsView.as_view(), name='userservice-pending-list'),
+    path('user_services/<uuid:pk>/approve/', ApproveUserServiceRequestView.as_view(), name='userservice-approve'),
+    path('user_services/bulk_review/', BulkReviewUserServiceRequestsView.as_view(), name='userservice-bulk-review'),
 ]
@@ -0,0 +1,144 @@
+"""
+Account-sharing detection over CookieInjectionLog.
+
+UsageAnalyzer reads log rows incrementally past a (timestamp, id)
+high-water mark and counts the distinct IPs behind each UserService and
+each shared LoginService over the last COOKIE_USAGE_WINDOW_SECONDS, with
+HyperLogLog sketches kept in memory. Going over the thresholds raises a
+UsageFlag; with COOKIE_USAGE_AUTO_SUSPEND the UserService is also
+suspended (deactivated, suspended_at set, its LoginService seat given back
+and its cookies expired) once it passes COOKIE_USAGE_SUSPEND_IPS_PER_USER.
+
+State is not persisted: a new analyzer starts one window back, so a
+restarted `manage.py analyze_cookie_usage` rebuilds the same sketches.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from core.hyperloglog import SlidingDistinctCounter
+from .approvals import release_login_seats
+from .models import Cookie, CookieInjectionLog, LoginService, UsageFlag, UserService
+
+def _suspend(user_service):
+    with transaction.atomic():
+        login_service_id = user_service.login_service_id
+        user_service.is_active = False
+        user_service.login_service = None
+        user_service.suspended_at = timezone.now()
+        # save() so the entitlement and stamp signals revoke access
+        user_service.save(update_fields=['is_active', 'login_service', 'suspended_at'])
+        if login_service_id is not None:
+            release_login_seats({login_service_id: 1})
+        Cookie.objects.filter(user_service=user_service, status='valid').update(status='expired')
+
+class UsageAnalyzer:
+    def __init__(self, now=None):
+        window = settings.COOKIE_USAGE_WINDOW_SECONDS
+        buckets = settings.COOKIE_USAGE_WINDOW_BUCKETS
+        self.user_services = SlidingDistinctCounter(window, buckets)
+        self.login_services = SlidingDistinctCounter(window, buckets)
+        # (timestamp, id) of the last row read; None id means "from timestamp on"
+        self.mark = ((now or timezone.now()) - timedelta(seconds=window), None)
+
+    def _read(self, until, batch_size):
+        since, last_id = self.mark
+        rows = CookieInjectionLog.objects.filter(timestamp__lte=until)
+        if last_id is None:
+            rows = rows.filter(timestamp__gte=since)
+        else:
+            rows = rows.filter(Q(timestamp__gt=since) | Q(timestamp=since, id__gt=last_id))
+        return list(
+            rows.order_by('timestamp', 'id')
+            .values_list('id', 'timestamp', 'ip_address', 'cookie__user_service_id', 'cookie__user_service__login_service_id')
+            [:batch_size]
+        )
+
+    def run_once(self, batch_size=None):
+        """Reads every new row and raises flags; returns (rows read, flags raised or updated)."""
+        batch_size = batch_size or settings.COOKIE_USAGE_BATCH_SIZE
+        now = timezone.now()
+        # Rows still being committed can carry a timestamp just behind the
+        # mark; lagging the read keeps them from being skipped
+        until = now - timedelta(seconds=settings.COOKIE_USAGE_READ_LAG_SECONDS)
+        read = 0
+        user_service_ids, login_service_ids = set(), set()
+        while True:
+            rows = self._read(until, batch_size)
+            if not rows:
+                break
+            for _, timestamp, ip_address, user_service_id, login_service_id in rows:
+                if not ip_address:
+                    continue
+                seconds = timestamp.timestamp()
+                self.user_services.add(user_service_id, ip_address, seconds)
+                user_service_ids.add(user_service_id)
+                if login_service_id is not None:
+                    self.login_services.add(login_service_id, ip_address, seconds)
+                    login_service_ids.add(login_service_id)
+            self.mark = (rows[-1][1], rows[-1][0])
+            read += len(rows)
+        now = now.timestamp()
+        self.user_services.expire(now)
+        self.login_services.expire(now)
+        return read, self._check_user_services(user_service_ids, now) + self._check_login_services(login_service_ids, now)
+
+    def _check_user_services(self, user_service_ids, now):
+        threshold = settings.COOKIE_USAGE_MAX_IPS_PER_USER
+        over = {}
+        for user_service_id in user_service_ids:
+            count = self.user_services.count(user_service_id, now)
+            if count > threshold:
+                over[user_service_id] = count
+        if not over:
+            return []
+        open_flags = {
+            flag.user_service_id: flag
+            for flag in UsageFlag.objects.filter(kind='user_service_ips', resolved=False, user_service_id__in=over)
+        }
+        raised = []
+        for user_service in UserService.objects.filter(pk__in=over):
+            count = over[user_service.pk]
+            suspend = (
+                settings.COOKIE_USAGE_AUTO_SUSPEND and user_service.is_active
+                and count > settings.COOKIE_USAGE_SUSPEND_IPS_PER_USER
+            )
+            if suspend:
+                _suspend(user_service)
+            flag = open_flags.get(user_service.pk)
+            if flag is None:
+                flag = UsageFlag.objects.create(
+                    kind='user_service_ips', user_service=user_service,
+                    distinct_ips=count, threshold=threshold, suspended=suspend,
+                )
+            elif suspend or count > flag.distinct_ips:
+                flag.distinct_ips = max(count, flag.distinct_ips)
+                flag.suspended = flag.suspended or suspend
+                flag.save(update_fields=['distinct_ips', 'suspended'])
+            else:
+                continue
+            raised.append(flag)
+        return raised
+
+    def _check_login_services(self, login_service_ids, now):
+        if not login_service_ids:
+            return []
+        seats = dict(LoginService.objects.filter(pk__in=login_service_ids).values_list('id', 'max_concurrent_users'))
+        over = {}
+        for login_service_id, max_users in seats.items():
+            threshold = max_users * settings.COOKIE_USAGE_IPS_PER_SEAT
+            count = self.login_services.count(login_service_id, now)
+            if count > threshold:
+                over[login_service_id] = (count, threshold)
+        if not over:
+            return []
+        flagged = set(
+            UsageFlag.objects.filter(kind='login_service_ips', resolved=False, login_service_id__in=over)
+            .values_list('login_service_id', flat=True)
+        )
+        return UsageFlag.objects.bulk_create([
+            UsageFlag(kind='login_service_ips', login_service_id=login_service_id, distinct_ips=count, threshold=threshold)
+            for login_service_id, (count, threshold) in over.items()
+            if login_service_id not in flagged
+        ])
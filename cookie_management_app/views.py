@@ -1,7 +1,15 @@
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from .models import LoginService, Cookie, UserService
-from .serializers import LoginServiceSerializer, CookieSerializer, UserServiceSerializer
+from .serializers import LoginServiceSerializer, CookieSerializer, UserServiceSerializer, BulkUserServiceReviewSerializer
+from .approvals import bulk_review
+from .entitlements import has_entitlement
+from core.values_serializers import ValuesListMixin
+from core.db_routing import ReplicaReadMixin
+from core.conditional import ConditionalGetMixin
+from .legacy import legacy_reads_enabled, merge_cookie, merge_user_cookies, user_merged
+from .stamps import COOKIES, USER_SERVICES, cookie_scope, cookies_scope, entitlements_scope, user_services_scope
+from django.http import Http404
 from django.utils import timezone
 
 class AddLoginServiceView(generics.CreateAPIView):
@@ -15,34 +23,75 @@ class AddLoginServiceView(generics.CreateAPIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class GetCookieDataView(generics.RetrieveAPIView):
+class CookieListView(ConditionalGetMixin, ReplicaReadMixin, ValuesListMixin, generics.ListAPIView):
     serializer_class = CookieSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_stamp_scopes(self):
+        user_id = self.request.user.pk
+        # Reads copy legacy rows, which the stamps don't see, until the user's are merged
+        if legacy_reads_enabled() and not user_merged(user_id):
+            return None
+        return [COOKIES, cookies_scope(user_id), user_services_scope(user_id)]
+
     queryset = Cookie.objects.all()
+
+    def get_queryset(self):
+        if legacy_reads_enabled():
+            # Merging writes (until the user's cookies are all merged), which
+            # keeps the rest of the request on the primary
+            merge_user_cookies(self.request.user)
+        # Through ReplicaReadMixin, which picks the database
+        return super().get_queryset().filter(user_service__user=self.request.user)
+
+class GetCookieDataView(ConditionalGetMixin, generics.RetrieveAPIView):
+    serializer_class = CookieSerializer
+    queryset = Cookie.objects.select_related('user_service')
     permission_classes = [permissions.IsAuthenticated]
+    # Cookies expire and entitlements lapse without a write
+    clock_dependent = True
 
-    def get(self, request, *args, **kwargs):
+    def get_stamp_scopes(self):
+        if legacy_reads_enabled():
+            return None
+        return [COOKIES, cookie_scope(self.kwargs['pk']), entitlements_scope(self.request.user.pk)]
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            # Not merged from cookie_app yet
+            if legacy_reads_enabled() and merge_cookie(self.kwargs['pk']):
+                return super().get_object()
+            raise
+
+    def retrieve(self, request, *args, **kwargs):
         try:
             cookie = self.get_object()
             if cookie.status != 'valid' or cookie.expires_at < timezone.now():
                 return Response({"detail": "Cookie expired or invalid."}, status=status.HTTP_400_BAD_REQUEST)
             # Check if user has access to this cookie's service
-            user = request.user
-            if not UserService.objects.filter(user=user, service=cookie.login_service.service, status='active').exists():
+            if not has_entitlement(request.user.id, cookie.user_service.service_id):
                 return Response({"detail": "Access denied for this cookie."}, status=status.HTTP_403_FORBIDDEN)
             return Response(self.get_serializer(cookie).data)
+        except Http404:
+            raise
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class ListPendingUserServiceRequestsView(generics.ListAPIView):
+class ListPendingUserServiceRequestsView(ConditionalGetMixin, ValuesListMixin, generics.ListAPIView):
     """
     Admin view to list all pending user service access requests.
     """
     serializer_class = UserServiceSerializer
     permission_classes = [permissions.IsAdminUser]
+    stamp_scopes = (USER_SERVICES,)
 
     def get_queryset(self):
-        # Filter UserService objects where is_active is False (pending)
-        return UserService.objects.filter(is_active=False)
+        # Filter UserService objects where is_active is False (pending);
+        # revoked ones lapsed with a subscription and suspended ones were
+        # taken away for account sharing, so neither is a request
+        return UserService.objects.filter(is_active=False, revoked_at__isnull=True, suspended_at__isnull=True)
 
 class ApproveUserServiceRequestView(generics.UpdateAPIView):
     """
@@ -50,11 +99,27 @@ class ApproveUserServiceRequestView(generics.UpdateAPIView):
     """
     serializer_class = UserServiceSerializer
     permission_classes = [permissions.IsAdminUser]
-    queryset = UserService.objects.filter(is_active=False)
+    queryset = UserService.objects.filter(is_active=False, revoked_at__isnull=True, suspended_at__isnull=True)
 
     def patch(self, request, *args, **kwargs):
         user_service = self.get_object()
-        user_service.is_active = True
-        user_service.save()
+        # Same path as bulk approvals, so the user service gets a LoginService seat
+        bulk_review(UserService.objects.filter(pk=user_service.pk), 'approve', request.user)
+        user_service.refresh_from_db()
         serializer = self.get_serializer(user_service)
         return Response(serializer.data)
+
+class BulkReviewUserServiceRequestsView(generics.GenericAPIView):
+    """
+    Admin view to approve or reject many pending user service access
+    requests at once, selected by ids or by service/user/requested_before.
+    """
+    serializer_class = BulkUserServiceReviewSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        result = bulk_review(serializer.get_queryset(), serializer.validated_data['action'], reviewer=request.user)
+        return Response(result)
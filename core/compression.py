@@ -0,0 +1,94 @@
+"""
+Negotiated response compression.
+
+CompressionMiddleware compresses responses of at least COMPRESSION_MIN_BYTES
+whose content type is text-like, with the best coding the client accepts:
+brotli when the brotli module is installed, else gzip. Small bodies go out
+as they are; below about a kilobyte compression saves nothing worth the CPU.
+
+A compressed body is a different representation, so a strong ETag set by the
+view is made weak (as Django's GZipMiddleware does). Views compare
+If-None-Match weakly, so revalidating with it still gets a 304.
+"""
+import gzip
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/yaml', 'application/javascript', 'application/xml', 'text/')
+
+def _compress_gzip(data):
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+def _compress_brotli(data):
+    return brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+def available_codings():
+    """[(coding, compress)] in order of preference."""
+    codings = [('gzip', _compress_gzip)]
+    if brotli is not None:
+        codings.insert(0, ('br', _compress_brotli))
+    return codings
+
+def parse_accept_encoding(header):
+    """{coding: q} from an Accept-Encoding header."""
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+def choose_coding(header):
+    """(coding, compress) the client prefers among available_codings(), or None."""
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding, compress in available_codings():
+        q = accepted.get(coding, accepted.get('*', 0.0))
+        # Ties go to the server's preference, which comes first
+        if q > best_q:
+            best, best_q = (coding, compress), q
+    return best
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not settings.COMPRESSION_ENABLED or response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if not content_type.startswith(COMPRESSIBLE_TYPES) or len(response.content) < settings.COMPRESSION_MIN_BYTES:
+            return response
+        # Whether it is compressed depends on the request from here on
+        patch_vary_headers(response, ('Accept-Encoding',))
+        chosen = choose_coding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if chosen is None:
+            return response
+        coding, compress = chosen
+        compressed = compress(response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = coding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
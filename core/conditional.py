@@ -0,0 +1,117 @@
+"""
+Conditional GET from version stamps.
+
+Each scope of data a view reads ('services', 'cookies:<user id>', ...) has a
+stamp in the cache: a random token replaced, once the writing transaction
+commits, whenever something in the scope changes. ConditionalGetMixin builds
+a view's ETag from the stamps of its scopes and the request, so answering
+If-None-Match costs one cache read, and a match returns 304 before the view
+queries or serializes anything.
+
+A missing stamp (evicted, or never written) is created fresh. That changes
+the ETag, so losing stamps costs a full response, never a stale 304. Model
+receivers bump stamps on save/delete; bulk writes that bypass them call
+bump() themselves.
+"""
+import hashlib
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+def _key(scope):
+    return f"version:{scope}"
+
+def _new_stamp():
+    # The time lets readers tell how recently the scope changed
+    return f"{uuid.uuid4().hex}:{time.time():.3f}"
+
+def bump(*scopes):
+    """Replace the stamps of scopes once the current transaction commits."""
+    if not scopes:
+        return
+    transaction.on_commit(lambda: cache.set_many(
+        {_key(scope): _new_stamp() for scope in scopes}, settings.VERSION_STAMP_TIMEOUT,
+    ))
+
+def get_stamps(scopes):
+    """Current stamps of scopes, in order, creating any that are missing."""
+    keys = [_key(scope) for scope in scopes]
+    stamps = cache.get_many(keys)
+    missing = [key for key in keys if key not in stamps]
+    if missing:
+        for key in missing:
+            # add() so concurrent requests settle on the same stamp
+            cache.add(key, _new_stamp(), settings.VERSION_STAMP_TIMEOUT)
+        stamps.update(cache.get_many(missing))
+    return [stamps.get(key) or _new_stamp() for key in keys]
+
+def settled(stamps):
+    """
+    False while replicas may still lag behind a change: a stamp newer than
+    REPLICA_STICKY_SECONDS could be paired with a body read from a replica
+    that has not seen the write yet.
+    """
+    if not settings.DATABASE_REPLICAS:
+        return True
+    oldest_allowed = time.time() - settings.REPLICA_STICKY_SECONDS
+    return all(float(stamp.rpartition(':')[2] or 0) <= oldest_allowed for stamp in stamps)
+
+def etag_matches(etag, if_none_match):
+    """Weak comparison, as If-None-Match requires."""
+    if not if_none_match:
+        return False
+    tags = parse_etags(if_none_match)
+    if tags == ['*']:
+        return True
+    etag = etag.removeprefix('W/')
+    return any(tag.removeprefix('W/') == etag for tag in tags)
+
+class ConditionalGetMixin:
+    """
+    For generic API views: a strong ETag from version stamps on GET, and a 304
+    without running the view when If-None-Match matches it. The ETag covers
+    the view, path and query string, Accept header and user, so a view only
+    lists the scopes its data comes from.
+    """
+    stamp_scopes = ()
+    # Output that changes as time passes (expiry checks) also depends on the
+    # clock, in ETAG_CLOCK_SECONDS steps
+    clock_dependent = False
+
+    def get_stamp_scopes(self):
+        """Scopes of the data behind this request, or None for no ETag."""
+        return self.stamp_scopes
+
+    def get_etag(self, request):
+        scopes = self.get_stamp_scopes()
+        if scopes is None:
+            return None
+        stamps = get_stamps(scopes)
+        if not settled(stamps):
+            return None
+        parts = [
+            f"{type(self).__module__}.{type(self).__qualname__}", request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''), str(request.user.pk), *stamps,
+        ]
+        if self.clock_dependent:
+            parts.append(str(int(time.time() // settings.ETAG_CLOCK_SECONDS)))
+        return '"%s"' % hashlib.blake2b('\n'.join(parts).encode(), digest_size=16).hexdigest()
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag(request) if settings.CONDITIONAL_GET_ENABLED else None
+        if etag is not None and etag_matches(etag, request.META.get('HTTP_IF_NONE_MATCH')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().get(request, *args, **kwargs)
+        if etag is not None and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            # Clients and proxies must revalidate, and never share a user's copy
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ('Authorization',))
+        return response
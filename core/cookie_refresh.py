@@ -0,0 +1,101 @@
+"""
+Expiry-ordered cookie pre-refresh scheduling.
+
+Every LoginService's earliest valid cookie expiry is pushed onto a heap as
+"refresh at expires_at - lead time". Refreshes are packed into fixed-size
+time slots with a per-slot cap; when a slot is full the refresh moves to the
+latest earlier slot with room (refreshing early is safe, refreshing late is
+not), which flattens bursts instead of letting them hit the workers at once.
+"""
+import heapq
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Min
+from django.utils import timezone
+from cookie_management_app.models import Cookie
+
+def lead_time():
+    return timedelta(seconds=settings.COOKIE_REFRESH_LEAD_SECONDS)
+
+def slot_length():
+    return timedelta(seconds=settings.COOKIE_REFRESH_SLOT_SECONDS)
+
+def upcoming_expiries(now, horizon):
+    """(expires_at, login_service_id) for login services whose earliest valid cookie expires within horizon."""
+    rows = (
+        Cookie.objects.filter(
+            status='valid',
+            expires_at__lte=now + lead_time() + horizon,
+            user_service__login_service__isnull=False,
+        )
+        .values('user_service__login_service')
+        .annotate(expires_at=Min('expires_at'))
+        .values_list('expires_at', 'user_service__login_service')
+    )
+    return list(rows)
+
+def plan_refreshes(expiries, start, max_per_slot, lead=None, slot=None, cookie_ttl=None, end=None):
+    """
+    Assign each (expires_at, key) to a slot index relative to start.
+    Returns {slot_index: [key, ...]}. Overdue entries land in slot 0.
+
+    With cookie_ttl and end set, every refresh is assumed to produce a cookie
+    that expires cookie_ttl later and is scheduled again if that falls before
+    end; this is what the simulation uses to replay a whole day.
+    """
+    lead = lead or lead_time()
+    slot = slot or slot_length()
+    heap = [(expires_at - lead, expires_at, key) for expires_at, key in expiries]
+    heapq.heapify(heap)
+    load = Counter()
+    plan = {}
+    while heap:
+        refresh_at, expires_at, key = heapq.heappop(heap)
+        desired = max(0, int((refresh_at - start) / slot))
+        deadline = max(desired, int((expires_at - start) / slot))
+        chosen = next((index for index in range(desired, -1, -1) if load[index] < max_per_slot), None)
+        if chosen is None:
+            # Everything up to now is full: take the first free slot before the cookie expires
+            chosen = next((index for index in range(desired + 1, deadline + 1) if load[index] < max_per_slot), deadline)
+        load[chosen] += 1
+        plan.setdefault(chosen, []).append(key)
+        if cookie_ttl is not None and end is not None:
+            refreshed_at = start + chosen * slot
+            next_expiry = refreshed_at + cookie_ttl
+            if next_expiry - lead < end:
+                heapq.heappush(heap, (next_expiry - lead, next_expiry, key))
+    return plan
+
+def due_login_services(now=None):
+    """LoginService ids whose refresh falls into the current slot."""
+    now = now or timezone.now()
+    horizon = timedelta(seconds=settings.COOKIE_REFRESH_HORIZON_SECONDS)
+    plan = plan_refreshes(upcoming_expiries(now, horizon), now, settings.COOKIE_REFRESH_MAX_PER_SLOT)
+    return plan.get(0, [])
+
+def batches(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def simulate(expiries, start, duration, max_per_slot, cookie_ttl, lead=None, slot=None):
+    """
+    Replay refreshes for [start, start + duration) without touching the
+    database. Returns (naive, scheduled) load per slot: naive refreshes
+    everything exactly lead time before expiry, scheduled uses the planner.
+    """
+    lead = lead or lead_time()
+    slot = slot or slot_length()
+    end = start + duration
+    naive = Counter()
+    heap = list(expiries)
+    heapq.heapify(heap)
+    while heap:
+        expires_at, key = heapq.heappop(heap)
+        refresh_at = max(start, expires_at - lead)
+        naive[int((refresh_at - start) / slot)] += 1
+        if refresh_at + cookie_ttl - lead < end:
+            heapq.heappush(heap, (refresh_at + cookie_ttl, key))
+    plan = plan_refreshes(expiries, start, max_per_slot, lead, slot, cookie_ttl, end)
+    scheduled = Counter({index: len(keys) for index, keys in plan.items()})
+    return naive, scheduled
@@ -0,0 +1,101 @@
+"""
+Read replicas for read-heavy endpoints.
+
+Only views and admins that opt in (ReplicaReadMixin, ReplicaAdminMixin) read
+from settings.DATABASE_REPLICAS, and only for safe requests. Everything else
+keeps reading from 'default'. Writes always go to 'default'. Once a user has
+written, their reads stay on the primary for REPLICA_STICKY_SECONDS, so they
+see their own changes before the replica catches up.
+"""
+import random
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+# Per-request flag set when anything is written, consumed by PrimaryPinMiddleware
+_wrote = ContextVar('db_routing_wrote', default=None)
+
+def _pin_key(user_id):
+    return f"db-pin:{user_id}"
+
+def pin_to_primary(user_id):
+    cache.set(_pin_key(user_id), 1, settings.REPLICA_STICKY_SECONDS)
+
+def is_pinned(user_id):
+    return cache.get(_pin_key(user_id)) is not None
+
+def replica_for(request):
+    """Replica alias for this request, or None when it must use the primary."""
+    if not settings.DATABASE_REPLICAS or request.method not in SAFE_METHODS:
+        return None
+    wrote = _wrote.get()
+    if wrote is not None and wrote[0]:
+        return None
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and is_pinned(user.pk):
+        return None
+    return random.choice(settings.DATABASE_REPLICAS)
+
+class ReplicaRouter:
+    """
+    Sends every write to 'default'. Reads return None, so Django uses the
+    database the queryset or instance came from: 'default' unless a mixin
+    chose a replica with .using().
+    """
+
+    def db_for_read(self, model, **hints):
+        return None
+
+    def db_for_write(self, model, **hints):
+        wrote = _wrote.get()
+        if wrote is not None:
+            wrote[0] = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+class PrimaryPinMiddleware:
+    """Pins the user to the primary after a request that wrote to the database."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        wrote = [False]
+        token = _wrote.set(wrote)
+        try:
+            response = self.get_response(request)
+        finally:
+            _wrote.reset(token)
+        # DRF copies the JWT-authenticated user onto the Django request
+        user = getattr(request, 'user', None)
+        if wrote[0] and settings.DATABASE_REPLICAS and user is not None and user.is_authenticated:
+            pin_to_primary(user.pk)
+        return response
+
+class ReplicaReadMixin:
+    """For generic API views: serve safe requests from a replica."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        alias = replica_for(self.request)
+        return queryset.using(alias) if alias else queryset
+
+class ReplicaAdminMixin:
+    """For ModelAdmin: read the changelist from a replica."""
+
+    def changelist_view(self, request, extra_context=None):
+        # POSTs (actions, list_editable) stay on the primary
+        request._replica_alias = replica_for(request)
+        return super().changelist_view(request, extra_context)
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        alias = getattr(request, '_replica_alias', None)
+        return queryset.using(alias) if alias else queryset
@@ -0,0 +1,92 @@
+"""
+Local stand-in for a target service's login page, with injectable latency
+and errors, for exercising login automation and the service guards.
+"""
+import random
+import secrets
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class FakeLoginServer:
+    """
+    POST / with username/password returns a session cookie, GET / with a
+    known session returns 200 and 401 otherwise. latency (seconds),
+    error_rate (HTTP 500) and reject_rate (HTTP 401 on login) can be changed
+    while the server runs.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, reject_rate=0.0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.reject_rate = reject_rate
+        self.rng = random.Random(seed)
+        self.sessions = set()
+        self.requests = 0
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _delay_or_fail(self):
+                fake.requests += 1
+                if fake.latency:
+                    time.sleep(fake.latency)
+                if fake.rng.random() < fake.error_rate:
+                    self.send_response(500)
+                    self.end_headers()
+                    return True
+                return False
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                form = urllib.parse.parse_qs(self.rfile.read(length).decode())
+                if self._delay_or_fail():
+                    return
+                if not form.get('username') or fake.rng.random() < fake.reject_rate:
+                    self.send_response(401)
+                    self.end_headers()
+                    return
+                session = secrets.token_hex(16)
+                fake.sessions.add(session)
+                self.send_response(200)
+                self.send_header('Set-Cookie', f"session={session}; Path=/; HttpOnly")
+                self.end_headers()
+
+            def do_GET(self):
+                if self._delay_or_fail():
+                    return
+                cookie = self.headers.get('Cookie', '')
+                session = dict(part.strip().split('=', 1) for part in cookie.split(';') if '=' in part).get('session')
+                self.send_response(200 if session in fake.sessions else 401)
+                self.end_headers()
+
+        return Handler
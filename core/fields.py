@@ -0,0 +1,127 @@
+"""
+Compact encrypted JSON storage.
+
+Values are serialized as canonical JSON, compressed (zstd when the
+zstandard package is installed, zlib otherwise), encrypted with the project
+cipher and stored in a binary column as:
+
+    1 byte format version | raw Fernet token
+
+Reads are lazy: loading a row only wraps the bytes in EncryptedJSON, and the
+payload is decrypted and decompressed the first time .value is used.
+"""
+import base64
+import json
+import zlib
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+from rest_framework import serializers
+from core.utils import get_cipher
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+FORMAT_ZLIB = 1
+FORMAT_ZSTD = 2
+
+def encode_json(value):
+    raw = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode()
+    if zstandard is not None:
+        version, compressed = FORMAT_ZSTD, zstandard.ZstdCompressor(level=3).compress(raw)
+    else:
+        version, compressed = FORMAT_ZLIB, zlib.compress(raw, 6)
+    # Fernet tokens are base64 text; store the raw bytes instead
+    token = base64.urlsafe_b64decode(get_cipher().encrypt(compressed))
+    return bytes([version]) + token
+
+def decode_json(data):
+    data = bytes(data)
+    version = data[0]
+    compressed = get_cipher().decrypt(base64.urlsafe_b64encode(data[1:]))
+    if version == FORMAT_ZSTD:
+        if zstandard is None:
+            raise ValueError("zstd-compressed value but the zstandard package is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(compressed)
+    elif version == FORMAT_ZLIB:
+        raw = zlib.decompress(compressed)
+    else:
+        raise ValueError(f"Unknown encrypted JSON format version {version}")
+    return json.loads(raw)
+
+_UNSET = object()
+
+class EncryptedJSON:
+    """A stored JSON value that is only decoded (or encoded) when needed."""
+    __slots__ = ('_raw', '_value')
+
+    def __init__(self, raw=None, value=_UNSET):
+        self._raw = raw
+        self._value = value
+
+    @property
+    def value(self):
+        if self._value is _UNSET:
+            self._value = decode_json(self._raw)
+        return self._value
+
+    @property
+    def raw(self):
+        # Once decoded the value may have been changed in place, so re-encode it
+        if self._value is not _UNSET:
+            return encode_json(self._value)
+        return self._raw
+
+    def __eq__(self, other):
+        if isinstance(other, EncryptedJSON):
+            return self.value == other.value
+        return self.value == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        state = 'decoded' if self._value is not _UNSET else f"{len(self._raw)} bytes"
+        return f"<EncryptedJSON {state}>"
+
+class EncryptedJSONDescriptor(DeferredAttribute):
+    # Whatever is assigned (dict, list, bytes from the database) is held as EncryptedJSON
+    def __set__(self, instance, value):
+        if value is not None and not isinstance(value, EncryptedJSON):
+            value = EncryptedJSON(raw=bytes(value)) if isinstance(value, (bytes, memoryview)) else EncryptedJSON(value=value)
+        instance.__dict__[self.field.attname] = value
+
+class CompressedEncryptedJSONField(models.BinaryField):
+    descriptor_class = EncryptedJSONDescriptor
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return EncryptedJSON(raw=bytes(value))
+
+    def to_python(self, value):
+        if value is None or isinstance(value, EncryptedJSON):
+            return value
+        if isinstance(value, (bytes, memoryview)):
+            return EncryptedJSON(raw=bytes(value))
+        return EncryptedJSON(value=value)
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        if not isinstance(value, EncryptedJSON):
+            value = EncryptedJSON(value=value)
+        # Values that were never decoded are written back as-is
+        return value.raw
+
+    def value_to_string(self, obj):
+        value = self.value_from_object(obj)
+        return json.dumps(value.value if value is not None else None)
+
+class EncryptedJSONSerializerField(serializers.JSONField):
+    """DRF counterpart: reads and writes plain JSON."""
+
+    def to_representation(self, value):
+        if isinstance(value, EncryptedJSON):
+            value = value.value
+        return super().to_representation(value)
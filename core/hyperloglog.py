@@ -0,0 +1,85 @@
+"""
+HyperLogLog distinct counting and a sliding window of sketches.
+
+HyperLogLog estimates the number of distinct values added to it within a
+few percent (1.04 / sqrt(2 ** precision)) in at most 2 ** precision small
+registers. Registers are kept sparse, so a key that saw a handful of values
+costs a handful of dict entries; small counts fall back to linear counting
+and are close to exact.
+
+SlidingDistinctCounter keeps one sketch per key and time bucket and answers
+"distinct values for this key over the last window" by merging the buckets
+still inside it.
+"""
+import hashlib
+import math
+
+class HyperLogLog:
+    __slots__ = ('precision', 'registers')
+
+    def __init__(self, precision=10):
+        self.precision = precision
+        self.registers = {}
+
+    def add(self, value):
+        digest = hashlib.blake2b(str(value).encode(), digest_size=8).digest()
+        hashed = int.from_bytes(digest, 'big')
+        bits = 64 - self.precision
+        index = hashed >> bits
+        rank = bits - (hashed & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers.get(index, 0):
+            self.registers[index] = rank
+
+    def merge(self, other):
+        registers = self.registers
+        for index, rank in other.registers.items():
+            if rank > registers.get(index, 0):
+                registers[index] = rank
+
+    def count(self):
+        m = 1 << self.precision
+        zeros = m - len(self.registers)
+        estimate = (0.7213 / (1 + 1.079 / m)) * m * m / (zeros + sum(2.0 ** -rank for rank in self.registers.values()))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+class SlidingDistinctCounter:
+    def __init__(self, window_seconds, buckets=24, precision=10):
+        self.bucket_seconds = window_seconds / buckets
+        self.buckets = buckets
+        self.precision = precision
+        # key -> {bucket number: HyperLogLog}
+        self.sketches = {}
+
+    def _bucket(self, timestamp):
+        return int(timestamp // self.bucket_seconds)
+
+    def add(self, key, value, timestamp):
+        per_bucket = self.sketches.setdefault(key, {})
+        bucket = self._bucket(timestamp)
+        sketch = per_bucket.get(bucket)
+        if sketch is None:
+            sketch = per_bucket[bucket] = HyperLogLog(self.precision)
+        sketch.add(value)
+
+    def count(self, key, now):
+        oldest = self._bucket(now) - self.buckets + 1
+        merged = HyperLogLog(self.precision)
+        for bucket, sketch in self.sketches.get(key, {}).items():
+            if bucket >= oldest:
+                merged.merge(sketch)
+        return merged.count()
+
+    def expire(self, now):
+        """Drops buckets that left the window, and keys with none left."""
+        oldest = self._bucket(now) - self.buckets + 1
+        for key in list(self.sketches):
+            per_bucket = self.sketches[key]
+            for bucket in [bucket for bucket in per_bucket if bucket < oldest]:
+                del per_bucket[bucket]
+            if not per_bucket:
+                del self.sketches[key]
+
+    def __len__(self):
+        return len(self.sketches)
@@ -0,0 +1,132 @@
+"""
+Scripted load test against a running server, for `manage.py loadtest`.
+
+Each virtual user logs in as one of the users created by `manage.py seed`,
+then repeats the main API flows over a keep-alive connection: list
+services, list and fetch cookies and, for a share of iterations, purchase a
+subscription (create payment, then purchase). Every request's latency is
+recorded under its flow step, and summary() reports throughput and
+p50/p95/p99 per step.
+"""
+import http.client
+import json
+import random
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+from core.seed import SEED_PASSWORD, seed_email
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.throttled = {}
+
+    def record(self, step, seconds, status):
+        with self.lock:
+            if status == 429:
+                self.throttled[step] = self.throttled.get(step, 0) + 1
+            elif status >= 400 or status == 0:
+                self.errors[step] = self.errors.get(step, 0) + 1
+            self.latencies.setdefault(step, []).append(seconds)
+
+    def summary(self, elapsed):
+        """[(step, requests, errors, throttled, req/s, p50 ms, p95 ms, p99 ms)]."""
+        rows = []
+        for step, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            rows.append((
+                step, len(latencies), self.errors.get(step, 0), self.throttled.get(step, 0), len(latencies) / elapsed,
+                *(latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000 for q in (0.5, 0.95, 0.99)),
+            ))
+        return rows
+
+class VirtualUser:
+    def __init__(self, base_url, email, stats, purchase_ratio, rng):
+        url = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(url.hostname, url.port, timeout=30)
+        self.prefix = url.path.rstrip('/')
+        self.email = email
+        self.stats = stats
+        self.purchase_ratio = purchase_ratio
+        self.rng = rng
+        self.token = None
+
+    def request(self, step, method, path, body=None):
+        headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+        payload = json.dumps(body).encode() if body is not None else None
+        started = time.perf_counter()
+        try:
+            self.connection.request(method, self.prefix + path, payload, headers)
+            response = self.connection.getresponse()
+            data = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            # Reconnect on the next request
+            self.connection.close()
+            data, status = b'', 0
+        self.stats.record(step, time.perf_counter() - started, status)
+        if 200 <= status < 300 and data:
+            return json.loads(data)
+        return None
+
+    def login(self):
+        tokens = self.request('login', 'POST', '/api/auth/login/', {'email': self.email, 'password': SEED_PASSWORD})
+        self.token = tokens['access'] if tokens else None
+        return self.token is not None
+
+    def iteration(self):
+        self.request('list services', 'GET', '/api/service/services/available/')
+        cookies = self.request('list cookies', 'GET', '/api/cookie_management/cookies/')
+        if cookies:
+            cookie = self.rng.choice(cookies)
+            self.request('fetch cookie', 'GET', f"/api/cookie_management/cookies/{cookie['id']}/")
+        if self.rng.random() < self.purchase_ratio:
+            self.purchase()
+
+    def purchase(self):
+        plans = self.request('list plans', 'GET', '/api/subscription/subscriptions/')
+        if not plans:
+            return
+        plan = self.rng.choice(plans)
+        payment = self.request('create payment', 'POST', '/api/payment/payments/create/', {
+            'subscription_plan': plan['id'], 'amount': plan['price'], 'payment_method': 'stripe',
+            'transaction_id': f"loadtest-{uuid.uuid4().hex}",
+        })
+        if payment:
+            self.request('purchase', 'POST', '/api/subscription/subscriptions/purchase/', {
+                'subscription': plan['id'], 'payment': payment['id'], 'duration_days': plan['duration_days'],
+            })
+
+def run(base_url, tag, users, concurrency, duration, iterations_per_login=20, purchase_ratio=0.1, random_seed=None):
+    """Runs for duration seconds; returns (Stats, elapsed seconds)."""
+    stats = Stats()
+    deadline = time.monotonic() + duration
+    rng = random.Random(random_seed)
+    seeds = [rng.random() for _ in range(concurrency)]
+
+    def worker(number):
+        worker_rng = random.Random(seeds[number])
+        while time.monotonic() < deadline:
+            # A fresh session as another seeded user
+            user = VirtualUser(base_url, seed_email(tag, worker_rng.randrange(users)), stats, purchase_ratio, worker_rng)
+            if not user.login():
+                continue
+            for _ in range(iterations_per_login):
+                if time.monotonic() >= deadline:
+                    break
+                user.iteration()
+            user.connection.close()
+
+    threads = [threading.Thread(target=worker, args=(number,), daemon=True) for number in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats, time.monotonic() - started
@@ -0,0 +1,83 @@
+"""
+Expiring leases and single-flight execution.
+
+CacheLease lives in the default cache and is shared by every process when
+the cache is Redis; LocalLease is the in-process equivalent for single-node
+setups and local runs. SINGLE_FLIGHT_BACKEND picks one ('cache' or 'local').
+"""
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+
+class CacheLease:
+    def __init__(self, key, ttl, cache_backend=None):
+        self.key = f"lease:{key}"
+        self.ttl = ttl
+        self.cache = cache_backend or cache
+        self.token = uuid.uuid4().hex
+
+    def acquire(self):
+        # cache.add only writes when the key is absent, atomically on Redis and locmem
+        return self.cache.add(self.key, self.token, self.ttl)
+
+    def release(self):
+        # Only drop the lease if it is still ours; the TTL bounds the window
+        # where an expired lease could be released by its old holder
+        if self.cache.get(self.key) == self.token:
+            self.cache.delete(self.key)
+
+    def held(self):
+        return self.cache.get(self.key) is not None
+
+class LocalLease:
+    _lock = threading.Lock()
+    _leases = {}
+
+    def __init__(self, key, ttl):
+        self.key = key
+        self.ttl = ttl
+        self.token = uuid.uuid4().hex
+
+    def acquire(self):
+        now = time.monotonic()
+        with self._lock:
+            current = self._leases.get(self.key)
+            if current and current[1] > now:
+                return False
+            self._leases[self.key] = (self.token, now + self.ttl)
+            return True
+
+    def release(self):
+        with self._lock:
+            current = self._leases.get(self.key)
+            if current and current[0] == self.token:
+                del self._leases[self.key]
+
+    def held(self):
+        with self._lock:
+            current = self._leases.get(self.key)
+            return bool(current and current[1] > time.monotonic())
+
+def make_lease(key, ttl):
+    if getattr(settings, 'SINGLE_FLIGHT_BACKEND', 'cache') == 'local':
+        return LocalLease(key, ttl)
+    return CacheLease(key, ttl)
+
+def single_flight(key, work, on_wait, ttl=60, wait_timeout=None, poll_interval=0.1):
+    """
+    Run work() if nobody else holds the lease for key. Concurrent callers
+    wait until the holder releases it (or the lease expires) and return
+    on_wait() instead, so the work happens once.
+    """
+    lease = make_lease(key, ttl)
+    if lease.acquire():
+        try:
+            return work()
+        finally:
+            lease.release()
+    deadline = time.monotonic() + (wait_timeout if wait_timeout is not None else ttl)
+    while lease.held() and time.monotonic() < deadline:
+        time.sleep(poll_interval)
+    return on_wait()
@@ -0,0 +1,47 @@
+"""
+HTTP side of cookie extraction and validation against Service.login_url.
+"""
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.cookies import SimpleCookie
+from django.conf import settings
+
+class LoginFailed(Exception):
+    pass
+
+def _cookies_from(response):
+    jar = SimpleCookie()
+    for header in response.headers.get_all('Set-Cookie') or []:
+        jar.load(header)
+    return {name: morsel.value for name, morsel in jar.items()}
+
+def post_login(url, username, password, extra=None, timeout=None):
+    """Submit the login form and return the session cookies it sets."""
+    form = dict(extra or {}, username=username, password=password)
+    request = urllib.request.Request(url, data=urllib.parse.urlencode(form).encode(), method='POST')
+    try:
+        with urllib.request.urlopen(request, timeout=timeout or settings.LOGIN_AUTOMATION_TIMEOUT_SECONDS) as response:
+            cookies = _cookies_from(response)
+    except (urllib.error.URLError, OSError) as e:
+        raise LoginFailed(f"Login request to {url} failed: {e}") from e
+    if not cookies:
+        raise LoginFailed(f"Login to {url} returned no cookies")
+    return cookies
+
+def session_is_valid(url, cookies, timeout=None):
+    """
+    Replay the session cookies against the service. Returns False when the
+    service rejects them (401/403); other errors raise LoginFailed.
+    """
+    request = urllib.request.Request(url, method='GET')
+    request.add_header('Cookie', '; '.join(f"{name}={value}" for name, value in cookies.items()))
+    try:
+        with urllib.request.urlopen(request, timeout=timeout or settings.LOGIN_AUTOMATION_TIMEOUT_SECONDS):
+            return True
+    except urllib.error.HTTPError as e:
+        if e.code in (401, 403):
+            return False
+        raise LoginFailed(f"Session check against {url} failed: {e}") from e
+    except (urllib.error.URLError, OSError) as e:
+        raise LoginFailed(f"Session check against {url} failed: {e}") from e
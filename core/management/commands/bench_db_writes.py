@@ -0,0 +1,75 @@
+import tempfile
+import threading
+import time
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+TABLE = 'bench_db_writes'
+
+class Command(BaseCommand):
+    help = "Concurrent write throughput per database profile: stock SQLite, the tuned SQLite profile and the configured default database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--seconds', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        default = connections.settings['default']
+        with tempfile.TemporaryDirectory() as scratch:
+            profiles = [
+                # What the project used before DB profiles: new connection per request, rollback journal
+                ('sqlite-stock', {**default, 'NAME': str(Path(scratch) / 'stock.sqlite3'), 'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'OPTIONS': {}}),
+            ]
+            if default['ENGINE'].endswith('sqlite3'):
+                profiles.append(('sqlite-tuned', {**default, 'NAME': str(Path(scratch) / 'tuned.sqlite3')}))
+            else:
+                profiles.append((settings.DB_PROFILE, default))
+            self.stdout.write(f"{'profile':>14} {'writes/s':>10} {'p99 ms':>8} {'errors':>7}")
+            for name, config in profiles:
+                self._report(name, self._run(f"bench_{name.replace('-', '_')}", config, options))
+
+    def _run(self, alias, config, options):
+        connections.settings[alias] = config
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(f"CREATE TABLE IF NOT EXISTS {TABLE} (id INTEGER PRIMARY KEY, worker INTEGER, payload TEXT)")
+            connections[alias].close()
+            latencies, errors = [], []
+            deadline = time.monotonic() + options['seconds']
+            workers = [threading.Thread(target=self._worker, args=(alias, index, deadline, latencies, errors)) for index in range(options['threads'])]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            with connections[alias].cursor() as cursor:
+                cursor.execute(f"DROP TABLE {TABLE}")
+            return latencies, errors, options['seconds']
+        finally:
+            connections[alias].close()
+            del connections.settings[alias]
+
+    def _worker(self, alias, index, deadline, latencies, errors):
+        connection = connections[alias]
+        try:
+            while time.monotonic() < deadline:
+                started = time.monotonic()
+                try:
+                    # A small read-then-write request, as an API write would do
+                    with transaction.atomic(using=alias), connection.cursor() as cursor:
+                        cursor.execute(f"SELECT COUNT(*) FROM {TABLE} WHERE worker = %s", [index])
+                        cursor.execute(f"INSERT INTO {TABLE} (worker, payload) VALUES (%s, %s)", [index, 'x' * 200])
+                    latencies.append(time.monotonic() - started)
+                except OperationalError as e:
+                    errors.append(e)
+                # End of "request": closes the connection unless CONN_MAX_AGE keeps it
+                connection.close_if_unusable_or_obsolete()
+        finally:
+            connection.close()
+
+    def _report(self, name, result):
+        latencies, errors, seconds = result
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0
+        self.stdout.write(f"{name:>14} {len(latencies) / seconds:>10.0f} {p99:>8.1f} {len(errors):>7}")
@@ -0,0 +1,63 @@
+import io
+import timeit
+import uuid
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from auth_app.models import User
+from auth_app.serializers import UserSerializer
+from cookie_management_app.models import Cookie
+from cookie_management_app.serializers import CookieSerializer
+from core.renderers import ORJSONParser, ORJSONRenderer, orjson
+
+class Command(BaseCommand):
+    help = "Compare the stdlib and orjson renderer/parser on CookieSerializer and UserSerializer payloads."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson is not installed; ORJSONRenderer falls back to the stdlib."))
+        payloads = {
+            'cookies': CookieSerializer(self._cookies(options['rows']), many=True).data,
+            'users': UserSerializer(self._users(options['rows']), many=True).data,
+        }
+        self.stdout.write(f"{'payload':>8} {'':>7} {'stdlib ms':>10} {'orjson ms':>10} {'speedup':>8}")
+        for name, data in payloads.items():
+            rendered = JSONRenderer().render(data)
+            fast = ORJSONRenderer().render(data)
+            if fast != rendered:
+                self.stdout.write(self.style.WARNING(f"{name}: orjson output differs from JSONRenderer"))
+            self._row(name, 'render', options['repeat'],
+                      lambda: JSONRenderer().render(data), lambda: ORJSONRenderer().render(data))
+            self._row(name, 'parse', options['repeat'],
+                      lambda: JSONParser().parse(io.BytesIO(rendered)), lambda: ORJSONParser().parse(io.BytesIO(rendered)))
+            self.stdout.write(f"{'':>8} {len(rendered) / 1024:.0f} KiB")
+
+    def _row(self, name, step, repeat, slow, fast):
+        slow_ms = min(timeit.repeat(slow, number=1, repeat=repeat)) * 1000
+        fast_ms = min(timeit.repeat(fast, number=1, repeat=repeat)) * 1000
+        self.stdout.write(f"{name:>8} {step:>7} {slow_ms:>10.1f} {fast_ms:>10.1f} {slow_ms / fast_ms:>7.1f}x")
+
+    def _cookies(self, rows):
+        # Unsaved instances; nothing touches the database
+        now = timezone.now()
+        return [
+            Cookie(
+                id=uuid.uuid4(), user_service_id=uuid.uuid4(), session_id=uuid.uuid4().hex,
+                cookie_data={'session': uuid.uuid4().hex, 'csrftoken': uuid.uuid4().hex, 'prefs': {'lang': 'en', 'tz': 'UTC'}},
+                extracted_at=now, expires_at=now + timedelta(hours=index % 24), last_validated=now, status='valid',
+            )
+            for index in range(rows)
+        ]
+
+    def _users(self, rows):
+        now = timezone.now()
+        return [
+            User(id=uuid.uuid4(), email=f"user{index}@example.com", full_name=f"User {index}", date_joined=now)
+            for index in range(rows)
+        ]
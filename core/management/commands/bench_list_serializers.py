@@ -0,0 +1,26 @@
+import timeit
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.sample_data import create_sample_data, serializer_targets
+from core.values_serializers import ValuesSerializer
+
+class Command(BaseCommand):
+    help = "Time ModelSerializer against the values() fast path on list payloads (synthetic rows, rolled back)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            create_sample_data(max(options['rows']))
+            self.stdout.write(f"{'payload':>14} {'rows':>6} {'serializer ms':>14} {'values ms':>10} {'speedup':>8}")
+            for label, serializer_class, queryset in serializer_targets():
+                compiled = ValuesSerializer.for_serializer(serializer_class)
+                for rows in options['rows']:
+                    sliced = queryset[:rows]
+                    # Both sides include the query, as a list view would
+                    slow = min(timeit.repeat(lambda: serializer_class(sliced.all(), many=True).data, number=1, repeat=options['repeat']))
+                    fast = min(timeit.repeat(lambda: compiled.serialize(sliced.all()), number=1, repeat=options['repeat']))
+                    self.stdout.write(f"{label:>14} {sliced.count():>6} {slow * 1000:>14.1f} {fast * 1000:>10.1f} {slow / fast:>7.1f}x")
+            transaction.set_rollback(True)
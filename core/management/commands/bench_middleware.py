@@ -0,0 +1,61 @@
+import time
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import path
+
+# The stack every request went through before BrowserOnlyMiddleware
+FULL_STACK = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+def ping(request):
+    return HttpResponse(b'ok')
+
+# Used as ROOT_URLCONF while benchmarking, so only middleware cost is measured
+urlpatterns = [
+    path('api/ping/', ping),
+    path('admin/ping/', ping),
+]
+
+class Command(BaseCommand):
+    help = "Measure per-request middleware overhead for API and browser paths, full stack versus BrowserOnlyMiddleware."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        stacks = [('none', []), ('full', FULL_STACK), ('routed', settings.MIDDLEWARE)]
+        factory = RequestFactory()
+        self.stdout.write(f"{'path':>12} " + ' '.join(f"{name + ' us':>10}" for name, _ in stacks) + f" {'overhead full -> routed':>24}")
+        for url in ('/api/ping/', '/admin/ping/'):
+            timings = []
+            for _, middleware in stacks:
+                with override_settings(MIDDLEWARE=middleware, ROOT_URLCONF=__name__):
+                    handler = BaseHandler()
+                    handler.load_middleware()
+                    timings.append(self._time(handler, factory, url, options['requests']))
+            bare, full, routed = timings
+            self.stdout.write(
+                f"{url:>12} " + ' '.join(f"{value:>10.1f}" for value in timings)
+                + f" {full - bare:>11.1f} -> {routed - bare:.1f} us"
+            )
+
+    def _time(self, handler, factory, url, requests):
+        # A session cookie makes SessionMiddleware do its lookup, as for a logged-in browser
+        request_kwargs = {'HTTP_AUTHORIZATION': 'Bearer x', 'HTTP_COOKIE': 'sessionid=missing'}
+        for _ in range(200):
+            handler.get_response(factory.get(url, **request_kwargs))
+        started = time.perf_counter()
+        for _ in range(requests):
+            handler.get_response(factory.get(url, **request_kwargs))
+        return (time.perf_counter() - started) / requests * 1e6
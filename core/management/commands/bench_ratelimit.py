@@ -0,0 +1,62 @@
+import logging
+import time
+import uuid
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import path
+from core.ratelimit import get_store
+
+def ping(request):
+    return HttpResponse(b'ok')
+
+# Used as ROOT_URLCONF while benchmarking, so only the limiter's cost is measured
+urlpatterns = [
+    path('api/ping/', ping, name='bench-ping'),
+]
+
+class Command(BaseCommand):
+    help = "Measure rate limiter overhead: bucket checks, and whole requests allowed and rejected versus no limit."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        store = get_store()
+        run = uuid.uuid4().hex
+        started = time.perf_counter()
+        for index in range(count):
+            store.take([(f"bench:{run}:{index % 1000}", 1e9, 1e9)])
+        self.stdout.write(f"{settings.RATE_LIMIT_CACHE} cache bucket check: {(time.perf_counter() - started) / count * 1e6:.1f} us")
+
+        factory = RequestFactory()
+        # Django logs every 4xx; keep the 429 case quiet
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        cases = [
+            ('no limit', {}),
+            ('allowed', {'bench-ping': [('ip', 10 ** 9, 10 ** 9)]}),
+            ('allowed, ip + user', {'bench-ping': [('ip', 10 ** 9, 10 ** 9), ('user', 10 ** 9, 10 ** 9)]}),
+            ('rejected (429)', {'bench-ping': [('ip', 1, 1e-9)]}),
+        ]
+        for label, limits in cases:
+            with override_settings(ROOT_URLCONF=__name__, RATE_LIMITS=limits):
+                handler = BaseHandler()
+                handler.load_middleware()
+                per_request = self._time(handler, factory, count)
+            self.stdout.write(f"{label:>20}: {per_request:.1f} us/request")
+
+        started = time.perf_counter()
+        make_password('benchmark-password')
+        self.stdout.write(f"for comparison, one password hash: {(time.perf_counter() - started) * 1e6:.0f} us")
+
+    def _time(self, handler, factory, count):
+        for _ in range(200):
+            handler.get_response(factory.get('/api/ping/'))
+        started = time.perf_counter()
+        for _ in range(count):
+            handler.get_response(factory.get('/api/ping/'))
+        return (time.perf_counter() - started) / count * 1e6
@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.urls import resolve, reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+from auth_app.models import User
+from cookie_management_app.models import UserService
+from core.query_profiler import assert_no_n_plus_one
+from core.sample_data import create_sample_data
+from service_app.models import Service
+
+# (url name, requested as admin) for the list endpoints checked in CI
+ENDPOINTS = [
+    ('service-list-create', True),
+    ('service-available-list', False),
+    ('service-entitled-list', False),
+    ('user-service-list', False),
+    ('userservice-pending-list', True),
+    ('cookie-list', False),
+    ('subscription-list', False),
+    ('payment-list', False),
+    ('admin-user-list', True),
+]
+
+def create_endpoint_data(rows):
+    """Sample data for ENDPOINTS; returns (user, admin) to request them as."""
+    tag = create_sample_data(rows)
+    user = User.objects.filter(email__startswith=f"user-{tag}-").order_by('email').first()
+    # One user with a row for every service, so per-row queries show up
+    UserService.objects.bulk_create([
+        UserService(user=user, service=service, is_active=True)
+        for service in Service.objects.filter(name__startswith=f"svc-{tag}-")
+    ], ignore_conflicts=True)
+    admin = User.objects.create_superuser(email=f"admin-{tag}@example.com", password=None, full_name="Admin")
+    return user, admin
+
+def get_endpoint(name, user):
+    """GET the named endpoint as user, straight through its view; returns the rendered response."""
+    url = reverse(name)
+    request = APIRequestFactory().get(url)
+    force_authenticate(request, user=user)
+    match = resolve(url)
+    response = match.func(request, *match.args, **match.kwargs)
+    response.render()
+    return response
+
+class Command(BaseCommand):
+    help = "Fail if any list endpoint runs an N+1 query pattern over synthetic data (rolled back afterwards)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50)
+        parser.add_argument('--threshold', type=int, default=None, help="Default: QUERY_PROFILE_N_PLUS_ONE_THRESHOLD")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            failures = self._check(options['rows'], options['threshold'])
+            transaction.set_rollback(True)
+        if failures:
+            raise CommandError(f"N+1 queries in: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("No N+1 query patterns found."))
+
+    def _check(self, rows, threshold):
+        user, admin = create_endpoint_data(rows)
+        failures = []
+        for name, as_admin in ENDPOINTS:
+            try:
+                with assert_no_n_plus_one(threshold) as recorder:
+                    response = get_endpoint(name, admin if as_admin else user)
+            except AssertionError as e:
+                failures.append(name)
+                self.stdout.write(f"{name}: {e}")
+                continue
+            self.stdout.write(f"{name}: {response.status_code}, {len(recorder.queries)} queries")
+        return failures
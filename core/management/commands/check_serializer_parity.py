@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.settings import api_settings
+from core.sample_data import create_sample_data, serializer_targets
+from core.values_serializers import UnsupportedSerializer, ValuesSerializer
+
+class Command(BaseCommand):
+    help = "Check that the values() fast path renders the same JSON as each ModelSerializer it replaces."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=1000, help="Rows compared per serializer")
+        parser.add_argument('--sample-rows', type=int, default=0, help="Add this many synthetic rows first (rolled back afterwards)")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['sample_rows']:
+                create_sample_data(options['sample_rows'])
+            failures = self._compare(options['limit'])
+            transaction.set_rollback(True)
+        if failures:
+            raise CommandError(f"Fast path output differs for: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("Fast path output matches."))
+
+    def _compare(self, limit):
+        # The renderer responses actually go out with
+        renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+        failures = []
+        for label, serializer_class, queryset in serializer_targets():
+            try:
+                compiled = ValuesSerializer.for_serializer(serializer_class)
+            except UnsupportedSerializer as e:
+                failures.append(label)
+                self.stdout.write(f"{label}: not supported ({e})")
+                continue
+            queryset = queryset[:limit]
+            expected = renderer.render(serializer_class(queryset, many=True).data)
+            actual = renderer.render(compiled.serialize(queryset))
+            if actual != expected:
+                failures.append(label)
+            self.stdout.write(f"{label}: {queryset.count()} rows {'ok' if actual == expected else 'DIFFERS'}")
+        return failures
@@ -0,0 +1,29 @@
+import statistics
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.startup import run_startup
+
+class Command(BaseCommand):
+    help = (
+        "Fail when django.setup() plus loading the URLconf takes longer than STARTUP_TIME_BUDGET_MS (median of "
+        "fresh processes), or when a web process imports Celery or drf_yasg at startup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--budget-ms', type=float, default=None, help="Default: STARTUP_TIME_BUDGET_MS")
+
+    def handle(self, *args, **options):
+        budget = options['budget_ms'] or settings.STARTUP_TIME_BUDGET_MS
+        failures = []
+        for role in ('web', 'worker'):
+            results = [run_startup(role)[0] for _ in range(options['runs'])]
+            median = statistics.median(result['seconds'] for result in results) * 1000
+            self.stdout.write(f"{role}: median {median:.0f} ms over {len(results)} runs (budget {budget:.0f} ms)")
+            if median > budget:
+                failures.append(f"{role} startup {median:.0f} ms is over the {budget:.0f} ms budget")
+            if role == 'web' and results[0]['lazy_modules_loaded']:
+                failures.append(f"web startup imports {', '.join(results[0]['lazy_modules_loaded'])}")
+        if failures:
+            raise CommandError('; '.join(failures))
+        self.stdout.write(self.style.SUCCESS("Startup time within budget."))
@@ -0,0 +1,19 @@
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.schema import FORMATS, render_schema, schema_file
+
+class Command(BaseCommand):
+    help = "Render the OpenAPI schema to openapi.json/openapi.yaml so the API serves it without introspection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', default=settings.API_SCHEMA_DIR, help="Defaults to API_SCHEMA_DIR")
+
+    def handle(self, *args, **options):
+        if not options['output_dir']:
+            raise CommandError("Set API_SCHEMA_DIR or pass --output-dir.")
+        Path(options['output_dir']).mkdir(parents=True, exist_ok=True)
+        for format in FORMATS:
+            path = schema_file(options['output_dir'], format)
+            path.write_bytes(render_schema(format))
+            self.stdout.write(f"Wrote {path}")
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.loadtest import run
+
+class Command(BaseCommand):
+    help = (
+        "Replay login, list services, fetch cookie and purchase flows against a running server as users created by "
+        "`manage.py seed`, and report throughput and p50/p95/p99 per step. Start the server with RATE_LIMIT_ENABLED=0, "
+        "or logins are throttled."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tag', required=True, help="Tag printed by `manage.py seed`")
+        parser.add_argument('--users', type=int, default=1000, help="Seeded users to draw from (at most the number seeded)")
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=30.0, help="Seconds")
+        parser.add_argument('--iterations-per-login', type=int, default=20)
+        parser.add_argument('--purchase-ratio', type=float, default=0.1, help="Share of iterations that also purchase")
+        parser.add_argument('--random-seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        stats, elapsed = run(
+            options['base_url'], options['tag'], options['users'], options['concurrency'], options['duration'],
+            options['iterations_per_login'], options['purchase_ratio'], options['random_seed'],
+        )
+        rows = stats.summary(elapsed)
+        if not rows:
+            raise CommandError(f"No requests completed against {options['base_url']}.")
+        self.stdout.write(f"{'step':<16} {'requests':>9} {'errors':>7} {'429':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for step, count, errors, throttled, rate, p50, p95, p99 in rows:
+            self.stdout.write(f"{step:<16} {count:>9} {errors:>7} {throttled:>6} {rate:>8.1f} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f}")
+        total = sum(row[1] for row in rows)
+        self.stdout.write(f"{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s) with {options['concurrency']} virtual users")
+        if any(row[3] for row in rows):
+            self.stdout.write(self.style.WARNING("Some requests were rate limited; run the server with RATE_LIMIT_ENABLED=0."))
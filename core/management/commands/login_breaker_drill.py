@@ -0,0 +1,75 @@
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from core.fake_login_server import FakeLoginServer
+from core.login_automation import LoginFailed, post_login
+from core.resilience import CircuitOpen, ConcurrencyLimited, ServiceGuard, guarded
+
+# (name, latency seconds, error rate)
+PHASES = [
+    ('healthy', 0.01, 0.0),
+    ('slow', 0.3, 0.0),
+    ('failing', 0.01, 0.9),
+    ('recovered', 0.01, 0.0),
+]
+
+class Command(BaseCommand):
+    help = "Drive login automation against a local fake server that injects latency and errors, and report breaker and concurrency-limit behaviour."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=200, help="Login attempts per phase")
+        parser.add_argument('--concurrency', type=int, default=16, help="Concurrent callers")
+        parser.add_argument('--latency-target', type=float, default=0.1)
+        parser.add_argument('--cooldown', type=int, default=1)
+
+    def handle(self, *args, **options):
+        service_id = f"drill-{uuid.uuid4().hex}"
+        guard = ServiceGuard(service_id)
+        with override_settings(
+            SERVICE_LATENCY_TARGET_SECONDS=options['latency_target'],
+            SERVICE_BREAKER_COOLDOWN_SECONDS=options['cooldown'],
+            LOGIN_AUTOMATION_TIMEOUT_SECONDS=5,
+        ), FakeLoginServer(seed=1) as server:
+            try:
+                for name, latency, error_rate in PHASES:
+                    server.latency, server.error_rate = latency, error_rate
+                    if name == 'recovered':
+                        # Let the breaker cool down so a probe can close it again
+                        time.sleep(options['cooldown'] + 0.1)
+                    outcomes = self._run_phase(service_id, server.url, options)
+                    snapshot = guard.snapshot()
+                    self.stdout.write(
+                        f"{name:>10}: ok {outcomes['ok']:>4}  failed {outcomes['failed']:>4}  "
+                        f"rejected-open {outcomes['open']:>4}  limited-retries {outcomes['limited']:>5}  | "
+                        f"breaker {snapshot['state']:<9} limit {snapshot['concurrency_limit']:>2}"
+                    )
+            finally:
+                guard.reset()
+
+    def _run_phase(self, service_id, url, options):
+        outcomes = Counter()
+
+        def attempt(_):
+            # Callers over the limit back off briefly and try again, like a retried task
+            while True:
+                try:
+                    with guarded(service_id):
+                        post_login(url, 'drill', 'secret')
+                    outcomes['ok'] += 1
+                    return
+                except CircuitOpen:
+                    outcomes['open'] += 1
+                    return
+                except ConcurrencyLimited:
+                    outcomes['limited'] += 1
+                    time.sleep(0.005)
+                except LoginFailed:
+                    outcomes['failed'] += 1
+                    return
+
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            list(pool.map(attempt, range(options['calls'])))
+        return outcomes
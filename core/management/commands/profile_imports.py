@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from core.startup import parse_importtime, run_startup
+
+class Command(BaseCommand):
+    help = "Profile module import times of a fresh web or worker process (python -X importtime) and list the slowest."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--role', choices=('web', 'worker'), default='web')
+        parser.add_argument('--top', type=int, default=20)
+
+    def handle(self, *args, **options):
+        result, stderr = run_startup(options['role'], importtime=True)
+        modules = parse_importtime(stderr)
+        top = options['top']
+        self.stdout.write(f"{options['role']} startup: {result['seconds'] * 1000:.0f} ms, {len(modules)} modules imported")
+        if result['lazy_modules_loaded']:
+            self.stdout.write(f"Loaded at startup: {', '.join(result['lazy_modules_loaded'])}")
+
+        self.stdout.write(f"\nSlowest top-level imports (cumulative):")
+        for name, _, cumulative, _ in sorted((m for m in modules if m[3] == 0), key=lambda m: -m[2])[:top]:
+            self.stdout.write(f"  {cumulative / 1000:>8.1f} ms  {name}")
+        self.stdout.write(f"\nSlowest modules (own time):")
+        for name, self_us, _, _ in sorted(modules, key=lambda m: -m[1])[:top]:
+            self.stdout.write(f"  {self_us / 1000:>8.1f} ms  {name}")
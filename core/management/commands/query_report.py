@@ -0,0 +1,55 @@
+import json
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+class Command(BaseCommand):
+    help = "Summarise the QUERY_PROFILE_LOG written by QueryProfileMiddleware: queries per endpoint, N+1 patterns and slow queries."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=None, help="Default: QUERY_PROFILE_LOG")
+        parser.add_argument('--top', type=int, default=10, help="N+1 patterns and slow queries listed")
+
+    def handle(self, *args, **options):
+        path = options['log'] or settings.QUERY_PROFILE_LOG
+        try:
+            with open(path) as log:
+                entries = [json.loads(line) for line in log if line.strip()]
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+        if not entries:
+            self.stdout.write("No profiled requests.")
+            return
+
+        endpoints = defaultdict(list)
+        n_plus_one = Counter()
+        slow = []
+        for entry in entries:
+            endpoint = f"{entry['method']} {entry['view']}"
+            endpoints[endpoint].append(entry)
+            for finding in entry['n_plus_one']:
+                n_plus_one[(endpoint, finding['origin'], finding['shape'])] += 1
+            slow += [(query['ms'], endpoint, query['origin'], query['sql']) for query in entry['slow']]
+
+        self.stdout.write(f"{'endpoint':<48} {'requests':>8} {'avg q':>7} {'p95 q':>6} {'max q':>6} {'avg db ms':>10} {'n+1':>5}")
+        by_queries = sorted(endpoints.items(), key=lambda item: -sum(e['queries'] for e in item[1]) / len(item[1]))
+        for endpoint, items in by_queries:
+            queries = [e['queries'] for e in items]
+            self.stdout.write(
+                f"{endpoint:<48} {len(items):>8} {sum(queries) / len(items):>7.1f} {_percentile(queries, 0.95):>6} "
+                f"{max(queries):>6} {sum(e['db_ms'] for e in items) / len(items):>10.2f} "
+                f"{sum(1 for e in items if e['n_plus_one']):>5}"
+            )
+
+        if n_plus_one:
+            self.stdout.write("\nN+1 patterns (requests affected):")
+            for (endpoint, origin, shape), count in n_plus_one.most_common(options['top']):
+                self.stdout.write(f"  {count:>5}  {endpoint} from {origin}\n         {shape}")
+        if slow:
+            self.stdout.write("\nSlowest queries:")
+            for ms, endpoint, origin, sql in sorted(slow, reverse=True)[:options['top']]:
+                self.stdout.write(f"  {ms:>9.1f} ms  {endpoint} from {origin}\n         {sql}")
@@ -0,0 +1,32 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from cookie_auth_backend.celery import app
+
+class Command(BaseCommand):
+    help = "Run every CELERY_BEAT_SCHEDULE task once, in-process (no broker or worker), and report duration and result."
+
+    def add_arguments(self, parser):
+        parser.add_argument('entries', nargs='*', help="Schedule entry names (default: all)")
+
+    def handle(self, *args, **options):
+        schedule = settings.CELERY_BEAT_SCHEDULE
+        names = options['entries'] or list(schedule)
+        unknown = [name for name in names if name not in schedule]
+        if unknown:
+            raise CommandError(f"Unknown schedule entries: {', '.join(unknown)}")
+        # What the worker does at startup: import every app's tasks module
+        app.loader.import_default_modules()
+        failures = []
+        for name in names:
+            entry = schedule[name]
+            task = app.tasks[entry['task']]
+            started = time.perf_counter()
+            # apply() runs the task in this process, through InstrumentedTask
+            result = task.apply(args=entry.get('args', ()), kwargs=entry.get('kwargs', {}))
+            elapsed = time.perf_counter() - started
+            if result.failed():
+                failures.append(name)
+            self.stdout.write(f"{name}: {result.state} in {elapsed * 1000:.1f} ms -> {result.result!r}")
+        if failures:
+            raise CommandError(f"Failed: {', '.join(failures)}")
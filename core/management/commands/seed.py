@@ -0,0 +1,35 @@
+import time
+from django.core.management.base import BaseCommand
+from core.seed import SEED_PASSWORD, seed, seed_email
+
+class Command(BaseCommand):
+    help = "Bulk-generate production-scale synthetic data (users, catalog, subscriptions, payments, cookies and injection logs)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--services', type=int, default=50)
+        parser.add_argument('--plans', type=int, default=5)
+        parser.add_argument('--logins-per-service', type=int, default=3, help="Shared LoginService accounts per service")
+        parser.add_argument('--services-per-user', type=int, default=2)
+        parser.add_argument('--logs-per-cookie', type=int, default=5, help="CookieInjectionLog rows per cookie")
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Users generated per transaction")
+        parser.add_argument('--random-seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        tag = None
+        for tag, totals in seed(
+            options['users'], options['services'], options['plans'], options['logins_per_service'],
+            options['services_per_user'], options['logs_per_cookie'], options['chunk_size'], options['random_seed'],
+        ):
+            rows = sum(totals.values())
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"[{elapsed:7.1f}s] {totals.get('users', 0)}/{options['users']} users, "
+                f"{rows} rows ({rows / elapsed:,.0f} rows/s)"
+            )
+        self.stdout.write(self.style.SUCCESS(', '.join(f"{count} {model}" for model, count in totals.items())))
+        self.stdout.write(
+            f"Tag {tag}: log in as {seed_email(tag, 0)} .. {seed_email(tag, options['users'] - 1)} "
+            f"with password {SEED_PASSWORD!r}, or run `manage.py loadtest --tag {tag}`."
+        )
@@ -0,0 +1,67 @@
+import random
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.cookie_refresh import lead_time, simulate, upcoming_expiries
+
+class Command(BaseCommand):
+    help = "Replay a day of cookie expiries locally and print the refresh load curve with and without the scheduler."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24)
+        parser.add_argument('--from-db', action='store_true', help="Use the current cookie expiries instead of synthetic ones")
+        parser.add_argument('--login-services', type=int, default=5000, help="Synthetic login services")
+        parser.add_argument('--burst-fraction', type=float, default=0.6, help="Share of synthetic expiries clustered in bursts")
+        parser.add_argument('--bursts', type=int, default=4)
+        parser.add_argument('--cookie-ttl-hours', type=float, default=24)
+        parser.add_argument('--max-per-slot', type=int, default=settings.COOKIE_REFRESH_MAX_PER_SLOT)
+        parser.add_argument('--slot-seconds', type=int, default=settings.COOKIE_REFRESH_SLOT_SECONDS)
+        parser.add_argument('--bucket-minutes', type=int, default=60, help="Slots are summed into buckets of this size for display")
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        start = timezone.now()
+        duration = timedelta(hours=options['hours'])
+        if options['from_db']:
+            expiries = upcoming_expiries(start, duration)
+        else:
+            expiries = self._synthetic(start, duration, options)
+
+        slot = timedelta(seconds=options['slot_seconds'])
+        naive, scheduled = simulate(
+            expiries, start, duration, options['max_per_slot'],
+            cookie_ttl=timedelta(hours=options['cookie_ttl_hours']), slot=slot,
+        )
+
+        slots_per_bucket = max(1, int(timedelta(minutes=options['bucket_minutes']) / slot))
+        buckets = int(duration / slot) // slots_per_bucket + 1
+        scale = max(1, max(self._bucket(naive, b, slots_per_bucket) for b in range(buckets)) // 50)
+        self.stdout.write(f"{'bucket':>17} {'naive':>7} {'sched':>7}")
+        for bucket in range(buckets):
+            label = (start + bucket * slots_per_bucket * slot).strftime('%m-%d %H:%M')
+            before = self._bucket(naive, bucket, slots_per_bucket)
+            after = self._bucket(scheduled, bucket, slots_per_bucket)
+            self.stdout.write(f"{label:>17} {before:>7} {after:>7} {'#' * (after // scale)}")
+        self.stdout.write(
+            f"refreshes: naive {sum(naive.values())}, scheduled {sum(scheduled.values())}; "
+            f"peak per {options['slot_seconds']}s slot: naive {max(naive.values(), default=0)}, "
+            f"scheduled {max(scheduled.values(), default=0)}"
+        )
+
+    def _bucket(self, load, bucket, size):
+        return sum(load.get(index, 0) for index in range(bucket * size, (bucket + 1) * size))
+
+    def _synthetic(self, start, duration, options):
+        # Extraction happens in bursts, so a large share of cookies expire together
+        rng = random.Random(options['seed'])
+        seconds = int((duration + lead_time()).total_seconds())
+        burst_points = [rng.randrange(seconds) for _ in range(options['bursts'])]
+        expiries = []
+        for key in range(options['login_services']):
+            if rng.random() < options['burst_fraction']:
+                offset = rng.choice(burst_points) + rng.randrange(120)
+            else:
+                offset = rng.randrange(seconds)
+            expiries.append((start + timedelta(seconds=offset), key))
+        return expiries
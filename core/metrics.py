@@ -0,0 +1,158 @@
+"""
+In-process request metrics in Prometheus text format.
+
+MetricsMiddleware counts every request and, for a METRICS_SAMPLE_RATE share
+of them, records latency, number of queries, time spent in the database
+(via connection.execute_wrapper) and response size into per-view
+histograms. Each process keeps its own numbers; scrape every worker (or
+run one per host) for a complete picture. Celery task counters
+(core.task_metrics) come from the cache and are appended.
+"""
+import bisect
+import random
+import threading
+import time
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from core import task_metrics
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HISTOGRAMS = [
+    # (metric name, help, buckets)
+    ('http_request_duration_seconds', "Request latency", LATENCY_BUCKETS),
+    ('http_request_db_queries', "Database queries per request", QUERY_BUCKETS),
+    ('http_request_db_seconds', "Time spent in database queries per request", LATENCY_BUCKETS),
+    ('http_response_size_bytes', "Response body size", SIZE_BUCKETS),
+]
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.histograms = {}
+
+    def record(self, labels, observations):
+        """labels is (view, method, status); observations is None or one value per HISTOGRAMS entry."""
+        with self.lock:
+            self.requests[labels] = self.requests.get(labels, 0) + 1
+            if observations is None:
+                return
+            histograms = self.histograms.get(labels)
+            if histograms is None:
+                histograms = self.histograms[labels] = [Histogram(buckets) for _, _, buckets in HISTOGRAMS]
+            for histogram, value in zip(histograms, observations):
+                if value is not None:
+                    histogram.observe(value)
+
+    def reset(self):
+        with self.lock:
+            self.requests.clear()
+            self.histograms.clear()
+
+    def render(self):
+        with self.lock:
+            requests = dict(self.requests)
+            histograms = {labels: [(list(h.counts), h.sum) for h in hs] for labels, hs in self.histograms.items()}
+        lines = [
+            "# HELP http_requests_total Requests handled (all requests, not sampled)",
+            "# TYPE http_requests_total counter",
+        ]
+        lines += [f"http_requests_total{{{_labels(labels)}}} {count}" for labels, count in sorted(requests.items())]
+        for index, (name, help_text, buckets) in enumerate(HISTOGRAMS):
+            lines.append(f"# HELP {name} {help_text} (sampled)")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, values in sorted(histograms.items()):
+                counts, total = values[index]
+                label_text = _labels(labels)
+                cumulative = 0
+                for bound, count in zip(buckets, counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+                cumulative += counts[-1]
+                lines.append(f'{name}_bucket{{{label_text},le="+Inf"}} {cumulative}')
+                lines.append(f"{name}_sum{{{label_text}}} {total}")
+                lines.append(f"{name}_count{{{label_text}}} {cumulative}")
+        return '\n'.join(lines) + '\n'
+
+def _labels(labels):
+    view, method, status = labels
+    view = view.replace('\\', '\\\\').replace('"', '\\"')
+    return f'view="{view}",method="{method}",status="{status}"'
+
+registry = Registry()
+
+class QueryTimer:
+    """execute_wrapper that counts queries and the time spent running them."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route or 'unnamed'
+
+class MetricsMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+        if random.random() >= settings.METRICS_SAMPLE_RATE:
+            response = self.get_response(request)
+            registry.record((view_label(request), request.method, response.status_code), None)
+            return response
+        timer = QueryTimer()
+        started = time.perf_counter()
+        # Same as connection.execute_wrapper() on every alias, without the
+        # context manager overhead; this does not open database connections
+        wrapped = [connections[alias] for alias in connections]
+        for connection in wrapped:
+            connection.execute_wrappers.append(timer)
+        try:
+            response = self.get_response(request)
+        finally:
+            for connection in wrapped:
+                connection.execute_wrappers.remove(timer)
+        elapsed = time.perf_counter() - started
+        size = None if response.streaming else len(response.content)
+        registry.record(
+            (view_label(request), request.method, response.status_code),
+            (elapsed, timer.count, timer.seconds, size),
+        )
+        return response
+
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        return HttpResponseForbidden()
+    body = registry.render() + task_metrics.render(task_metrics.task_names())
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
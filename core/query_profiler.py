@@ -0,0 +1,158 @@
+"""
+Opt-in per-request SQL profiling and N+1 detection.
+
+QueryProfileMiddleware profiles a request when it carries the
+X-Profile-Queries header (matching QUERY_PROFILE_TOKEN when one is set) or
+is picked by QUERY_PROFILE_SAMPLE_RATE. A profiled request records every
+query with the project stack frame that issued it. It logs queries slower
+than QUERY_PROFILE_SLOW_MS, and flags N+1 patterns: the same query shape
+from the same origin QUERY_PROFILE_N_PLUS_ONE_THRESHOLD or more times. One
+JSON line per request goes to QUERY_PROFILE_LOG for `manage.py query_report`.
+
+assert_no_n_plus_one() applies the same detection to a block of code, for CI.
+"""
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+import django
+from django.conf import settings
+from django.db import connections
+from core import metrics
+from core.metrics import view_label
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r'\((?:%s|\?)(?:\s*,\s*(?:%s|\?))*\)')
+_LITERAL = re.compile(r"\b\d+\b|'(?:[^']|'')*'")
+_log_lock = threading.Lock()
+
+def query_shape(sql):
+    """SQL with IN lists and literals collapsed, so queries differing only in values match."""
+    return _LITERAL.sub('?', _IN_LIST.sub('(...)', sql))
+
+# Frames from the instrumentation and from Django itself are never the origin
+_SKIP_FILES = {__file__, metrics.__file__}
+_DJANGO_DIR = os.path.dirname(django.__file__) + os.sep
+
+def _origin():
+    # Innermost frame outside Django: project code, or a library such as a
+    # DRF serializer iterating a relation
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.startswith(_DJANGO_DIR) and filename not in _SKIP_FILES:
+            return f"{_short_path(filename)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return 'unknown'
+
+def _short_path(filename):
+    project = str(settings.BASE_DIR) + os.sep
+    if 'site-packages' + os.sep in filename:
+        return filename.split('site-packages' + os.sep, 1)[1]
+    if filename.startswith(project):
+        return filename[len(project):]
+    return filename
+
+class QueryRecorder:
+    """execute_wrapper that keeps (sql, seconds, origin) for each query."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - started, _origin()))
+
+    @contextmanager
+    def recording(self):
+        wrapped = [connections[alias] for alias in connections]
+        for connection in wrapped:
+            connection.execute_wrappers.append(self)
+        try:
+            yield self
+        finally:
+            for connection in wrapped:
+                connection.execute_wrappers.remove(self)
+
+    def n_plus_one(self, threshold=None):
+        """[(shape, origin, count)] for query shapes repeated from one place."""
+        threshold = threshold or settings.QUERY_PROFILE_N_PLUS_ONE_THRESHOLD
+        repeated = Counter((query_shape(sql), origin) for sql, _, origin in self.queries)
+        return [(shape, origin, count) for (shape, origin), count in repeated.most_common() if count >= threshold]
+
+    def slow(self, threshold_ms=None):
+        threshold = (threshold_ms if threshold_ms is not None else settings.QUERY_PROFILE_SLOW_MS) / 1000
+        return [(sql, seconds, origin) for sql, seconds, origin in self.queries if seconds >= threshold]
+
+    @property
+    def total_seconds(self):
+        return sum(seconds for _, seconds, _ in self.queries)
+
+@contextmanager
+def assert_no_n_plus_one(threshold=None):
+    """Fails with the offending query shapes if the block runs an N+1 pattern."""
+    recorder = QueryRecorder()
+    with recorder.recording():
+        yield recorder
+    findings = recorder.n_plus_one(threshold)
+    if findings:
+        raise AssertionError("N+1 queries detected:\n" + '\n'.join(
+            f"  {count}x from {origin}: {shape}" for shape, origin, count in findings
+        ))
+
+def write_profile(entry):
+    if not settings.QUERY_PROFILE_LOG:
+        return
+    line = json.dumps(entry) + '\n'
+    with _log_lock, open(settings.QUERY_PROFILE_LOG, 'a') as log:
+        log.write(line)
+
+class QueryProfileMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def requested(self, request):
+        header = request.headers.get('X-Profile-Queries')
+        if not header:
+            return False
+        return not settings.QUERY_PROFILE_TOKEN or header == settings.QUERY_PROFILE_TOKEN
+
+    def __call__(self, request):
+        requested = self.requested(request)
+        if not requested and random.random() >= settings.QUERY_PROFILE_SAMPLE_RATE:
+            return self.get_response(request)
+        recorder = QueryRecorder()
+        with recorder.recording():
+            response = self.get_response(request)
+        view = view_label(request)
+        n_plus_one = recorder.n_plus_one()
+        slow = recorder.slow()
+        for sql, seconds, origin in slow:
+            logger.warning("Slow query (%.1f ms) in %s from %s: %s", seconds * 1000, view, origin, sql)
+        for shape, origin, count in n_plus_one:
+            logger.warning("N+1 in %s: %d x %s from %s", view, count, shape, origin)
+        write_profile({
+            'view': view,
+            'method': request.method,
+            'status': response.status_code,
+            'queries': len(recorder.queries),
+            'db_ms': round(recorder.total_seconds * 1000, 3),
+            'n_plus_one': [{'shape': shape, 'origin': origin, 'count': count} for shape, origin, count in n_plus_one],
+            'slow': [{'sql': sql, 'ms': round(seconds * 1000, 3), 'origin': origin} for sql, seconds, origin in slow],
+        })
+        if requested:
+            response['X-Query-Count'] = str(len(recorder.queries))
+            response['X-Query-Time-Ms'] = f"{recorder.total_seconds * 1000:.1f}"
+            response['X-N-Plus-One'] = str(len(n_plus_one))
+        return response
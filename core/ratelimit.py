@@ -0,0 +1,157 @@
+"""
+Token-bucket rate limiting for expensive or abusable endpoints.
+
+settings.RATE_LIMITS maps a URL name to buckets of (scope, burst, per
+minute): 'ip' keys the bucket by client address, 'user' by the user id in
+the request's JWT (decoded without a database lookup, falling back to the
+address for anonymous requests). Each bucket holds up to burst tokens and
+refills at per-minute / 60 tokens a second; a request takes one token from
+every bucket of its route, or from none of them and gets a 429 with
+Retry-After.
+
+RateLimitMiddleware checks in process_view, once the route is known but
+before the view authenticates, hashes a password or touches the database.
+Buckets live in the RATE_LIMIT_CACHE cache (Redis in production, locmem in
+tests) and only use its atomic add() and incr(), so every process shares
+them; see CacheBucketStore.
+"""
+import math
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+class CacheBucketStore:
+    """
+    A bucket is two cache keys: when it started, and how many tokens it has
+    handed out since (an integer counter). It has earned burst + elapsed *
+    rate tokens, so the tokens left need no read-modify-write: taking one is
+    an incr(), and a take that overdraws any bucket is given back with decr().
+    Under contention that can turn a request away that would have fit, never
+    let one through that doesn't. Tokens beyond burst, earned while idle, are
+    written off by raising the counter. Both keys expire once the bucket
+    would be full again anyway.
+    """
+
+    def __init__(self, cache_backend):
+        self.cache = cache_backend
+
+    def take(self, buckets, cost=1):
+        """
+        Take cost tokens from every (key, capacity, rate) bucket, or from none
+        if any is short. Returns (allowed, [tokens left per bucket]).
+        """
+        now = time.time()
+        keys = []
+        for key, capacity, rate in buckets:
+            timeout = math.ceil(capacity / rate) + 1
+            self.cache.add(f"{key}:start", now, timeout)
+            self.cache.add(f"{key}:spent", 0, timeout)
+            keys += [f"{key}:start", f"{key}:spent"]
+        state = self.cache.get_many(keys)
+        earned = []
+        for key, capacity, rate in buckets:
+            start = state.get(f"{key}:start", now)
+            spent = state.get(f"{key}:spent", 0)
+            total = capacity + max(0.0, now - start) * rate
+            idle = math.floor(total - spent - capacity)
+            if idle > 0:
+                self._incr(f"{key}:spent", idle)
+            earned.append(total)
+        spent = [self._incr(f"{key}:spent", cost) for key, _, _ in buckets]
+        allowed = all(taken <= total for taken, total in zip(spent, earned))
+        if not allowed:
+            for key, _, _ in buckets:
+                self._incr(f"{key}:spent", -cost)
+            spent = [taken - cost for taken in spent]
+        for key, capacity, rate in buckets:
+            timeout = math.ceil(capacity / rate) + 1
+            self.cache.touch(f"{key}:start", timeout)
+            self.cache.touch(f"{key}:spent", timeout)
+        return allowed, [total - taken for taken, total in zip(spent, earned)]
+
+    def _incr(self, key, delta):
+        try:
+            return self.cache.incr(key, delta)
+        except ValueError:
+            # Expired between add() and here: a fresh bucket
+            self.cache.add(key, 0)
+            return self.cache.incr(key, delta)
+
+_stores = {}
+
+def get_store():
+    alias = settings.RATE_LIMIT_CACHE
+    if alias not in _stores:
+        _stores[alias] = CacheBucketStore(caches[alias])
+    return _stores[alias]
+
+def client_ip(request):
+    # With N trusted proxies in front, the client is the Nth address from the right
+    proxies = settings.RATE_LIMIT_TRUSTED_PROXIES
+    if proxies:
+        forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+def token_user_id(request):
+    """User id claimed by a valid Bearer access token, or None; no database access."""
+    header = request.headers.get('Authorization', '')
+    if not header.startswith('Bearer '):
+        return None
+    try:
+        return AccessToken(header[7:]).get(jwt_settings.USER_ID_CLAIM)
+    except TokenError:
+        return None
+
+def identity(request, scope):
+    if scope == 'user':
+        user_id = token_user_id(request)
+        if user_id is not None:
+            return f"user:{user_id}"
+    return f"ip:{client_ip(request)}"
+
+def check(request, route, buckets, store=None):
+    """None when allowed, otherwise seconds until the emptiest bucket has a token again."""
+    store = store or get_store()
+    limits = {}
+    for scope, burst, per_minute in buckets:
+        key = f"ratelimit:{route}:{identity(request, scope)}"
+        # Anonymous 'user' buckets fall back to the address; the stricter limit applies
+        previous = limits.get(key, (burst, per_minute / 60))
+        limits[key] = (min(burst, previous[0]), min(per_minute / 60, previous[1]))
+    buckets = [(key, burst, rate) for key, (burst, rate) in limits.items()]
+    # All or nothing, so a rejected request doesn't drain the buckets that had room
+    allowed, levels = store.take(buckets)
+    if allowed:
+        return None
+    # Nothing short means a concurrent request took the last token and has since given it back
+    return max(((1 - tokens) / rate for (_, _, rate), tokens in zip(buckets, levels) if tokens < 1), default=0)
+
+_REJECTED = b'{"detail":"Request was throttled."}'
+
+class RateLimitMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not settings.RATE_LIMIT_ENABLED:
+            return None
+        route = request.resolver_match.view_name
+        buckets = settings.RATE_LIMITS.get(route)
+        if not buckets:
+            return None
+        retry_after = check(request, route, buckets)
+        if retry_after is None:
+            return None
+        response = HttpResponse(_REJECTED, status=429, content_type='application/json')
+        response['Retry-After'] = str(max(1, math.ceil(retry_after)))
+        return response
@@ -0,0 +1,131 @@
+"""
+Per-service circuit breaker and AIMD concurrency limit for login automation.
+
+State lives in the default cache so every worker sees the same view of a
+Service. The breaker trips after SERVICE_BREAKER_FAILURE_THRESHOLD
+consecutive failures, rejects calls for SERVICE_BREAKER_COOLDOWN_SECONDS and
+then lets a single probe through (half-open). The concurrency limit grows by
+one per limit's worth of fast successes and halves on a failure or a call
+slower than SERVICE_LATENCY_TARGET_SECONDS.
+"""
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import cache
+
+class CircuitOpen(Exception):
+    pass
+
+class ConcurrencyLimited(Exception):
+    pass
+
+class ServiceGuard:
+    def __init__(self, service_id, cache_backend=None):
+        self.service_id = str(service_id)
+        self.cache = cache_backend or cache
+        prefix = f"service-guard:{self.service_id}"
+        self.failures_key = f"{prefix}:failures"
+        self.open_key = f"{prefix}:open"
+        self.probe_key = f"{prefix}:probe"
+        self.limit_key = f"{prefix}:limit"
+        self.inflight_key = f"{prefix}:inflight"
+
+    @property
+    def cooldown(self):
+        return settings.SERVICE_BREAKER_COOLDOWN_SECONDS
+
+    def _state(self, values):
+        if self.open_key in values:
+            return 'open'
+        if values.get(self.failures_key, 0) >= settings.SERVICE_BREAKER_FAILURE_THRESHOLD:
+            return 'half_open'
+        return 'closed'
+
+    def state(self):
+        return self._state(self.cache.get_many([self.failures_key, self.open_key]))
+
+    def limit(self):
+        return self.cache.get(self.limit_key, float(settings.SERVICE_CONCURRENCY_INITIAL))
+
+    def snapshot(self):
+        values = self.cache.get_many([self.failures_key, self.open_key, self.limit_key, self.inflight_key])
+        return {
+            'state': self._state(values),
+            'consecutive_failures': values.get(self.failures_key, 0),
+            'concurrency_limit': int(values.get(self.limit_key, settings.SERVICE_CONCURRENCY_INITIAL)),
+            'in_flight': values.get(self.inflight_key, 0),
+        }
+
+    def acquire(self):
+        state = self.state()
+        if state == 'open':
+            raise CircuitOpen(self.service_id)
+        # Half-open: only one probe at a time until it reports back
+        probing = state == 'half_open'
+        if probing and not self.cache.add(self.probe_key, 1, self.cooldown):
+            raise CircuitOpen(self.service_id)
+        # In-flight counter expires on its own if workers die holding slots;
+        # each acquire pushes that back, so it outlives the slots it counts
+        timeout = settings.LOGIN_AUTOMATION_TIMEOUT_SECONDS * 3
+        self.cache.add(self.inflight_key, 0, timeout)
+        in_flight = self.cache.incr(self.inflight_key)
+        self.cache.touch(self.inflight_key, timeout)
+        if in_flight > int(self.limit()):
+            self.release()
+            if probing:
+                # The probe never ran; let the next caller take it
+                self.cache.delete(self.probe_key)
+            raise ConcurrencyLimited(self.service_id)
+
+    def release(self):
+        try:
+            in_flight = self.cache.decr(self.inflight_key)
+        except ValueError:
+            return
+        # A counter that expired and restarted while slots were held would
+        # otherwise go negative as those slots come back
+        if in_flight < 0:
+            self.cache.incr(self.inflight_key, -in_flight)
+
+    def record_success(self, elapsed):
+        self.cache.delete_many([self.failures_key, self.probe_key])
+        limit = self.limit()
+        if elapsed > settings.SERVICE_LATENCY_TARGET_SECONDS:
+            limit = limit / 2
+        else:
+            limit = limit + 1 / limit
+        self._set_limit(limit)
+
+    def record_failure(self):
+        self.cache.add(self.failures_key, 0, None)
+        failures = self.cache.incr(self.failures_key)
+        self.cache.delete(self.probe_key)
+        if failures >= settings.SERVICE_BREAKER_FAILURE_THRESHOLD:
+            self.cache.set(self.open_key, time.time(), self.cooldown)
+        self._set_limit(self.limit() / 2)
+
+    def reset(self):
+        self.cache.delete_many([self.failures_key, self.open_key, self.probe_key, self.limit_key, self.inflight_key])
+
+    def _set_limit(self, limit):
+        limit = min(float(settings.SERVICE_CONCURRENCY_MAX), max(float(settings.SERVICE_CONCURRENCY_MIN), limit))
+        self.cache.set(self.limit_key, limit, None)
+
+@contextmanager
+def guarded(service_id, cache_backend=None):
+    """
+    Run the enclosed call under the service's breaker and concurrency limit.
+    Raises CircuitOpen or ConcurrencyLimited without running the call.
+    """
+    guard = ServiceGuard(service_id, cache_backend)
+    guard.acquire()
+    started = time.monotonic()
+    try:
+        yield guard
+    except Exception:
+        guard.record_failure()
+        raise
+    else:
+        guard.record_success(time.monotonic() - started)
+    finally:
+        guard.release()
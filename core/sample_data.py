@@ -0,0 +1,84 @@
+"""
+Synthetic rows for benchmarks and parity checks. Everything is created with
+bulk_create under a random tag so several runs can share a database.
+"""
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+from auth_app.models import User
+from cookie_management_app.models import Cookie, UserService
+from core.conditional import bump
+from payment_app.models import Payment
+from payment_app.reporting import record_status_changes
+from service_app.models import Service
+from service_app.stamps import PLANS, SERVICES
+from subscription_app.models import SubscriptionPlan
+
+def create_sample_data(rows, services=20, plans=5, batch_size=1000):
+    """rows users, each with one user service, cookie and payment; plans covering three services each."""
+    tag = uuid.uuid4().hex[:8]
+    now = timezone.now()
+    password = make_password(None)
+    service_objs = Service.objects.bulk_create([
+        Service(
+            name=f"svc-{tag}-{index}", display_name=f"Service {index}", login_url=f"https://svc{index}.example.com/login",
+            description="Sample service", category=('ai_chat', 'seo', 'analytics')[index % 3],
+        )
+        for index in range(services)
+    ])
+    plan_objs = SubscriptionPlan.objects.bulk_create([
+        SubscriptionPlan(name=f"plan-{tag}-{index}", description="Sample plan", price=Decimal('19.99'), duration_days=30, max_services=3)
+        for index in range(max(plans, 1))
+    ])
+    SubscriptionPlan.services.through.objects.bulk_create([
+        SubscriptionPlan.services.through(subscriptionplan_id=plan.pk, service_id=service_objs[(index * 3 + offset) % services].pk)
+        for index, plan in enumerate(plan_objs)
+        for offset in range(3)
+    ], ignore_conflicts=True)
+    # Bulk inserts skip the version stamp receivers
+    bump(SERVICES, PLANS)
+    plan = plan_objs[0]
+    users = User.objects.bulk_create([
+        User(email=f"user-{tag}-{index}@example.com", full_name=f"User {index}", password=password)
+        for index in range(rows)
+    ], batch_size=batch_size)
+    user_services = UserService.objects.bulk_create([
+        UserService(user=user, service=service_objs[index % services], is_active=index % 5 != 0)
+        for index, user in enumerate(users)
+    ], batch_size=batch_size)
+    Cookie.objects.bulk_create([
+        Cookie(
+            user_service=user_service, session_id=uuid.uuid4().hex, status='valid',
+            cookie_data={'session': uuid.uuid4().hex, 'csrftoken': uuid.uuid4().hex},
+            expires_at=now + timedelta(hours=index % 24 + 1),
+        )
+        for index, user_service in enumerate(user_services)
+    ], batch_size=batch_size)
+    payments = Payment.objects.bulk_create([
+        Payment(
+            user=user, subscription_plan=plan, amount=plan.price, payment_status='success',
+            payment_method=('stripe', 'paypal', 'crypto')[index % 3], transaction_id=f"txn-{tag}-{index}",
+            payment_metadata={'invoice': index},
+        )
+        for index, user in enumerate(users)
+    ], batch_size=batch_size)
+    # Created settled, so count them into the revenue aggregate as the webhook worker would
+    record_status_changes([(payment, 'pending', 'success') for payment in payments])
+    return tag
+
+def serializer_targets():
+    """(label, serializer class, queryset) for the list endpoints on the values fast path."""
+    from auth_app.serializers import UserSerializer
+    from cookie_management_app.serializers import CookieSerializer, UserServiceSerializer
+    from payment_app.serializers import PaymentSerializer
+    from service_app.serializers import ServiceSerializer, UserServiceSerializer as UserServiceWithServiceSerializer
+    return [
+        ('services', ServiceSerializer, Service.objects.order_by('pk')),
+        ('user_services', UserServiceWithServiceSerializer, UserService.objects.order_by('pk')),
+        ('pending', UserServiceSerializer, UserService.objects.filter(is_active=False).order_by('pk')),
+        ('cookies', CookieSerializer, Cookie.objects.order_by('pk')),
+        ('users', UserSerializer, User.objects.order_by('pk')),
+        ('payments', PaymentSerializer, Payment.objects.order_by('pk')),
+    ]
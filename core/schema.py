@@ -0,0 +1,81 @@
+"""
+Pre-rendered OpenAPI schema.
+
+The schema is introspected once per process (on first use) and kept as
+rendered JSON/YAML bytes with an ETag. When API_SCHEMA_DIR holds files
+written by `manage.py export_api_schema` at build time, those are served
+instead and no introspection happens at all.
+
+drf_yasg is only imported when a schema is rendered or a docs UI page is
+first requested, not at URLconf import.
+"""
+import hashlib
+from pathlib import Path
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import condition, require_safe
+
+# format -> media type of the drf_yasg codec
+FORMATS = {
+    'json': 'application/json',
+    'yaml': 'application/yaml',
+}
+
+_schemas = {}
+_ui_views = {}
+
+def api_info():
+    from drf_yasg import openapi
+    return openapi.Info(
+        title="Cookie Auth Backend API",
+        default_version='v1',
+        description="API documentation for Cookie Auth Backend",
+        terms_of_service="https://www.google.com/policies/terms/",
+        contact=openapi.Contact(email="contact@example.com"),
+        license=openapi.License(name="BSD License"),
+    )
+
+def render_schema(format):
+    from drf_yasg.app_settings import swagger_settings
+    from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+    codec = {'json': OpenAPICodecJson, 'yaml': OpenAPICodecYaml}[format]
+    generator = swagger_settings.DEFAULT_GENERATOR_CLASS(api_info(), url=settings.API_SCHEMA_URL or None)
+    return codec([]).encode(generator.get_schema(request=None, public=True))
+
+def schema_file(directory, format):
+    return Path(directory) / f"openapi.{format}"
+
+def get_schema(format):
+    """(body bytes, ETag) for format, rendered or loaded once per process."""
+    if format not in _schemas:
+        path = schema_file(settings.API_SCHEMA_DIR, format) if settings.API_SCHEMA_DIR else None
+        body = path.read_bytes() if path and path.exists() else render_schema(format)
+        _schemas[format] = (body, '"%s"' % hashlib.sha256(body).hexdigest()[:32])
+    return _schemas[format]
+
+def _etag(request, format):
+    return get_schema(format.lstrip('.'))[1]
+
+@require_safe
+@condition(etag_func=_etag)
+def schema_file_view(request, format):
+    format = format.lstrip('.')
+    body, _ = get_schema(format)
+    response = HttpResponse(body, content_type=FORMATS[format])
+    response['Cache-Control'] = f"public, max-age={settings.API_SCHEMA_MAX_AGE}"
+    return response
+
+def schema_ui_view(renderer):
+    """
+    Swagger/ReDoc page view, built on first request. The pages render an
+    empty schema and load the pre-rendered one from schema-json
+    (SWAGGER_SETTINGS/REDOC_SETTINGS SPEC_URL).
+    """
+    def view(request, *args, **kwargs):
+        if renderer not in _ui_views:
+            from drf_yasg.views import get_schema_view
+            from rest_framework import permissions
+            schema_view = get_schema_view(api_info(), public=True, permission_classes=(permissions.AllowAny,))
+            _ui_views[renderer] = schema_view.with_ui(renderer, cache_timeout=0)
+        return _ui_views[renderer](request, *args, **kwargs)
+    return view
@@ -0,0 +1,174 @@
+"""
+Production-scale synthetic data for `manage.py seed` and `manage.py loadtest`.
+
+Rows are generated per chunk of users with bulk_create, so memory stays
+bounded at any volume. Every seeded user can log in with SEED_PASSWORD, has
+an active subscription whose plan covers their services, and one valid
+cookie per service, so the load test's flows (login, list services,
+purchase, fetch cookie) all succeed. Everything is named after a random tag,
+and several runs can share a database.
+"""
+import math
+import random
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from auth_app.models import User
+from cookie_management_app.entitlements import refresh_user_entitlements
+from cookie_management_app.models import Cookie, CookieInjectionLog, LoginService, UserService
+from core.conditional import bump
+from core.utils import encrypt_data
+from payment_app.models import Payment
+from payment_app.reporting import rebuild_daily_revenue
+from service_app.models import Service
+from service_app.stamps import PLANS, SERVICES
+from subscription_app.models import SubscriptionPlan, UserSubscription
+
+SEED_PASSWORD = 'seed-password'
+
+CATEGORIES = ('ai_chat', 'ai_image', 'seo', 'analytics', 'other')
+METHODS = ('stripe', 'paypal', 'crypto')
+
+def seed_email(tag, index):
+    return f"seed-{tag}-{index}@example.com"
+
+def _catalog(tag, users, services, plans, logins_per_service, services_per_user):
+    service_objs = Service.objects.bulk_create([
+        Service(
+            name=f"seed-{tag}-{index}", display_name=f"Service {index}", login_url=f"https://svc{index}.example.com/login",
+            description="Seeded service", category=CATEGORIES[index % len(CATEGORIES)],
+        )
+        for index in range(services)
+    ])
+    # Same ciphertext for every account: only the row count matters here
+    password = encrypt_data('seeded-account-password').decode()
+    # Room for the expected share of users, with headroom for uneven picks
+    seats = max(5, 2 * math.ceil(users * services_per_user / (services * logins_per_service)))
+    login_objs = LoginService.objects.bulk_create([
+        LoginService(
+            service=service, username=f"seed-{tag}-{index}-{slot}", encrypted_password=password,
+            max_concurrent_users=seats,
+        )
+        for index, service in enumerate(service_objs)
+        for slot in range(logins_per_service)
+    ])
+    plan_objs = SubscriptionPlan.objects.bulk_create([
+        SubscriptionPlan(
+            name=f"seed-{tag}-{index}", description="Seeded plan", price=Decimal('9.99') * (index + 1),
+            duration_days=30, max_services=max(1, services // plans),
+        )
+        for index in range(plans)
+    ])
+    # Plan i covers a contiguous slice of the services
+    per_plan = max(1, services // plans)
+    plan_services = {
+        plan.pk: service_objs[index * per_plan:(index + 1) * per_plan] or service_objs[-per_plan:]
+        for index, plan in enumerate(plan_objs)
+    }
+    SubscriptionPlan.services.through.objects.bulk_create([
+        SubscriptionPlan.services.through(subscriptionplan_id=plan_id, service_id=service.pk)
+        for plan_id, covered in plan_services.items()
+        for service in covered
+    ])
+    # Bulk inserts skip the version stamp receivers
+    bump(SERVICES, PLANS)
+    logins = {}
+    for login in login_objs:
+        logins.setdefault(login.service_id, []).append(login)
+    return plan_objs, plan_services, logins
+
+def _seed_users(tag, start, count, plans, plan_services, logins, services_per_user, logs_per_cookie, password, rng):
+    now = timezone.now()
+    users = User.objects.bulk_create([
+        User(email=seed_email(tag, index), full_name=f"Seed User {index}", password=password, is_verified=True)
+        for index in range(start, start + count)
+    ])
+    payments, subscriptions, user_services = [], [], []
+    # One or two addresses per user, like a home and an office
+    addresses = {}
+    for offset, user in enumerate(users):
+        index = start + offset
+        plan = plans[index % len(plans)]
+        payment = Payment(
+            user=user, subscription_plan=plan, amount=plan.price, payment_status='success',
+            payment_method=METHODS[index % len(METHODS)], transaction_id=f"seed-{tag}-{index}",
+            payment_metadata={'seeded': True},
+        )
+        payments.append(payment)
+        subscriptions.append(UserSubscription(
+            user=user, subscription=plan, payment=payment, expires_at=now + timedelta(days=rng.randint(1, plan.duration_days)),
+        ))
+        addresses[user.pk] = [
+            f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}" for _ in range(rng.choice((1, 1, 1, 2)))
+        ]
+        covered = plan_services[plan.pk]
+        for service in rng.sample(covered, min(services_per_user, len(covered))):
+            user_services.append(UserService(user=user, service=service, login_service=rng.choice(logins[service.pk])))
+    Payment.objects.bulk_create(payments)
+    UserSubscription.objects.bulk_create(subscriptions)
+    UserService.objects.bulk_create(user_services)
+    cookies = Cookie.objects.bulk_create([
+        Cookie(
+            user_service=user_service, session_id=uuid.uuid4().hex, status='valid',
+            cookie_data={'session': uuid.uuid4().hex, 'csrftoken': uuid.uuid4().hex},
+            expires_at=now + timedelta(hours=rng.randint(2, 48)),
+        )
+        for user_service in user_services
+    ])
+    logs = CookieInjectionLog.objects.bulk_create([
+        CookieInjectionLog(
+            cookie=cookie, user_id=cookie.user_service.user_id, injection_status='success', message="Seeded",
+            ip_address=rng.choice(addresses[cookie.user_service.user_id]),
+        )
+        for cookie in cookies
+        for _ in range(logs_per_cookie)
+    ])
+    # timestamp is auto_now_add; spread the logs over the last day in
+    # quarter-hour steps, one UPDATE per step (bulk_update is far slower)
+    steps = {}
+    for log in logs:
+        steps.setdefault(rng.randrange(96), []).append(log.pk)
+    for step, pks in steps.items():
+        CookieInjectionLog.objects.filter(pk__in=pks).update(timestamp=now - timedelta(minutes=15 * step))
+    refresh_user_entitlements([user.pk for user in users])
+    return {
+        'users': len(users), 'payments': len(payments), 'subscriptions': len(subscriptions),
+        'user_services': len(user_services), 'cookies': len(cookies), 'injection_logs': len(logs),
+    }
+
+def seed(users, services=50, plans=5, logins_per_service=3, services_per_user=2, logs_per_cookie=5, chunk_size=5000, random_seed=None):
+    """
+    Generator: yields (tag, rows created so far by model) after the catalog
+    and after each chunk of users.
+    """
+    tag = uuid.uuid4().hex[:8]
+    rng = random.Random(random_seed)
+    with transaction.atomic():
+        plan_objs, plan_services, logins = _catalog(tag, users, services, plans, logins_per_service, services_per_user)
+    totals = {'services': services, 'login_services': services * logins_per_service, 'plans': plans}
+    yield tag, dict(totals)
+    password = make_password(SEED_PASSWORD)
+    for start in range(0, users, chunk_size):
+        with transaction.atomic():
+            counts = _seed_users(
+                tag, start, min(chunk_size, users - start), plan_objs, plan_services, logins,
+                services_per_user, logs_per_cookie, password, rng,
+            )
+        for model, count in counts.items():
+            totals[model] = totals.get(model, 0) + count
+        yield tag, dict(totals)
+    # Seats actually taken on each seeded account
+    seats = (
+        UserService.objects.filter(login_service__username__startswith=f"seed-{tag}-")
+        .values('login_service').annotate(taken=Count('pk')).values_list('login_service', 'taken')
+    )
+    LoginService.objects.bulk_update([
+        LoginService(pk=login_service_id, current_users=taken) for login_service_id, taken in seats
+    ], ['current_users'], batch_size=chunk_size)
+    # The payments were bulk-created as settled, past the webhook worker that
+    # keeps the revenue aggregate
+    rebuild_daily_revenue()
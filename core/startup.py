@@ -0,0 +1,52 @@
+"""
+Measuring process startup: django.setup() plus loading the URLconf, run in
+a fresh interpreter so nothing is already imported. Used by
+`manage.py profile_imports` and `manage.py check_startup_time`.
+"""
+import json
+import os
+import subprocess
+import sys
+from django.conf import settings
+
+# Modules web processes load lazily; importing any at startup is a regression
+LAZY_IN_WEB = ('celery', 'kombu', 'drf_yasg.views', 'drf_yasg.generators')
+
+STARTUP_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver, reverse
+get_resolver().resolve('/api/service/services/available/')
+# Reversing builds the whole URLconf, importing every view module
+reverse('schema-redoc')
+if sys.argv[1] == 'worker':
+    from cookie_auth_backend.celery import app
+    app.loader.import_default_modules()
+print(json.dumps({
+    'seconds': time.perf_counter() - started,
+    'lazy_modules_loaded': sorted(name for name in sys.argv[2:] if name in sys.modules),
+}))
+"""
+
+def run_startup(role, importtime=False):
+    """(result dict, stderr) of one fresh process starting up as role ('web' or 'worker')."""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'cookie_auth_backend.settings'), PROCESS_ROLE=role)
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', STARTUP_SCRIPT, role, *LAZY_IN_WEB]
+    completed = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+    if completed.returncode:
+        raise RuntimeError(f"Startup failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1]), completed.stderr
+
+def parse_importtime(stderr):
+    """[(module, self us, cumulative us, depth)] from `python -X importtime` output."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        # One space after the bar, then two per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
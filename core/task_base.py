@@ -0,0 +1,28 @@
+import logging
+import time
+from celery import Task
+from celery.exceptions import Retry
+from core.task_metrics import record_run, rows_processed
+
+logger = logging.getLogger(__name__)
+
+class InstrumentedTask(Task):
+    """Base class of every project task (task_cls in cookie_auth_backend/celery.py); see core.task_metrics."""
+
+    def __call__(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = super().__call__(*args, **kwargs)
+        except Retry:
+            record_run(self.name, 'retry', time.perf_counter() - started)
+            raise
+        except Exception:
+            seconds = time.perf_counter() - started
+            record_run(self.name, 'failure', seconds)
+            logger.exception("Task %s failed after %.3f s", self.name, seconds)
+            raise
+        seconds = time.perf_counter() - started
+        rows = rows_processed(result)
+        record_run(self.name, 'success', seconds, rows)
+        logger.info("Task %s finished in %.3f s, %s rows", self.name, seconds, rows if rows is not None else 'no')
+        return result
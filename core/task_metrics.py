@@ -0,0 +1,78 @@
+"""
+Counters for Celery task runs.
+
+core.task_base.InstrumentedTask records each run's outcome (success, failure
+or retry), its duration and the rows it processed: the return value when it
+is an int, or its 'rows' entry when it is a dict.
+
+Workers are separate processes, so the counters live in the cache (shared
+when REDIS_URL is set) rather than in core.metrics.registry; /metrics
+renders them next to the request metrics. This module does not import
+Celery, so web processes can render them without loading it.
+"""
+import time
+from django.core.cache import cache
+
+STATES = ('success', 'failure', 'retry')
+
+NAMES_KEY = 'task-stats:names'
+
+# Cache entries never expire; the counters are monotonic like Prometheus counters
+def _key(task_name, counter):
+    return f"task-stats:{task_name}:{counter}"
+
+def _incr(key, delta):
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.add(key, delta, None)
+
+def rows_processed(result):
+    if isinstance(result, bool):
+        return None
+    if isinstance(result, int):
+        return result
+    if isinstance(result, dict) and isinstance(result.get('rows'), int):
+        return result['rows']
+    return None
+
+def task_names():
+    """Names of the tasks that have run."""
+    return sorted(cache.get(NAMES_KEY) or ())
+
+def record_run(task_name, state, seconds, rows=None):
+    names = cache.get(NAMES_KEY) or set()
+    if task_name not in names:
+        # Racing first runs of two tasks can drop one name; its next run adds it back
+        cache.set(NAMES_KEY, names | {task_name}, None)
+    _incr(_key(task_name, state), 1)
+    _incr(_key(task_name, 'duration_us'), int(seconds * 1e6))
+    if rows:
+        _incr(_key(task_name, 'rows'), rows)
+    if state == 'success':
+        cache.set(_key(task_name, 'last_success'), time.time(), None)
+
+def task_stats(task_names):
+    """{task name: {counter: value}} for the given tasks."""
+    counters = STATES + ('duration_us', 'rows', 'last_success')
+    values = cache.get_many([_key(name, counter) for name in task_names for counter in counters])
+    return {
+        name: {counter: values.get(_key(name, counter), 0) for counter in counters}
+        for name in task_names
+    }
+
+def render(task_names):
+    """Prometheus text for the given tasks."""
+    stats = sorted(task_stats(task_names).items())
+    lines = ["# HELP celery_task_runs_total Task runs by outcome", "# TYPE celery_task_runs_total counter"]
+    for name, values in stats:
+        lines += [f'celery_task_runs_total{{task="{name}",state="{state}"}} {values[state]}' for state in STATES]
+    lines += ["# HELP celery_task_duration_seconds_total Time spent running the task", "# TYPE celery_task_duration_seconds_total counter"]
+    lines += [f'celery_task_duration_seconds_total{{task="{name}"}} {values["duration_us"] / 1e6}' for name, values in stats]
+    lines += ["# HELP celery_task_rows_processed_total Rows processed by the task", "# TYPE celery_task_rows_processed_total counter"]
+    lines += [f'celery_task_rows_processed_total{{task="{name}"}} {values["rows"]}' for name, values in stats]
+    lines += ["# HELP celery_task_last_success_timestamp_seconds Unix time of the last successful run", "# TYPE celery_task_last_success_timestamp_seconds gauge"]
+    lines += [f'celery_task_last_success_timestamp_seconds{{task="{name}"}} {values["last_success"]}' for name, values in stats]
+    return '\n'.join(lines) + '\n'
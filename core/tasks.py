@@ -1,34 +1,200 @@
+import logging
 from celery import shared_task
-from cookie_management_app.models import LoginService, Cookie
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import send_mass_mail
+from django.db import transaction
+from cookie_management_app.models import LoginService, Cookie, UserService
+from cookie_management_app.entitlements import reconcile_entitlements
+from cookie_management_app.stamps import COOKIES, cookie_scope, cookies_scope
+from payment_app.gateway import drain_webhook_events
 from django.utils import timezone
+from core.conditional import bump
+from core.cookie_refresh import batches, due_login_services
+from core.locks import single_flight
+from core.login_automation import LoginFailed, post_login, session_is_valid
+from core.resilience import CircuitOpen, ConcurrencyLimited, guarded
+from core.utils import decrypt_data
+from subscription_app.lifecycle import expire_due
+from subscription_app.models import UserSubscription
 
-@shared_task
-def extract_cookies_for_service(login_service_id):
-    try:
-        login_service = LoginService.objects.get(pk=login_service_id)
-        # Simulate login and cookie extraction process
-        cookies = {"session": "dummy_cookie_value"}
-        # Save cookie (this is just an example)
-        Cookie.objects.create(
-            user_service=None,  # Associate appropriately
-            cookie_data=cookies,
-            expires_at=timezone.now() + timezone.timedelta(hours=24),
-            status='valid'
+# shared_task binds to the current app; make sure it is the project's
+import cookie_auth_backend.celery  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+def _extract_cookies(login_service_id):
+    login_service = LoginService.objects.select_related('service').get(pk=login_service_id)
+    password = decrypt_data(login_service.encrypted_password.encode())
+    with guarded(login_service.service_id):
+        cookies = post_login(
+            login_service.service.login_url, login_service.username, password,
+            login_service.additional_credentials,
+        )
+    expires_at = timezone.now() + timezone.timedelta(hours=24)
+    # Expiring the old cookies and writing the new ones commit together, so
+    # readers never see the account with neither
+    with transaction.atomic():
+        # The fresh session replaces the cookies of every user sharing this account
+        user_services = list(UserService.objects.filter(login_service=login_service, is_active=True))
+        replaced = list(
+            Cookie.objects.filter(user_service__login_service=login_service, status='valid')
+            .values_list('pk', 'user_service__user_id')
         )
-    except Exception as e:
-        print(f"Error extracting cookies: {e}")
+        Cookie.objects.filter(pk__in=[pk for pk, _ in replaced]).update(status='expired')
+        created = Cookie.objects.bulk_create([
+            Cookie(user_service=user_service, cookie_data=cookies, expires_at=expires_at, status='valid')
+            for user_service in user_services
+        ])
+        owners = {user_id for _, user_id in replaced} | {user_service.user_id for user_service in user_services}
+        bump(*[cookie_scope(pk) for pk, _ in replaced], *[cookies_scope(user_id) for user_id in owners])
+    return created
+
+def extract_cookies_once(login_service_id):
+    """
+    Extract cookies for a LoginService unless another caller is already doing
+    it or just did, in which case the cookies that caller wrote are returned
+    without a second login.
+    """
+    since = timezone.now() - timezone.timedelta(seconds=settings.COOKIE_EXTRACTION_FRESHNESS_SECONDS)
+
+    def fresh_cookies():
+        return list(Cookie.objects.filter(
+            user_service__login_service=login_service_id, status='valid', extracted_at__gte=since,
+        ))
+
+    recent = fresh_cookies()
+    if recent:
+        return recent
+    return single_flight(
+        f"extract-cookies:{login_service_id}",
+        lambda: _extract_cookies(login_service_id),
+        fresh_cookies,
+        ttl=settings.COOKIE_EXTRACTION_LEASE_SECONDS,
+    )
+
+# Long-running tasks are acknowledged once finished (acks_late), so a worker
+# crash redelivers them; they are safe to run twice.
+
+@shared_task(bind=True, max_retries=5, acks_late=True)
+def extract_cookies_for_service(self, login_service_id):
+    try:
+        return len(extract_cookies_once(login_service_id))
+    except (CircuitOpen, ConcurrencyLimited) as e:
+        # Back off instead of piling onto a struggling service
+        raise self.retry(exc=e, countdown=settings.SERVICE_BREAKER_COOLDOWN_SECONDS)
+
+@shared_task(acks_late=True)
+def refresh_cookies_batch(login_service_ids):
+    rows = failed = 0
+    for login_service_id in login_service_ids:
+        try:
+            rows += len(extract_cookies_once(login_service_id))
+        except (CircuitOpen, ConcurrencyLimited):
+            extract_cookies_for_service.apply_async(args=[login_service_id], countdown=settings.SERVICE_BREAKER_COOLDOWN_SECONDS)
+        except Exception:
+            failed += 1
+            logger.exception("Error extracting cookies for login service %s", login_service_id)
+    return {'rows': rows, 'failed': failed}
 
 @shared_task
+def schedule_cookie_refreshes():
+    # Dispatch the login services whose pre-refresh falls into the current slot
+    due = [
+        str(login_service_id) for login_service_id in due_login_services()
+        # Skip anything an earlier run already dispatched and that hasn't refreshed yet
+        if cache.add(f"cookie-refresh:{login_service_id}", 1, settings.COOKIE_REFRESH_DISPATCH_TTL_SECONDS)
+    ]
+    for batch in batches(due, settings.COOKIE_REFRESH_BATCH_SIZE):
+        refresh_cookies_batch.delay(batch)
+    return len(due)
+
+@shared_task(acks_late=True)
 def validate_existing_cookies():
     # Check each cookie and update its status accordingly
-    pass
+    now = timezone.now()
+    rows = Cookie.objects.filter(status='valid', expires_at__lte=now).update(status='expired')
+    login_service_ids = (
+        Cookie.objects.filter(status='valid', user_service__login_service__isnull=False)
+        .values_list('user_service__login_service', flat=True).distinct()
+    )
+    for login_service_id in login_service_ids:
+        # Users of one account share its session, so one probe covers all their cookies
+        cookies = Cookie.objects.filter(status='valid', user_service__login_service=login_service_id)
+        cookie = cookies.select_related('user_service__service').first()
+        if cookie is None:
+            continue
+        try:
+            with guarded(cookie.user_service.service_id):
+                valid = session_is_valid(cookie.user_service.service.login_url, cookie.cookie_data.value)
+        except (CircuitOpen, ConcurrencyLimited, LoginFailed):
+            # Left as is; the next run tries again
+            continue
+        rows += cookies.update(status='valid' if valid else 'invalid', last_validated=now)
+    if rows:
+        bump(COOKIES)
+    return rows
 
-@shared_task
-def cleanup_expired_data():
-    # Remove expired cookies and subscriptions
-    pass
+@shared_task(acks_late=True)
+def cleanup_expired_data(batch_size=None):
+    # Delete cookies that stopped being valid COOKIE_RETENTION_DAYS ago, with
+    # their injection logs. Lapsed subscriptions are expire_due_subscriptions' job.
+    batch_size = batch_size or settings.MAINTENANCE_BATCH_SIZE
+    now = timezone.now()
+    stale = Cookie.objects.exclude(status='valid').filter(
+        expires_at__lt=now - timezone.timedelta(days=settings.COOKIE_RETENTION_DAYS)
+    )
+    cookies_deleted = 0
+    while True:
+        # Bounded batches keep each delete's transaction and locks short
+        pks = list(stale.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            break
+        cookies_deleted += Cookie.objects.filter(pk__in=pks).delete()[1].get(Cookie._meta.label, 0)
+    return {'rows': cookies_deleted, 'cookies_deleted': cookies_deleted}
 
-@shared_task
+@shared_task(acks_late=True)
+def expire_due_subscriptions(batch_size=None):
+    # Deactivate subscriptions past expires_at and revoke the user services and seats they covered
+    counts = expire_due(batch_size=batch_size)
+    return dict(counts, rows=counts['subscriptions'])
+
+def _expiry_notice_key(subscription):
+    return f"expiry-notice:{subscription.pk}:{subscription.expires_at.date()}"
+
+@shared_task(acks_late=True)
 def send_subscription_expiry_notifications():
-    # Notify users whose subscriptions are nearing expiry
-    pass
+    # Email users whose subscriptions expire within SUBSCRIPTION_EXPIRY_NOTICE_DAYS, once per expiry date
+    now = timezone.now()
+    notice = timezone.timedelta(days=settings.SUBSCRIPTION_EXPIRY_NOTICE_DAYS)
+    expiring = list(
+        UserSubscription.objects.filter(is_active=True, expires_at__gt=now, expires_at__lte=now + notice)
+        .select_related('user', 'subscription')
+    )
+    sent = cache.get_many([_expiry_notice_key(subscription) for subscription in expiring])
+    pending = [subscription for subscription in expiring if _expiry_notice_key(subscription) not in sent]
+    if not pending:
+        return 0
+    send_mass_mail([
+        (
+            f"Your {subscription.subscription.name} subscription expires soon",
+            f"Hi {subscription.user.full_name},\n\nYour {subscription.subscription.name} subscription "
+            f"expires on {subscription.expires_at:%Y-%m-%d %H:%M} UTC. Renew it to keep access to your services.",
+            settings.DEFAULT_FROM_EMAIL,
+            [subscription.user.email],
+        )
+        for subscription in pending
+    ])
+    # Marked only once sent, so a failed run is retried in full
+    cache.set_many({_expiry_notice_key(subscription): 1 for subscription in pending}, notice.total_seconds() + 86400)
+    return len(pending)
+
+@shared_task
+def process_payment_webhook_events(batch_size=500):
+    # Apply queued payment gateway events in bulk
+    return drain_webhook_events(batch_size)
+
+@shared_task(acks_late=True)
+def reconcile_user_entitlements(chunk_size=1000):
+    # Rebuild UserEntitlement rows to repair anything the signals missed
+    return reconcile_entitlements(chunk_size)
@@ -0,0 +1,17 @@
+from django.test import TestCase
+from core.management.commands.check_n_plus_one import ENDPOINTS, create_endpoint_data, get_endpoint
+from core.query_profiler import assert_no_n_plus_one
+
+class NPlusOneTests(TestCase):
+    """The list endpoints `manage.py check_n_plus_one` covers, run in the suite."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.admin = create_endpoint_data(50)
+
+    def test_list_endpoints_have_no_n_plus_one(self):
+        for name, as_admin in ENDPOINTS:
+            with self.subTest(name):
+                with assert_no_n_plus_one():
+                    response = get_endpoint(name, self.admin if as_admin else self.user)
+                self.assertEqual(response.status_code, 200)
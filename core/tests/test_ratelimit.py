@@ -0,0 +1,76 @@
+import uuid
+from unittest import mock
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.response import Response
+from core.ratelimit import get_store
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+class CacheBucketStoreTests(SimpleTestCase):
+    """Runs the store the middleware uses, over the locmem cache tests get."""
+
+    def setUp(self):
+        self.store = get_store()
+        self.clock = Clock()
+        patcher = mock.patch('core.ratelimit.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(cache.clear)
+
+    def bucket(self, capacity, per_second):
+        return (f"test:{uuid.uuid4().hex}", capacity, per_second)
+
+    def take(self, *buckets):
+        return self.store.take(list(buckets))[0]
+
+    def test_burst_then_refill(self):
+        bucket = self.bucket(3, 1.0)
+        self.assertEqual([self.take(bucket) for _ in range(4)], [True, True, True, False])
+        self.clock.now += 1
+        self.assertTrue(self.take(bucket))
+        self.assertFalse(self.take(bucket))
+
+    def test_idle_time_does_not_grow_the_burst(self):
+        bucket = self.bucket(2, 1.0)
+        self.take(bucket)
+        self.clock.now += 3600
+        self.assertEqual([self.take(bucket) for _ in range(3)], [True, True, False])
+
+    def test_rejection_takes_from_no_bucket(self):
+        roomy, empty = self.bucket(5, 1.0), self.bucket(1, 1.0)
+        self.assertTrue(self.take(roomy, empty))
+        for _ in range(10):
+            self.assertFalse(self.take(roomy, empty))
+        allowed, levels = self.store.take([roomy])
+        self.assertTrue(allowed)
+        self.assertEqual(levels, [3])
+
+    def test_expired_bucket_starts_full(self):
+        bucket = self.bucket(2, 1.0)
+        self.take(bucket)
+        self.take(bucket)
+        cache.delete_many([f"{bucket[0]}:start", f"{bucket[0]}:spent"])
+        self.assertTrue(self.take(bucket))
+
+@override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMITS={'register': [('ip', 2, 1)]})
+class RateLimitMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.addCleanup(cache.clear)
+
+    def test_over_the_limit_gets_429_before_the_view(self):
+        url = reverse('register')
+        with mock.patch('auth_app.views.RegisterView.post') as view:
+            view.return_value = Response(status=201)
+            statuses = [self.client.post(url, {}, REMOTE_ADDR='203.0.113.9').status_code for _ in range(3)]
+        self.assertEqual(statuses, [201, 201, 429])
+        self.assertEqual(view.call_count, 2)
+        response = self.client.post(url, {}, REMOTE_ADDR='203.0.113.9')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
@@ -0,0 +1,152 @@
+import uuid
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from auth_app.models import User
+from cookie_management_app.models import LoginService, UserService
+from core.fake_login_server import FakeLoginServer
+from core.login_automation import LoginFailed
+from core.resilience import CircuitOpen, ConcurrencyLimited, ServiceGuard, guarded
+from core.tasks import _extract_cookies
+from core.utils import decrypt_data
+from service_app.models import Service
+
+@override_settings(
+    SERVICE_BREAKER_FAILURE_THRESHOLD=3, SERVICE_CONCURRENCY_INITIAL=4,
+    SERVICE_CONCURRENCY_MIN=1, SERVICE_CONCURRENCY_MAX=8, SERVICE_LATENCY_TARGET_SECONDS=1.0,
+)
+class ServiceGuardTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = LocMemCache(f"guard-{uuid.uuid4().hex}", {})
+        self.guard = ServiceGuard('service', self.cache)
+
+    def call(self, fail=False):
+        with guarded('service', self.cache):
+            if fail:
+                raise LoginFailed('down')
+
+    def fail(self, times=1):
+        for _ in range(times):
+            with self.assertRaises(LoginFailed):
+                self.call(fail=True)
+
+    def cool_down(self):
+        # As the open state expiring after SERVICE_BREAKER_COOLDOWN_SECONDS would
+        self.cache.delete(self.guard.open_key)
+
+    def test_opens_after_consecutive_failures(self):
+        self.fail(2)
+        self.assertEqual(self.guard.state(), 'closed')
+        self.fail()
+        self.assertEqual(self.guard.state(), 'open')
+        with self.assertRaises(CircuitOpen):
+            self.call()
+
+    def test_success_resets_the_failure_count(self):
+        self.fail(2)
+        self.call()
+        self.fail(2)
+        self.assertEqual(self.guard.state(), 'closed')
+
+    def test_half_open_probe_closes_on_success(self):
+        self.fail(3)
+        self.cool_down()
+        self.assertEqual(self.guard.state(), 'half_open')
+        self.guard.acquire()
+        # Only one probe at a time
+        with self.assertRaises(CircuitOpen):
+            self.guard.acquire()
+        self.guard.record_success(0.1)
+        self.guard.release()
+        self.assertEqual(self.guard.state(), 'closed')
+        self.call()
+
+    def test_failed_probe_opens_again(self):
+        self.fail(3)
+        self.cool_down()
+        self.fail()
+        self.assertEqual(self.guard.state(), 'open')
+
+    def test_concurrency_limit(self):
+        self.guard._set_limit(2)
+        self.guard.acquire()
+        self.guard.acquire()
+        with self.assertRaises(ConcurrencyLimited):
+            self.guard.acquire()
+        self.assertEqual(self.guard.snapshot()['in_flight'], 2)
+        self.guard.release()
+        self.guard.acquire()
+
+    def test_limited_probe_gives_the_probe_back(self):
+        self.fail(3)
+        self.cool_down()
+        self.guard._set_limit(1)
+        self.cache.set(self.guard.inflight_key, 1)
+        with self.assertRaises(ConcurrencyLimited):
+            self.guard.acquire()
+        self.guard.release()
+        self.guard.acquire()
+
+    def test_limit_halves_on_failure_and_slow_calls(self):
+        self.fail()
+        self.assertEqual(self.guard.limit(), 2)
+        self.guard.record_success(5.0)
+        self.assertEqual(self.guard.limit(), 1)
+        self.guard.record_success(0.1)
+        self.assertEqual(self.guard.limit(), 2)
+
+    def test_in_flight_never_goes_negative(self):
+        self.guard.acquire()
+        self.cache.delete(self.guard.inflight_key)
+        self.guard.acquire()
+        self.guard.release()
+        self.guard.release()
+        self.assertEqual(self.guard.snapshot()['in_flight'], 0)
+
+@override_settings(SERVICE_BREAKER_FAILURE_THRESHOLD=2, LOGIN_AUTOMATION_TIMEOUT_SECONDS=5)
+class CookieExtractionTests(TestCase):
+    def setUp(self):
+        self.server = FakeLoginServer(seed=1).start()
+        self.addCleanup(self.server.stop)
+        self.service = Service.objects.create(
+            name=f"svc-{uuid.uuid4().hex[:8]}", display_name='Service', login_url=self.server.url,
+            description='', category='test',
+        )
+        self.addCleanup(ServiceGuard(self.service.pk).reset)
+        admin = User.objects.create_superuser('admin@example.com', 'Admin', 'pw')
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+    def add_login_service(self):
+        response = self.client.post(reverse('loginservice-add'), {
+            'service': str(self.service.pk), 'username': 'shared', 'password': 'hunter2',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertNotIn('encrypted_password', response.data)
+        self.assertNotIn('password', response.data)
+        return LoginService.objects.get(pk=response.data['id'])
+
+    def test_password_is_stored_encrypted(self):
+        login_service = self.add_login_service()
+        self.assertEqual(decrypt_data(login_service.encrypted_password.encode()), 'hunter2')
+
+    def test_extracts_cookies_for_a_login_service_added_through_the_api(self):
+        login_service = self.add_login_service()
+        user = User.objects.create_user(email='user@example.com', full_name='User')
+        UserService.objects.create(user=user, service=self.service, login_service=login_service)
+        created = _extract_cookies(login_service.pk)
+        self.assertEqual(len(created), 1)
+        self.assertEqual(created[0].status, 'valid')
+
+    def test_breaker_opens_on_failing_logins(self):
+        login_service = self.add_login_service()
+        self.server.error_rate = 1.0
+        for _ in range(2):
+            with self.assertRaises(LoginFailed):
+                _extract_cookies(login_service.pk)
+        requests = self.server.requests
+        with self.assertRaises(CircuitOpen):
+            _extract_cookies(login_service.pk)
+        # Rejected without calling the service
+        self.assertEqual(self.server.requests, requests)
@@ -0,0 +1,23 @@
+from django.test import TestCase
+from rest_framework.settings import api_settings
+from core.sample_data import create_sample_data, serializer_targets
+from core.values_serializers import ValuesSerializer
+
+class SerializerParityTests(TestCase):
+    """The values() fast path renders the same JSON as each ModelSerializer it replaces."""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_data(50)
+
+    def test_fast_path_matches_serializer(self):
+        # The renderer responses actually go out with
+        renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+        for label, serializer_class, queryset in serializer_targets():
+            with self.subTest(label):
+                self.assertTrue(queryset.exists(), "no sample rows to compare")
+                compiled = ValuesSerializer.for_serializer(serializer_class)
+                self.assertEqual(
+                    renderer.render(compiled.serialize(queryset)),
+                    renderer.render(serializer_class(queryset, many=True).data),
+                )
@@ -0,0 +1,21 @@
+import statistics
+from django.conf import settings
+from django.test import SimpleTestCase
+from core.startup import run_startup
+
+class StartupTimeTests(SimpleTestCase):
+    """Same budget as `manage.py check_startup_time`, on fewer runs."""
+    runs = 3
+
+    def median_ms(self, role):
+        results = [run_startup(role)[0] for _ in range(self.runs)]
+        return statistics.median(result['seconds'] for result in results) * 1000, results[0]
+
+    def test_web_startup_within_budget(self):
+        median, result = self.median_ms('web')
+        self.assertLessEqual(median, settings.STARTUP_TIME_BUDGET_MS, f"web startup took {median:.0f} ms")
+        self.assertEqual(result['lazy_modules_loaded'], [], "web startup imports modules it should load lazily")
+
+    def test_worker_startup_within_budget(self):
+        median, _ = self.median_ms('worker')
+        self.assertLessEqual(median, settings.STARTUP_TIME_BUDGET_MS, f"worker startup took {median:.0f} ms")
@@ -1,7 +1,11 @@
+import base64
+import hashlib
 from cryptography.fernet import Fernet
+from django.conf import settings
 
 def get_cipher():
-    key = b'your-generated-key'  # Ideally load from env variables
+    # FIELD_ENCRYPTION_KEY is a urlsafe base64 Fernet key; fall back to one derived from SECRET_KEY
+    key = settings.FIELD_ENCRYPTION_KEY or base64.urlsafe_b64encode(hashlib.sha256(settings.SECRET_KEY.encode()).digest())
     return Fernet(key)
 
 def encrypt_data(data):
@@ -0,0 +1,127 @@
+"""
+Read-only fast path for ModelSerializer list endpoints.
+
+ValuesSerializer compiles a ModelSerializer class once into the list of
+columns it reads and a per-field to_representation, then serializes a
+queryset straight from values_list() rows without building model instances
+or going through Field.get_attribute. The output renders to the same JSON as
+the ModelSerializer (checked by core.tests.test_serializer_parity, and on
+real data by `manage.py check_serializer_parity`).
+
+Supported: concrete model fields, primary-key related fields and nested
+ModelSerializers over a forward foreign key. Anything else (method fields,
+many-to-many, dotted sources, custom get_attribute) raises
+UnsupportedSerializer, and ValuesListMixin falls back to the regular
+serializer.
+"""
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+from rest_framework.response import Response
+
+class UnsupportedSerializer(Exception):
+    pass
+
+# Fields whose to_representation returns database values unchanged
+_PASSTHROUGH = (
+    serializers.CharField, serializers.EmailField, serializers.URLField,
+    serializers.SlugField, serializers.IntegerField,
+)
+
+_compiled = {}
+
+def _model_field(model, field):
+    if len(field.source_attrs) != 1:
+        raise UnsupportedSerializer(f"{field.field_name}: dotted source {field.source!r}")
+    try:
+        model_field = model._meta.get_field(field.source)
+    except Exception:
+        raise UnsupportedSerializer(f"{field.field_name}: {field.source!r} is not a model field")
+    if not model_field.concrete or model_field.many_to_many:
+        raise UnsupportedSerializer(f"{field.field_name}: {field.source!r} is not a column")
+    return model_field
+
+def _compile(serializer, prefix, columns):
+    """Returns [(name, column index, to_representation or None, nested builder or None)]."""
+    model = serializer.Meta.model
+    plan = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, (serializers.ListSerializer, ManyRelatedField, serializers.SerializerMethodField)):
+            raise UnsupportedSerializer(f"{name}: {type(field).__name__}")
+        if type(field).get_attribute is not serializers.Field.get_attribute and not isinstance(field, PrimaryKeyRelatedField):
+            raise UnsupportedSerializer(f"{name}: custom get_attribute")
+        model_field = _model_field(model, field)
+        index = len(columns)
+        # For foreign keys values_list() returns the related pk, which also serves as the null check
+        columns.append(prefix + field.source)
+        if isinstance(field, serializers.ModelSerializer):
+            if not model_field.many_to_one and not model_field.one_to_one:
+                raise UnsupportedSerializer(f"{name}: nested serializer over {model_field.get_internal_type()}")
+            nested = _compile(field, f"{prefix}{field.source}__", columns)
+            plan.append((name, index, None, _builder(nested)))
+        elif isinstance(field, PrimaryKeyRelatedField):
+            plan.append((name, index, field.pk_field.to_representation if field.pk_field else None, None))
+        elif isinstance(field, serializers.BaseSerializer):
+            raise UnsupportedSerializer(f"{name}: {type(field).__name__}")
+        elif type(field) in _PASSTHROUGH:
+            plan.append((name, index, None, None))
+        else:
+            plan.append((name, index, field.to_representation, None))
+    return plan
+
+def _builder(plan):
+    plan = tuple(plan)
+
+    def build(row):
+        data = {}
+        for name, index, to_representation, nested in plan:
+            value = row[index]
+            if value is None:
+                data[name] = None
+            elif nested is not None:
+                data[name] = nested(row)
+            elif to_representation is None:
+                data[name] = value
+            else:
+                data[name] = to_representation(value)
+        return data
+    return build
+
+class ValuesSerializer:
+    def __init__(self, serializer_class):
+        columns = []
+        self.build = _builder(_compile(serializer_class(), '', columns))
+        self.columns = tuple(columns)
+
+    @classmethod
+    def for_serializer(cls, serializer_class):
+        """Compiled once per serializer class; raises UnsupportedSerializer."""
+        if serializer_class not in _compiled:
+            try:
+                _compiled[serializer_class] = cls(serializer_class)
+            except UnsupportedSerializer as e:
+                _compiled[serializer_class] = e
+        compiled = _compiled[serializer_class]
+        if isinstance(compiled, UnsupportedSerializer):
+            raise compiled
+        return compiled
+
+    def serialize(self, queryset):
+        build = self.build
+        return [build(row) for row in queryset.values_list(*self.columns)]
+
+class ValuesListMixin:
+    """
+    For ListAPIView: serve unpaginated lists through ValuesSerializer when the
+    view's serializer supports it.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+        try:
+            compiled = ValuesSerializer.for_serializer(self.get_serializer_class())
+        except UnsupportedSerializer:
+            return super().list(request, *args, **kwargs)
+        return Response(compiled.serialize(self.filter_queryset(self.get_queryset())))
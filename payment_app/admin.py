@@ -1,8 +1,23 @@
 from django.contrib import admin
-from .models import Payment
+from core.db_routing import ReplicaAdminMixin
+from .models import Payment, PaymentWebhookEvent, DailyRevenue
 
 @admin.register(Payment)
-class PaymentAdmin(admin.ModelAdmin):
+class PaymentAdmin(ReplicaAdminMixin, admin.ModelAdmin):
     list_display = ('id', 'user', 'subscription_plan', 'amount', 'payment_status', 'payment_method', 'transaction_id', 'payment_date')
     search_fields = ('user__email', 'transaction_id')
     list_filter = ('payment_status', 'payment_method')
+    # Status moves with gateway webhooks, which also keep DailyRevenue in step
+    readonly_fields = ('payment_status',)
+
+@admin.register(PaymentWebhookEvent)
+class PaymentWebhookEventAdmin(ReplicaAdminMixin, admin.ModelAdmin):
+    list_display = ('event_id', 'event_type', 'transaction_id', 'status', 'received_at', 'processed_at')
+    search_fields = ('event_id', 'transaction_id')
+    list_filter = ('status', 'event_type')
+
+@admin.register(DailyRevenue)
+class DailyRevenueAdmin(ReplicaAdminMixin, admin.ModelAdmin):
+    list_display = ('day', 'subscription_plan', 'payment_method', 'payment_count', 'gross_amount', 'refund_count', 'refunded_amount')
+    list_filter = ('payment_method',)
+    date_hierarchy = 'day'
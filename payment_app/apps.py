@@ -0,0 +1,14 @@
+import logging
+from django.apps import AppConfig
+
+logger = logging.getLogger(__name__)
+
+class PaymentAppConfig(AppConfig):
+    name = 'payment_app'
+
+    def ready(self):
+        # Register the system checks
+        from . import checks
+        # Servers like gunicorn don't run system checks; say it at startup too
+        for error in checks.check_webhook_secret(None):
+            logger.error("%s %s", error.msg, error.hint)
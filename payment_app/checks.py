@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.checks import Error, register, Tags
+
+# A deployment check, like Django's own SECRET_KEY checks, so development and
+# test runs without a secret are not stopped
+@register(Tags.security, deploy=True)
+def check_webhook_secret(app_configs, **kwargs):
+    if settings.PAYMENT_WEBHOOK_SECRET or settings.PAYMENT_WEBHOOK_ALLOW_UNSIGNED:
+        return []
+    return [Error(
+        "PAYMENT_WEBHOOK_SECRET is not set, so every payment webhook will be rejected.",
+        hint="Set PAYMENT_WEBHOOK_SECRET to the gateway's signing secret.",
+        id='payment_app.E001',
+    )]
@@ -0,0 +1,69 @@
+import json
+import random
+import uuid
+from collections import deque
+from .gateway import sign_payload
+
+class FakeGateway:
+    """
+    Local stand-in for the payment gateway. Produces webhook deliveries with
+    the same shape and signature as the real one, including redeliveries and
+    interleaving across payments, so the ingestion path can be replayed at
+    volume without network access.
+    """
+
+    def __init__(self, secret='', duplicate_rate=0.1, failure_rate=0.1, refund_rate=0.05, seed=None):
+        self.secret = secret
+        self.duplicate_rate = duplicate_rate
+        self.failure_rate = failure_rate
+        self.refund_rate = refund_rate
+        self.rng = random.Random(seed)
+
+    def event(self, transaction_id, event_type, metadata=None):
+        return {
+            'id': f"evt_{uuid.uuid4().hex}",
+            'type': event_type,
+            'data': {
+                'transaction_id': transaction_id,
+                'metadata': metadata or {},
+            },
+        }
+
+    def events_for(self, transaction_ids):
+        """
+        Build the event stream for a set of payments. Returns the events in
+        delivery order and the status each payment should end up in.
+        Per-payment order is preserved, payments are interleaved at random
+        and some events are delivered more than once.
+        """
+        streams, expected = [], {}
+        for transaction_id in transaction_ids:
+            stream = []
+            if self.rng.random() < self.failure_rate:
+                stream.append(self.event(transaction_id, 'payment.failed', {'decline_code': 'insufficient_funds'}))
+            stream.append(self.event(transaction_id, 'payment.succeeded', {'gateway_reference': transaction_id}))
+            expected[transaction_id] = 'success'
+            if self.rng.random() < self.refund_rate:
+                stream.append(self.event(transaction_id, 'payment.refunded'))
+                expected[transaction_id] = 'refunded'
+            with_duplicates = []
+            for event in stream:
+                with_duplicates.append(event)
+                if self.rng.random() < self.duplicate_rate:
+                    with_duplicates.append(event)
+            streams.append(deque(with_duplicates))
+
+        events = []
+        while streams:
+            index = self.rng.randrange(len(streams))
+            events.append(streams[index].popleft())
+            if not streams[index]:
+                streams[index] = streams[-1]
+                streams.pop()
+        return events, expected
+
+    def deliveries(self, events, batch_size=50):
+        # Yields (body, signature) pairs as they would be POSTed to the webhook
+        for start in range(0, len(events), batch_size):
+            body = json.dumps(events[start:start + batch_size]).encode()
+            yield body, sign_payload(body, self.secret)
@@ -0,0 +1,153 @@
+import hashlib
+import hmac
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min, Q
+from django.utils import timezone
+from subscription_app.lifecycle import reinstate_renewals, restore_user_services, revoke_renewals
+from subscription_app.models import UserSubscription
+from cookie_management_app.entitlements import refresh_user_entitlements
+from .models import Payment, PaymentWebhookEvent
+from .reporting import record_status_changes
+
+# Gateway event type -> Payment.payment_status it moves the payment to
+EVENT_STATUS = {
+    'payment.succeeded': 'success',
+    'payment.failed': 'failed',
+    'payment.refunded': 'refunded',
+}
+
+def sign_payload(body, secret=None):
+    secret = secret if secret is not None else settings.PAYMENT_WEBHOOK_SECRET
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+def verify_signature(body, signature):
+    # Without a secret, events are only taken where explicitly allowed (local development)
+    if not settings.PAYMENT_WEBHOOK_SECRET:
+        return settings.PAYMENT_WEBHOOK_ALLOW_UNSIGNED
+    return hmac.compare_digest(sign_payload(body), signature or '')
+
+def _string(value, name):
+    if not isinstance(value, str) or not value:
+        raise ValueError(f"{name} must be a non-empty string")
+    return value
+
+def enqueue_events(events):
+    """
+    Append raw gateway events to the local queue. Redeliveries of an already
+    queued event_id are dropped by the unique constraint. Raises ValueError,
+    queueing nothing, if any event is malformed.
+    """
+    rows = []
+    for event in events:
+        if not isinstance(event, dict):
+            raise ValueError("event must be an object")
+        data = event.get('data') or {}
+        if not isinstance(data, dict):
+            raise ValueError("data must be an object")
+        # Events that aren't about a payment may have none; they are ignored later
+        transaction_id = data.get('transaction_id', '')
+        if not isinstance(transaction_id, str):
+            raise ValueError("data.transaction_id must be a string")
+        rows.append(PaymentWebhookEvent(
+            event_id=_string(event.get('id'), 'id'),
+            event_type=_string(event.get('type'), 'type'),
+            transaction_id=transaction_id,
+            payload=event,
+        ))
+    PaymentWebhookEvent.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
+
+def process_webhook_events(batch_size=500):
+    """
+    Apply one batch of queued events in arrival order. Payments, subscriptions
+    and the events themselves are updated in bulk inside a single transaction,
+    so an event is either fully applied and marked processed or not at all.
+
+    An event can arrive before its payment is created. It then stays queued
+    and is retried after PAYMENT_WEBHOOK_RETRY_SECONDS, together with the
+    transaction's later events so they still apply in order, until it is
+    PAYMENT_WEBHOOK_MAX_AGE_SECONDS old and ignored.
+    Returns the number of events handled.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        events = list(
+            PaymentWebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(Q(retry_at__isnull=True) | Q(retry_at__lte=now), status='queued')
+            .order_by('id')[:batch_size]
+        )
+        if not events:
+            return 0
+
+        transaction_ids = {event.transaction_id for event in events}
+        payments = Payment.objects.select_for_update().in_bulk(transaction_ids, field_name='transaction_id')
+        # Transactions with an earlier event still waiting for its payment
+        waiting = dict(
+            PaymentWebhookEvent.objects.filter(status='queued', retry_at__gt=now, transaction_id__in=transaction_ids)
+            .values_list('transaction_id').annotate(first=Min('id'))
+        )
+        expired_before = now - timedelta(seconds=settings.PAYMENT_WEBHOOK_MAX_AGE_SECONDS)
+        changed = {}
+        transitions = []
+        processed, ignored, deferred = [], [], []
+        for event in events:
+            target = EVENT_STATUS.get(event.event_type)
+            payment = payments.get(event.transaction_id)
+            if target is not None and event.pk > waiting.get(event.transaction_id, event.pk):
+                deferred.append(event.pk)
+                continue
+            if target is not None and payment is None and event.received_at > expired_before:
+                deferred.append(event.pk)
+                waiting.setdefault(event.transaction_id, event.pk)
+                continue
+            if target is None or payment is None or not payment.can_transition_to(target):
+                ignored.append(event.pk)
+                continue
+            metadata = payment.payment_metadata or {}
+            metadata.update((event.payload.get('data') or {}).get('metadata') or {})
+            metadata.setdefault('gateway_events', []).append(event.event_id)
+            payment.payment_metadata = metadata
+            transitions.append((payment, payment.payment_status, target))
+            payment.payment_status = target
+            changed[payment.pk] = payment
+            processed.append(event.pk)
+
+        if changed:
+            Payment.objects.bulk_update(changed.values(), ['payment_status', 'payment_metadata'])
+            _sync_subscriptions(changed.values())
+            record_status_changes(transitions)
+
+        PaymentWebhookEvent.objects.filter(pk__in=processed).update(status='processed', processed_at=now)
+        PaymentWebhookEvent.objects.filter(pk__in=ignored).update(status='ignored', processed_at=now)
+        PaymentWebhookEvent.objects.filter(pk__in=deferred).update(
+            retry_at=now + timedelta(seconds=settings.PAYMENT_WEBHOOK_RETRY_SECONDS)
+        )
+    return len(events)
+
+def drain_webhook_events(batch_size=500):
+    total = 0
+    while True:
+        handled = process_webhook_events(batch_size)
+        if not handled:
+            return total
+        total += handled
+
+def _sync_subscriptions(payments):
+    succeeded = [p.pk for p in payments if p.payment_status == 'success']
+    revoked = [p.pk for p in payments if p.payment_status in ('failed', 'refunded')]
+    if succeeded:
+        UserSubscription.objects.filter(payment_id__in=succeeded).update(is_active=True)
+        reinstate_renewals(succeeded)
+    if revoked:
+        UserSubscription.objects.filter(payment_id__in=revoked).update(is_active=False)
+        # Renewal payments are only linked through SubscriptionRenewal
+        revoke_renewals(revoked)
+    # Bulk updates bypass the per-row entitlement signals
+    user_ids = {p.user_id for p in payments}
+    transaction.on_commit(lambda: refresh_user_entitlements(user_ids))
+    if succeeded:
+        # Access revoked when an earlier subscription lapsed comes back
+        restored_for = {p.user_id for p in payments if p.payment_status == 'success'}
+        transaction.on_commit(lambda: restore_user_services(restored_for))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from payment_app.models import DailyRevenue
+from payment_app.reporting import rebuild_daily_revenue
+
+class Command(BaseCommand):
+    help = "Recompute the DailyRevenue aggregate table from Payment rows."
+
+    def handle(self, *args, **options):
+        rebuild_daily_revenue()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {DailyRevenue.objects.count()} daily revenue rows."))
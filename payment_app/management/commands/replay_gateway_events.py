@@ -0,0 +1,93 @@
+import time
+import uuid
+from decimal import Decimal
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from auth_app.models import User
+from subscription_app.models import SubscriptionPlan, UserSubscription
+from payment_app.fake_gateway import FakeGateway
+from payment_app.gateway import drain_webhook_events
+from payment_app.models import Payment, PaymentWebhookEvent
+
+class Command(BaseCommand):
+    help = "Replay fake gateway webhooks through the ingestion queue and verify nothing is dropped or applied twice."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--payments', type=int, default=2000)
+        parser.add_argument('--delivery-size', type=int, default=50, help="Events per webhook POST")
+        parser.add_argument('--worker-batch', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--keep', action='store_true', help="Keep the generated rows")
+
+    def handle(self, *args, **options):
+        run = uuid.uuid4().hex[:12]
+        user = User.objects.create_user(email=f"replay-{run}@example.com", full_name="Gateway Replay")
+        plan = SubscriptionPlan.objects.create(
+            name=f"replay-{run}", description="Gateway replay", price=Decimal('9.99'),
+            duration_days=30, max_services=1,
+        )
+        try:
+            # Deliveries are signed like the real gateway's; without a configured
+            # secret, sign with a throwaway one
+            with override_settings(PAYMENT_WEBHOOK_SECRET=settings.PAYMENT_WEBHOOK_SECRET or uuid.uuid4().hex):
+                self._replay(run, user, plan, options)
+        finally:
+            if not options['keep']:
+                PaymentWebhookEvent.objects.filter(transaction_id__startswith=f"replay-{run}-").delete()
+                user.delete()
+                plan.delete()
+
+    def _replay(self, run, user, plan, options):
+        payments = Payment.objects.bulk_create([
+            Payment(
+                user=user, subscription_plan=plan, amount=plan.price, payment_status='pending',
+                payment_method='stripe', transaction_id=f"replay-{run}-{i}",
+            )
+            for i in range(options['payments'])
+        ])
+        expires_at = timezone.now() + timezone.timedelta(days=plan.duration_days)
+        UserSubscription.objects.bulk_create([
+            UserSubscription(user=user, subscription=plan, payment=payment, is_active=False, expires_at=expires_at)
+            for payment in payments
+        ])
+
+        gateway = FakeGateway(secret=settings.PAYMENT_WEBHOOK_SECRET, seed=options['seed'])
+        events, expected = gateway.events_for([p.transaction_id for p in payments])
+        client = Client()
+        url = reverse('payment-webhook')
+
+        started = time.perf_counter()
+        for body, signature in gateway.deliveries(events, options['delivery_size']):
+            response = client.post(url, data=body, content_type='application/json', HTTP_X_GATEWAY_SIGNATURE=signature)
+            if response.status_code != 200:
+                raise CommandError(f"Webhook rejected delivery: {response.status_code} {response.content[:200]!r}")
+        ingest_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        handled = drain_webhook_events(options['worker_batch'])
+        apply_seconds = time.perf_counter() - started
+
+        unique_events = {event['id'] for event in events}
+        queued = PaymentWebhookEvent.objects.filter(transaction_id__startswith=f"replay-{run}-")
+        dropped = len(unique_events) - queued.exclude(status='queued').count()
+        wrong_status = double_applied = 0
+        for payment in Payment.objects.filter(pk__in=[p.pk for p in payments]).only('transaction_id', 'payment_status', 'payment_metadata'):
+            if payment.payment_status != expected[payment.transaction_id]:
+                wrong_status += 1
+            applied = payment.payment_metadata.get('gateway_events', [])
+            if len(applied) != len(set(applied)):
+                double_applied += 1
+        inactive = UserSubscription.objects.filter(payment__transaction_id__startswith=f"replay-{run}-", payment__payment_status='success', is_active=False).count()
+
+        self.stdout.write(
+            f"deliveries: {len(events)} events ({len(unique_events)} unique) in {ingest_seconds:.2f}s "
+            f"({len(events) / ingest_seconds:.0f} events/s)"
+        )
+        self.stdout.write(f"applied: {handled} queued events in {apply_seconds:.2f}s ({handled / max(apply_seconds, 1e-9):.0f} events/s)")
+        self.stdout.write(f"dropped: {dropped}  double-applied: {double_applied}  wrong status: {wrong_status}  inactive subscriptions: {inactive}")
+        if dropped or double_applied or wrong_status or inactive:
+            raise CommandError("Replay verification failed.")
+        self.stdout.write(self.style.SUCCESS("Replay verified."))
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payment_app", "0003_payment_webhook_event"),
+        ("subscription_app", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyRevenue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "payment_method",
+                    models.CharField(
+                        choices=[
+                            ("stripe", "Stripe"),
+                            ("paypal", "PayPal"),
+                            ("crypto", "Cryptocurrency"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("payment_count", models.IntegerField(default=0)),
+                (
+                    "gross_amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("refund_count", models.IntegerField(default=0)),
+                (
+                    "refunded_amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                fields=["payment_date"], name="payment_app_payment_f34222_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailyrevenue",
+            name="subscription_plan",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                to="subscription_app.subscriptionplan",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="dailyrevenue",
+            unique_together={("day", "subscription_plan", "payment_method")},
+        ),
+    ]
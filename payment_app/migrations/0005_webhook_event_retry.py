@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payment_app", "0004_daily_revenue"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="paymentwebhookevent",
+            name="retry_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
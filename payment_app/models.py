@@ -16,6 +16,15 @@ class Payment(models.Model):
         ('crypto', 'Cryptocurrency'),
     ]
 
+    # Allowed gateway-driven status changes; anything else is a stale or
+    # replayed event and is ignored.
+    TRANSITIONS = {
+        'pending': {'success', 'failed'},
+        'failed': {'success'},
+        'success': {'refunded'},
+        'refunded': set(),
+    }
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='payments')
     subscription_plan = models.ForeignKey(SubscriptionPlan, on_delete=models.CASCADE)
@@ -26,5 +35,58 @@ class Payment(models.Model):
     payment_date = models.DateTimeField(auto_now_add=True)
     payment_metadata = models.JSONField(default=dict, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['payment_date']),
+        ]
+
     def __str__(self):
         return f"Payment {self.id} - {self.payment_status}"
+
+    def can_transition_to(self, status):
+        return status in self.TRANSITIONS.get(self.payment_status, set())
+
+class PaymentWebhookEvent(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('processed', 'Processed'),
+        ('ignored', 'Ignored'),
+    ]
+
+    # Auto-incrementing id doubles as the queue's arrival order
+    event_id = models.CharField(max_length=255, unique=True)
+    event_type = models.CharField(max_length=50)
+    transaction_id = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    # Set while a queued event waits for its payment to be created
+    retry_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+
+    def __str__(self):
+        return f"Webhook {self.event_id} - {self.status}"
+
+class DailyRevenue(models.Model):
+    """
+    Pre-aggregated revenue per day, plan and payment method. Maintained
+    incrementally as payments change status; see payment_app.reporting.
+    """
+    day = models.DateField()
+    subscription_plan = models.ForeignKey(SubscriptionPlan, on_delete=models.CASCADE)
+    payment_method = models.CharField(max_length=30, choices=Payment.METHOD_CHOICES)
+    payment_count = models.IntegerField(default=0)
+    gross_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    refund_count = models.IntegerField(default=0)
+    refunded_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ['day', 'subscription_plan', 'payment_method']
+
+    def __str__(self):
+        return f"{self.day} {self.subscription_plan_id} {self.payment_method}"
@@ -0,0 +1,122 @@
+import csv
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .models import DailyRevenue, Payment
+
+REPORT_GROUPS = ('day', 'subscription_plan', 'payment_method')
+
+EXPORT_COLUMNS = (
+    'id', 'transaction_id', 'user_id', 'subscription_plan_id', 'amount',
+    'payment_status', 'payment_method', 'payment_date',
+)
+
+def _key(payment):
+    return (timezone.localdate(payment.payment_date), payment.subscription_plan_id, payment.payment_method)
+
+def record_status_changes(transitions):
+    """
+    Fold (payment, old_status, new_status) transitions into DailyRevenue.
+    Entering 'success' counts towards gross revenue, 'success' -> 'refunded'
+    counts as a refund. Issues one UPDATE per touched (day, plan, method).
+    """
+    deltas = defaultdict(lambda: [0, Decimal('0'), 0, Decimal('0')])
+    for payment, old_status, new_status in transitions:
+        delta = deltas[_key(payment)]
+        if new_status == 'success':
+            delta[0] += 1
+            delta[1] += payment.amount
+        elif old_status == 'success' and new_status == 'refunded':
+            delta[2] += 1
+            delta[3] += payment.amount
+    deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        DailyRevenue.objects.bulk_create([
+            DailyRevenue(day=day, subscription_plan_id=plan_id, payment_method=method)
+            for day, plan_id, method in deltas
+        ], ignore_conflicts=True)
+        for (day, plan_id, method), (count, gross, refunds, refunded) in deltas.items():
+            DailyRevenue.objects.filter(
+                day=day, subscription_plan_id=plan_id, payment_method=method
+            ).update(
+                payment_count=F('payment_count') + count,
+                gross_amount=F('gross_amount') + gross,
+                refund_count=F('refund_count') + refunds,
+                refunded_amount=F('refunded_amount') + refunded,
+            )
+
+def rebuild_daily_revenue():
+    """Recompute DailyRevenue from scratch with a single GROUP BY over Payment."""
+    settled = Q(payment_status__in=('success', 'refunded'))
+    refunded = Q(payment_status='refunded')
+    rows = (
+        Payment.objects.filter(settled)
+        .annotate(day=TruncDate('payment_date'))
+        .values('day', 'subscription_plan_id', 'payment_method')
+        .annotate(
+            payment_count=Count('id'),
+            gross_amount=Sum('amount'),
+            refund_count=Count('id', filter=refunded),
+            refunded_amount=Sum('amount', filter=refunded),
+        )
+        .order_by()
+    )
+    with transaction.atomic():
+        DailyRevenue.objects.all().delete()
+        DailyRevenue.objects.bulk_create([
+            DailyRevenue(
+                day=row['day'],
+                subscription_plan_id=row['subscription_plan_id'],
+                payment_method=row['payment_method'],
+                payment_count=row['payment_count'],
+                gross_amount=row['gross_amount'],
+                refund_count=row['refund_count'],
+                refunded_amount=row['refunded_amount'] or 0,
+            )
+            for row in rows.iterator()
+        ], batch_size=1000)
+
+def revenue_report(start=None, end=None, group_by=('day',)):
+    queryset = DailyRevenue.objects.all()
+    if start:
+        queryset = queryset.filter(day__gte=start)
+    if end:
+        queryset = queryset.filter(day__lte=end)
+    rows = (
+        queryset.values(*group_by)
+        .annotate(
+            payment_count=Sum('payment_count'),
+            gross_amount=Sum('gross_amount'),
+            refund_count=Sum('refund_count'),
+            refunded_amount=Sum('refunded_amount'),
+        )
+        .order_by(*group_by)
+    )
+    cents = Decimal('0.01')
+    for row in rows:
+        row['net_amount'] = row['gross_amount'] - row['refunded_amount']
+        # Render money the same way the DRF DecimalField does
+        for field in ('gross_amount', 'refunded_amount', 'net_amount'):
+            row[field] = str(Decimal(row[field]).quantize(cents))
+        yield row
+
+class _Echo:
+    # File-like object for csv.writer that hands back each line instead of buffering it
+    def write(self, value):
+        return value
+
+def iter_payments_csv(queryset, chunk_size=2000):
+    """
+    Yield CSV lines for the given payments. iterator() keeps memory flat and
+    uses a server-side cursor on backends that support it.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in queryset.order_by().values_list(*EXPORT_COLUMNS).iterator(chunk_size=chunk_size):
+        yield writer.writerow(row)
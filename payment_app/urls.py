@@ -1,6 +1,10 @@
 from django.urls import path
-from .views import CreatePaymentView
+from .views import PaymentListView, CreatePaymentView, PaymentWebhookView, RevenueReportView, PaymentExportView
 
 urlpatterns = [
+    path('payments/', PaymentListView.as_view(), name='payment-list'),
     path('payments/create/', CreatePaymentView.as_view(), name='payment-create'),
+    path('payments/webhook/', PaymentWebhookView.as_view(), name='payment-webhook'),
+    path('reports/revenue/', RevenueReportView.as_view(), name='payment-revenue-report'),
+    path('reports/payments.csv', PaymentExportView.as_view(), name='payment-export'),
 ]
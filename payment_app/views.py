@@ -1,7 +1,23 @@
+import json
+from datetime import date, datetime, time, timedelta
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from .models import Payment
 from .serializers import PaymentSerializer
+from .gateway import enqueue_events, verify_signature
+from .reporting import REPORT_GROUPS, iter_payments_csv, revenue_report
+from core.values_serializers import ValuesListMixin
+
+def _query_date(value):
+    """A YYYY-MM-DD query parameter as a date, None if malformed or impossible (2024-02-30)."""
+    try:
+        return parse_date(value)
+    except ValueError:
+        return None
 
 class CreatePaymentView(generics.CreateAPIView):
     serializer_class = PaymentSerializer
@@ -10,9 +26,83 @@ class CreatePaymentView(generics.CreateAPIView):
     def post(self, request, *args, **kwargs):
         data = request.data.copy()
         data['user'] = request.user.id
+        # Status is driven by gateway webhooks only
+        data['payment_status'] = 'pending'
         serializer = self.get_serializer(data=data)
         if serializer.is_valid():
             serializer.save()
-            # Optionally trigger external payment gateway here
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class PaymentListView(ValuesListMixin, generics.ListAPIView):
+    serializer_class = PaymentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Payment.objects.filter(user=self.request.user).order_by('-payment_date')
+
+class PaymentWebhookView(APIView):
+    """
+    Receives payment gateway events. Events are only appended to the local
+    queue here; status transitions are applied in bulk by the
+    process_payment_webhook_events task.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        body = request.body
+        if not verify_signature(body, request.headers.get('X-Gateway-Signature')):
+            return Response({"detail": "Invalid signature."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            payload = json.loads(body)
+            # Gateways may deliver a single event or a batch
+            events = payload if isinstance(payload, list) else [payload]
+            received = enqueue_events(events)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return Response({"detail": "Malformed event."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"received": received}, status=status.HTTP_200_OK)
+
+class RevenueReportView(APIView):
+    """
+    Admin revenue report read from the DailyRevenue aggregate table.
+    Query params: start, end (YYYY-MM-DD) and group_by, a comma separated
+    subset of day, subscription_plan, payment_method.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        group_by = tuple(filter(None, request.query_params.get('group_by', 'day').split(',')))
+        if not group_by or any(group not in REPORT_GROUPS for group in group_by):
+            return Response({"error": f"group_by must be a subset of {', '.join(REPORT_GROUPS)}."}, status=status.HTTP_400_BAD_REQUEST)
+        start = _query_date(request.query_params.get('start', '') or '1970-01-01')
+        end = _query_date(request.query_params.get('end', '') or '9999-12-31')
+        if start is None or end is None:
+            return Response({"error": "start and end must be YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(list(revenue_report(start, end, group_by)))
+
+class PaymentExportView(APIView):
+    """
+    Admin CSV export of raw payments, streamed row by row.
+    Optional query params: start, end (YYYY-MM-DD) and payment_status.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        queryset = Payment.objects.all()
+        start_param = request.query_params.get('start', '')
+        end_param = request.query_params.get('end', '')
+        start = _query_date(start_param)
+        end = _query_date(end_param)
+        if (start_param and start is None) or (end_param and end is None):
+            return Response({"error": "start and end must be YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+        # Compare against datetimes rather than payment_date__date so the index is used
+        if start:
+            queryset = queryset.filter(payment_date__gte=timezone.make_aware(datetime.combine(start, time.min)))
+        if end and end < date.max:
+            queryset = queryset.filter(payment_date__lt=timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)))
+        if request.query_params.get('payment_status'):
+            queryset = queryset.filter(payment_status=request.query_params['payment_status'])
+        response = StreamingHttpResponse(iter_payments_csv(queryset), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="payments.csv"'
+        return response
@@ -0,0 +1,127 @@
+"""
+Auto-approval rules for service access requests.
+
+Each plan's rules are compiled once into a CompiledPlanRules and cached, so
+evaluating a request costs a single query for the user's active
+subscriptions plus cache reads.
+"""
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from subscription_app.models import SubscriptionPlan, UserSubscription
+from cookie_management_app.approvals import assign_login_seats
+from cookie_management_app.models import UserService
+from .models import Service
+
+CACHE_TIMEOUT = 60 * 60
+
+class CompiledPlanRules:
+    __slots__ = ('plan_id', 'is_active', 'service_ids', 'max_services')
+
+    def __init__(self, plan_id, is_active, service_ids, max_services):
+        self.plan_id = plan_id
+        self.is_active = is_active
+        self.service_ids = service_ids
+        self.max_services = max_services
+
+def plan_is_active(rules, service_id, selected_count):
+    return rules.is_active
+
+def plan_includes_service(rules, service_id, selected_count):
+    return service_id in rules.service_ids
+
+def below_max_services(rules, service_id, selected_count):
+    return selected_count < rules.max_services
+
+# Every rule must pass for a request to be auto-approved
+RULES = [plan_is_active, plan_includes_service, below_max_services]
+
+def _cache_key(plan_id):
+    return f"access-rules:{plan_id}"
+
+def compile_plan_rules(plan_id):
+    plan = SubscriptionPlan.objects.filter(pk=plan_id).values('is_active', 'max_services').first()
+    if plan is None:
+        return CompiledPlanRules(plan_id, False, frozenset(), 0)
+    service_ids = frozenset(
+        Service.objects.filter(subscriptionplan=plan_id, is_active=True).values_list('id', flat=True)
+    )
+    return CompiledPlanRules(plan_id, plan['is_active'], service_ids, plan['max_services'])
+
+def get_plan_rules(plan_id):
+    rules = cache.get(_cache_key(plan_id))
+    if rules is None:
+        rules = compile_plan_rules(plan_id)
+        cache.set(_cache_key(plan_id), rules, CACHE_TIMEOUT)
+    return rules
+
+def invalidate_plan_rules(plan_ids):
+    cache.delete_many([_cache_key(plan_id) for plan_id in plan_ids])
+
+def find_covering_subscription(user, service_id):
+    """
+    Return the id of the first active subscription whose plan passes every
+    rule for service_id, or None if the request needs a human.
+    """
+    subscriptions = (
+        UserSubscription.objects.filter(user=user, is_active=True, expires_at__gt=timezone.now())
+        .annotate(selected_count=Count('selected_services'))
+        .values_list('id', 'subscription_id', 'selected_count')
+    )
+    for subscription_id, plan_id, selected_count in subscriptions:
+        rules = get_plan_rules(plan_id)
+        if all(rule(rules, service_id, selected_count) for rule in RULES):
+            return subscription_id
+    return None
+
+def try_auto_approve(user, service_id):
+    """
+    Activate access to service_id straight away when the user's subscription
+    allows it. Returns the active UserService, or None if the request should
+    go to the pending queue instead.
+    """
+    if not getattr(settings, 'SERVICE_AUTO_APPROVAL', True):
+        return None
+    try:
+        service_id = uuid.UUID(str(service_id))
+    except ValueError:
+        return None
+    subscription_id = find_covering_subscription(user, service_id)
+    if subscription_id is None:
+        return None
+
+    with transaction.atomic():
+        # Re-check the seat count under a row lock so concurrent requests can't overshoot max_services
+        subscription = UserSubscription.objects.select_for_update().select_related('subscription').get(pk=subscription_id)
+        if subscription.selected_services.count() >= subscription.subscription.max_services:
+            return None
+        subscription.selected_services.add(service_id)
+        user_service = UserService.objects.create(user=user, service_id=service_id, is_active=True)
+        assign_login_seats([(user_service.pk, user_service.service_id)])
+    user_service.refresh_from_db(fields=['login_service'])
+    return user_service
+
+@receiver(post_save, sender=SubscriptionPlan)
+@receiver(post_delete, sender=SubscriptionPlan)
+def _plan_changed(sender, instance, **kwargs):
+    invalidate_plan_rules([instance.pk])
+
+@receiver(m2m_changed, sender=SubscriptionPlan.services.through)
+def _plan_services_changed(sender, instance, action, pk_set, reverse, **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            invalidate_plan_rules([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        invalidate_plan_rules(pk_set)
+    elif action == 'pre_clear':
+        # The affected plans are only known before the rows are gone
+        invalidate_plan_rules(instance.subscriptionplan_set.values_list('pk', flat=True))
+
+@receiver(post_save, sender=Service)
+def _service_changed(sender, instance, **kwargs):
+    invalidate_plan_rules(instance.subscriptionplan_set.values_list('pk', flat=True))
@@ -1,8 +1,9 @@
 from django.contrib import admin
+from core.db_routing import ReplicaAdminMixin
 from .models import Service
 
 @admin.register(Service)
-class ServiceAdmin(admin.ModelAdmin):
+class ServiceAdmin(ReplicaAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'display_name', 'category', 'is_active', 'created_at')
     search_fields = ('name', 'display_name', 'category')
     list_filter = ('category', 'is_active')
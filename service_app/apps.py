@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+class ServiceAppConfig(AppConfig):
+    name = 'service_app'
+
+    def ready(self):
+        # Connect the cache invalidation and version stamp receivers
+        from . import access_rules, stamps  # noqa: F401
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Brings Service.category in line with the model. Databases that applied
+    # it under its earlier name record it as applied
+    replaces = [("service_app", "0002_user_entitlement")]
+
+    dependencies = [
+        ("service_app", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="service",
+            name="category",
+            field=models.CharField(max_length=30),
+        ),
+    ]
@@ -13,3 +13,5 @@ class UserServiceSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserService
         fields = '__all__'
+        # cookie_management_app has a UserServiceSerializer too
+        ref_name = 'UserServiceWithService'
@@ -0,0 +1,30 @@
+"""
+Version stamp scopes (core.conditional) for the service catalog and plans.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from core.conditional import bump
+from subscription_app.models import SubscriptionPlan
+from .models import Service
+
+SERVICES = 'services'
+PLANS = 'plans'
+
+@receiver(post_save, sender=Service)
+def _service_changed(sender, instance, **kwargs):
+    bump(SERVICES)
+
+@receiver(post_delete, sender=Service)
+def _service_deleted(sender, instance, **kwargs):
+    # Takes its rows in the plans' services table with it
+    bump(SERVICES, PLANS)
+
+@receiver(post_save, sender=SubscriptionPlan)
+@receiver(post_delete, sender=SubscriptionPlan)
+def _plan_changed(sender, instance, **kwargs):
+    bump(PLANS)
+
+@receiver(m2m_changed, sender=SubscriptionPlan.services.through)
+def _plan_services_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump(PLANS)
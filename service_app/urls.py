@@ -1,7 +1,18 @@
 from django.urls import path
-from .views import ServiceListCreateView, UserServiceListView
+from .views import (
+    ServiceListCreateView,
+    UserServiceListView,
+    AvailableServicesView,
+    EntitledServicesView,
+    RequestServiceAccessView,
+    ServiceHealthView,
+)
 
 urlpatterns = [
     path('services/', ServiceListCreateView.as_view(), name='service-list-create'),
+    path('services/available/', AvailableServicesView.as_view(), name='service-available-list'),
+    path('services/entitled/', EntitledServicesView.as_view(), name='service-entitled-list'),
+    path('services/request-access/', RequestServiceAccessView.as_view(), name='service-request-access'),
+    path('services/health/', ServiceHealthView.as_view(), name='service-health'),
     path('user-services/', UserServiceListView.as_view(), name='user-service-list'),
 ]
@@ -1,33 +1,80 @@
+import uuid
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.utils import timezone
 from .models import Service
 from cookie_management_app.models import UserService
 from .serializers import ServiceSerializer, UserServiceSerializer
+from .access_rules import try_auto_approve
+from core.resilience import ServiceGuard
+from core.values_serializers import ValuesListMixin
+from core.db_routing import ReplicaReadMixin
+from core.conditional import ConditionalGetMixin
+from cookie_management_app.stamps import entitlements_scope, user_services_scope
+from .stamps import SERVICES
 
-class ServiceListCreateView(generics.ListCreateAPIView):
+class ServiceListCreateView(ConditionalGetMixin, ValuesListMixin, generics.ListCreateAPIView):
     permission_classes = [permissions.IsAdminUser]
+    stamp_scopes = (SERVICES,)
     serializer_class = ServiceSerializer
     queryset = Service.objects.all()
 
-class UserServiceListView(generics.ListAPIView):
+class UserServiceListView(ConditionalGetMixin, ValuesListMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = UserServiceSerializer
 
+    def get_stamp_scopes(self):
+        return [SERVICES, user_services_scope(self.request.user.pk)]
+
     def get_queryset(self):
         return UserService.objects.filter(user=self.request.user)
 
-class AvailableServicesView(generics.ListAPIView):
+class ServiceHealthView(APIView):
+    """
+    Admin view of each service's login circuit breaker and concurrency limit.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        services = Service.objects.values_list('id', 'name')
+        return Response([
+            dict(service=service_id, name=name, **ServiceGuard(service_id).snapshot())
+            for service_id, name in services
+        ])
+
+class AvailableServicesView(ConditionalGetMixin, ReplicaReadMixin, ValuesListMixin, generics.ListAPIView):
     """
     List all available services for users to browse.
     """
     permission_classes = [permissions.IsAuthenticated]
+    stamp_scopes = (SERVICES,)
     serializer_class = ServiceSerializer
     queryset = Service.objects.filter(is_active=True)
 
+class EntitledServicesView(ConditionalGetMixin, ValuesListMixin, generics.ListAPIView):
+    """
+    List the services the user can use right now, read from UserEntitlement.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ServiceSerializer
+    # Entitlements lapse at valid_until without a write
+    clock_dependent = True
+
+    def get_stamp_scopes(self):
+        return [SERVICES, entitlements_scope(self.request.user.pk)]
+
+    def get_queryset(self):
+        return Service.objects.filter(
+            userentitlement__user=self.request.user,
+            userentitlement__valid_until__gt=timezone.now(),
+        )
+
 class RequestServiceAccessView(generics.CreateAPIView):
     """
     After payment, users can request access to a service.
-    This creates a service access request for admin approval.
+    Requests covered by an active subscription are approved immediately;
+    anything else becomes a pending request for admin approval.
     """
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = UserServiceSerializer
@@ -37,10 +84,26 @@ class RequestServiceAccessView(generics.CreateAPIView):
         service_id = request.data.get('service_id')
         if not service_id:
             return Response({"error": "Service ID is required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            service_id = uuid.UUID(str(service_id))
+        except ValueError:
+            return Response({"error": "Service ID must be a UUID."}, status=status.HTTP_400_BAD_REQUEST)
+        if not Service.objects.filter(pk=service_id, is_active=True).exists():
+            return Response({"detail": "Service not found."}, status=status.HTTP_404_NOT_FOUND)
         # Check if user already has access
-        if UserService.objects.filter(user=user, service_id=service_id).exists():
+        existing = UserService.objects.filter(user=user, service_id=service_id).values('revoked_at', 'suspended_at').first()
+        if existing is not None and existing['suspended_at'] is not None:
+            return Response({"detail": "Access to this service is suspended."}, status=status.HTTP_403_FORBIDDEN)
+        if existing is not None and existing['revoked_at'] is not None:
+            return Response(
+                {"detail": "Access lapsed with your subscription; renew it to restore access."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if existing is not None:
             return Response({"detail": "Access already granted for this service."}, status=status.HTTP_400_BAD_REQUEST)
-        # Create a new UserService request with status 'pending'
-        user_service = UserService.objects.create(user=user, service_id=service_id, status='pending')
+        user_service = try_auto_approve(user, service_id)
+        if user_service is None:
+            # Inactive UserService rows are the pending queue
+            user_service = UserService.objects.create(user=user, service_id=service_id, is_active=False)
         serializer = self.get_serializer(user_service)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -1,14 +1,20 @@
 from django.contrib import admin
-from .models import SubscriptionPlan, UserSubscription
+from core.db_routing import ReplicaAdminMixin
+from .models import SubscriptionPlan, SubscriptionRenewal, UserSubscription
 
 @admin.register(SubscriptionPlan)
-class SubscriptionPlanAdmin(admin.ModelAdmin):
+class SubscriptionPlanAdmin(ReplicaAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'price', 'duration_days', 'max_services', 'is_active', 'created_at')
     search_fields = ('name',)
     list_filter = ('is_active',)
 
 @admin.register(UserSubscription)
-class UserSubscriptionAdmin(admin.ModelAdmin):
+class UserSubscriptionAdmin(ReplicaAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'subscription', 'is_active', 'purchased_at', 'expires_at')
     search_fields = ('user__email', 'subscription__name')
     list_filter = ('is_active',)
+
+@admin.register(SubscriptionRenewal)
+class SubscriptionRenewalAdmin(admin.ModelAdmin):
+    list_display = ('subscription', 'payment', 'previous_expires_at', 'expires_at', 'renewed_at')
+    search_fields = ('subscription__user__email',)
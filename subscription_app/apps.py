@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+class SubscriptionAppConfig(AppConfig):
+    name = 'subscription_app'
+
+    def ready(self):
+        # Connect the lifecycle receivers
+        from . import lifecycle  # noqa: F401
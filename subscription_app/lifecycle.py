@@ -0,0 +1,176 @@
+"""
+Subscription lifecycle: expiring lapsed subscriptions and renewing them.
+
+Active subscriptions form a due-queue ordered by expires_at, served by the
+(is_active, expires_at) index. expire_due() takes what is due in batches
+and, per batch in one transaction, deactivates the subscriptions, revokes
+the user services they covered that no other active subscription still
+covers (expiring their valid cookies) and gives the LoginService seats
+back. The users' entitlements are then refreshed, which also replaces their
+version stamps.
+
+Access itself already ends at expires_at, since entitlements carry
+valid_until; the engine does the bookkeeping within one run of
+`expire_due_subscriptions` (SUBSCRIPTION_LIFECYCLE_INTERVAL_SECONDS).
+
+renew() extends a subscription from its current expires_at while it has not
+lapsed, so coverage has no gap; a lapsed one restarts now. Revoked user
+services come back, with fresh seats, once a subscription covers them again.
+When a renewal's payment fails or is refunded, the gateway takes the added
+time back (revoke_renewals), and gives it back if the payment succeeds later.
+"""
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from cookie_management_app.approvals import assign_login_seats, release_login_seats
+from cookie_management_app.entitlements import compute_coverage, refresh_user_entitlements
+from cookie_management_app.models import Cookie, UserService
+from cookie_management_app.stamps import bump_users
+from .models import SubscriptionPlan, SubscriptionRenewal, UserSubscription
+
+def _covered_by(subscriptions):
+    """{(user_id, service_id)} covered by (id, user_id, plan_id) subscriptions."""
+    plan_services = {}
+    for plan_id, service_id in SubscriptionPlan.services.through.objects.filter(
+        subscriptionplan_id__in={plan_id for _, _, plan_id in subscriptions}
+    ).values_list('subscriptionplan_id', 'service_id'):
+        plan_services.setdefault(plan_id, []).append(service_id)
+    owners = {subscription_id: user_id for subscription_id, user_id, _ in subscriptions}
+    covered = {
+        (user_id, service_id)
+        for _, user_id, plan_id in subscriptions
+        for service_id in plan_services.get(plan_id, [])
+    }
+    covered.update(
+        (owners[subscription_id], service_id)
+        for subscription_id, service_id in UserSubscription.selected_services.through.objects.filter(
+            usersubscription_id__in=owners
+        ).values_list('usersubscription_id', 'service_id')
+    )
+    return covered
+
+def _expire_batch(now, batch_size):
+    with transaction.atomic():
+        # skip_locked lets concurrent runs (and renewals holding a row) work past each other
+        due = list(
+            UserSubscription.objects.select_for_update(skip_locked=True)
+            .filter(is_active=True, expires_at__lte=now).order_by('expires_at')
+            .values_list('id', 'user_id', 'subscription_id')[:batch_size]
+        )
+        if not due:
+            return None
+        user_ids = {user_id for _, user_id, _ in due}
+        UserSubscription.objects.filter(pk__in=[subscription_id for subscription_id, _, _ in due]).update(is_active=False)
+        # What the batch covered, less what the users' other subscriptions still do
+        lapsed = _covered_by(due) - compute_coverage(user_ids, now).keys()
+        revoked = [
+            (user_service_id, login_service_id)
+            for user_service_id, user_id, service_id, login_service_id in UserService.objects.select_for_update()
+            .filter(user_id__in=user_ids, is_active=True)
+            .values_list('id', 'user_id', 'service_id', 'login_service_id')
+            if (user_id, service_id) in lapsed
+        ]
+        revoked_ids = [user_service_id for user_service_id, _ in revoked]
+        cookies_expired = seats_released = 0
+        if revoked:
+            UserService.objects.filter(pk__in=revoked_ids).update(is_active=False, login_service=None, revoked_at=now)
+            seats_released = release_login_seats(Counter(login_id for _, login_id in revoked if login_id is not None))
+            cookies_expired = Cookie.objects.filter(user_service_id__in=revoked_ids, status='valid').update(status='expired')
+        # Bulk updates bypass the per-row entitlement and stamp receivers
+        bump_users(user_ids)
+        transaction.on_commit(lambda: refresh_user_entitlements(user_ids))
+    return {
+        'subscriptions': len(due), 'user_services_revoked': len(revoked),
+        'seats_released': seats_released, 'cookies_expired': cookies_expired,
+    }
+
+def expire_due(now=None, batch_size=None):
+    """Expire every active subscription due by now; returns counts by kind."""
+    now = now or timezone.now()
+    batch_size = batch_size or settings.SUBSCRIPTION_LIFECYCLE_BATCH_SIZE
+    totals = {'subscriptions': 0, 'user_services_revoked': 0, 'seats_released': 0, 'cookies_expired': 0}
+    while True:
+        counts = _expire_batch(now, batch_size)
+        if counts is None:
+            return totals
+        for kind, count in counts.items():
+            totals[kind] += count
+
+def restore_user_services(user_ids, now=None):
+    """
+    Reactivate the revoked user services of user_ids that an active
+    subscription covers again, assigning them seats. Returns the number
+    restored.
+    """
+    user_ids = set(user_ids)
+    with transaction.atomic():
+        candidates = list(
+            UserService.objects.select_for_update()
+            .filter(user_id__in=user_ids, is_active=False, revoked_at__isnull=False, suspended_at__isnull=True)
+            .values_list('id', 'user_id', 'service_id')
+        )
+        if not candidates:
+            return 0
+        coverage = compute_coverage({user_id for _, user_id, _ in candidates}, now)
+        restored = [(pk, service_id) for pk, user_id, service_id in candidates if (user_id, service_id) in coverage]
+        if not restored:
+            return 0
+        UserService.objects.filter(pk__in=[pk for pk, _ in restored]).update(is_active=True, revoked_at=None)
+        assign_login_seats(restored)
+        bump_users(user_ids)
+        transaction.on_commit(lambda: refresh_user_entitlements(user_ids))
+    return len(restored)
+
+def renew(subscription_id, payment, now=None):
+    """
+    Extend a subscription by its plan's duration, paid by payment. Returns
+    the renewed UserSubscription.
+    """
+    with transaction.atomic():
+        subscription = UserSubscription.objects.select_for_update().select_related('subscription').get(pk=subscription_id)
+        now = now or timezone.now()
+        previous = subscription.expires_at
+        # Before it lapses a renewal continues from the current expiry, so there is no gap
+        start = previous if subscription.is_active and previous > now else now
+        subscription.expires_at = start + timedelta(days=subscription.subscription.duration_days)
+        subscription.is_active = True
+        # save() so the entitlement receivers and restore_user_services run
+        subscription.save(update_fields=['expires_at', 'is_active'])
+        SubscriptionRenewal.objects.create(
+            subscription=subscription, payment=payment, previous_expires_at=previous,
+            expires_at=subscription.expires_at, extended_by=subscription.expires_at - start,
+        )
+    return subscription
+
+def _adjust_renewals(renewals, sign, revoked_at):
+    for renewal in renewals:
+        subscription = UserSubscription.objects.select_for_update().get(pk=renewal.subscription_id)
+        subscription.expires_at += sign * renewal.extended_by
+        # save() so the entitlement receivers run; a subscription now past its
+        # expiry is picked up by the next expire_due()
+        subscription.save(update_fields=['expires_at'])
+        renewal.revoked_at = revoked_at
+        renewal.save(update_fields=['revoked_at'])
+    return len(renewals)
+
+def revoke_renewals(payment_ids):
+    """Take back the time added by renewals whose payment failed or was refunded."""
+    with transaction.atomic():
+        renewals = list(SubscriptionRenewal.objects.select_for_update().filter(payment_id__in=payment_ids, revoked_at__isnull=True))
+        return _adjust_renewals(renewals, -1, timezone.now())
+
+def reinstate_renewals(payment_ids):
+    """Give back the time of revoked renewals whose payment succeeded after all."""
+    with transaction.atomic():
+        renewals = list(SubscriptionRenewal.objects.select_for_update().filter(payment_id__in=payment_ids, revoked_at__isnull=False))
+        return _adjust_renewals(renewals, 1, None)
+
+@receiver(post_save, sender=UserSubscription)
+def _subscription_saved(sender, instance, **kwargs):
+    if instance.is_active and instance.expires_at > timezone.now():
+        user_id = instance.user_id
+        transaction.on_commit(lambda: restore_user_services([user_id]))
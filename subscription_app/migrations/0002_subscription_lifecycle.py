@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:50
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payment_app", "0004_daily_revenue"),
+        ("service_app", "0002_alter_service_category"),
+        ("subscription_app", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubscriptionRenewal",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("previous_expires_at", models.DateTimeField()),
+                ("expires_at", models.DateTimeField()),
+                ("renewed_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="usersubscription",
+            index=models.Index(
+                fields=["is_active", "expires_at"],
+                name="subscriptio_is_acti_b3e6b8_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="subscriptionrenewal",
+            name="payment",
+            field=models.OneToOneField(
+                on_delete=django.db.models.deletion.CASCADE, to="payment_app.payment"
+            ),
+        ),
+        migrations.AddField(
+            model_name="subscriptionrenewal",
+            name="subscription",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="renewals",
+                to="subscription_app.usersubscription",
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+def backfill_extended_by(apps, schema_editor):
+    SubscriptionRenewal = apps.get_model('subscription_app', 'SubscriptionRenewal')
+    for renewal in SubscriptionRenewal.objects.all():
+        # Renewals continued from the old expiry unless it had already passed
+        renewal.extended_by = renewal.expires_at - max(renewal.previous_expires_at, renewal.renewed_at)
+        renewal.save(update_fields=['extended_by'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("subscription_app", "0002_subscription_lifecycle"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="subscriptionrenewal",
+            name="revoked_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="subscriptionrenewal",
+            name="extended_by",
+            field=models.DurationField(null=True),
+        ),
+        migrations.RunPython(backfill_extended_by, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="subscriptionrenewal",
+            name="extended_by",
+            field=models.DurationField(),
+        ),
+    ]
@@ -31,6 +31,23 @@ class UserSubscription(models.Model):
 
     class Meta:
         unique_together = ['user', 'subscription', 'payment']
+        indexes = [
+            # The lifecycle engine's due-queue: active subscriptions by expiry
+            models.Index(fields=['is_active', 'expires_at']),
+        ]
 
     def is_expired(self):
         return timezone.now() > self.expires_at
+
+class SubscriptionRenewal(models.Model):
+    """One paid extension of a UserSubscription; a payment renews at most once."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    subscription = models.ForeignKey(UserSubscription, on_delete=models.CASCADE, related_name='renewals')
+    payment = models.OneToOneField('payment_app.Payment', on_delete=models.CASCADE)
+    previous_expires_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+    # Time added to the subscription, taken back if the payment is revoked
+    extended_by = models.DurationField()
+    renewed_at = models.DateTimeField(auto_now_add=True)
+    # Set while the payment is failed or refunded
+    revoked_at = models.DateTimeField(null=True, blank=True)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import SubscriptionPlan, UserSubscription
+from payment_app.models import Payment
+from .models import SubscriptionPlan, SubscriptionRenewal, UserSubscription
 
 class SubscriptionPlanSerializer(serializers.ModelSerializer):
     class Meta:
@@ -10,3 +11,16 @@ class UserSubscriptionSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserSubscription
         fields = '__all__'
+
+class RenewSubscriptionSerializer(serializers.Serializer):
+    payment = serializers.PrimaryKeyRelatedField(queryset=Payment.objects.all())
+
+    def validate_payment(self, payment):
+        subscription = self.context['subscription']
+        if payment.user_id != subscription.user_id or payment.subscription_plan_id != subscription.subscription_id:
+            raise serializers.ValidationError("Payment is not for this subscription's plan.")
+        if payment.payment_status != 'success':
+            raise serializers.ValidationError("Payment has not succeeded.")
+        if SubscriptionRenewal.objects.filter(payment=payment).exists() or UserSubscription.objects.filter(payment=payment).exists():
+            raise serializers.ValidationError("Payment has already been used.")
+        return payment
@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import SubscriptionPlanListView, PurchaseSubscriptionView
+from .views import SubscriptionPlanListView, PurchaseSubscriptionView, RenewSubscriptionView
 
 urlpatterns = [
     path('subscriptions/', SubscriptionPlanListView.as_view(), name='subscription-list'),
     path('subscriptions/purchase/', PurchaseSubscriptionView.as_view(), name='subscription-purchase'),
+    path('subscriptions/<uuid:pk>/renew/', RenewSubscriptionView.as_view(), name='subscription-renew'),
 ]
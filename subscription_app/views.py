@@ -1,14 +1,20 @@
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from .models import SubscriptionPlan, UserSubscription
-from .serializers_v2 import SubscriptionPlanSerializer, UserSubscriptionSerializer
+from .serializers_v2 import RenewSubscriptionSerializer, SubscriptionPlanSerializer, UserSubscriptionSerializer
+from .lifecycle import renew
+from django.db import IntegrityError
 from django.utils import timezone
 from datetime import timedelta
+from core.conditional import ConditionalGetMixin
+from core.db_routing import ReplicaReadMixin
+from service_app.stamps import PLANS
 
-class SubscriptionPlanListView(generics.ListAPIView):
-    queryset = SubscriptionPlan.objects.filter(is_active=True)
+class SubscriptionPlanListView(ConditionalGetMixin, ReplicaReadMixin, generics.ListAPIView):
+    queryset = SubscriptionPlan.objects.filter(is_active=True).prefetch_related('services')
     serializer_class = SubscriptionPlanSerializer
     permission_classes = [permissions.IsAuthenticated]
+    stamp_scopes = (PLANS,)
 
 class PurchaseSubscriptionView(generics.CreateAPIView):
     serializer_class = UserSubscriptionSerializer
@@ -24,3 +30,27 @@ class PurchaseSubscriptionView(generics.CreateAPIView):
             serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class RenewSubscriptionView(generics.GenericAPIView):
+    """
+    Extend one of the user's subscriptions by its plan's duration with a
+    successful payment. Renewing before expiry continues from the current
+    expiry, so access never lapses.
+    """
+    serializer_class = RenewSubscriptionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    queryset = UserSubscription.objects.all()
+
+    def post(self, request, *args, **kwargs):
+        # Only the user's own subscriptions; anyone else's is a 404
+        subscription = generics.get_object_or_404(self.get_queryset(), pk=kwargs['pk'], user=request.user)
+        serializer = self.get_serializer(data=request.data, context=dict(self.get_serializer_context(), subscription=subscription))
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            subscription = renew(subscription.pk, serializer.validated_data['payment'])
+        except IntegrityError:
+            # A concurrent renewal used the same payment
+            return Response({"payment": ["Payment has already been used."]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(UserSubscriptionSerializer(subscription).data)